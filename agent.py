@@ -0,0 +1,272 @@
+# 独立运行的监控 agent：在被监控主机上周期采样温度、CPU、内存与容器状态，批量推送给插件
+#
+# 用法 (在插件目录的上一级目录中执行)：
+#   python -m astrbot_plugin_temp.agent --server 10.0.0.2:9120 --token <令牌> [--name web-1]
+# 本模块及其依赖的采样模块不依赖 AstrBot，只需要 psutil、numpy 与 aiohttp。
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import psutil
+
+from .cpu_sampler import CpuUsageSampler
+from .docker_client import DockerClient
+from .docker_monitor import DockerStatsMonitor
+from .fleet import MAX_LINE_BYTES, PROTOCOL_VERSION, encode_message
+from .sensor_reader import SensorMap, SysfsTemperatureReader, parse_sensors_json, parse_sensors_output
+
+logger = logging.getLogger("astrbot_plugin_temp.agent")
+
+
+class AgentError(Exception):
+    """插件拒绝了 agent 的连接 (认证失败、协议版本不匹配等)。"""
+
+
+async def read_sensors_command(sensor_map: SensorMap) -> Dict[str, float]:
+    """通过 `sensors -j` (不支持时使用文本输出) 读取温度，命令不可用时返回空字典。"""
+    for args, parse in ((["sensors", "-j"], parse_sensors_json), (["sensors"], parse_sensors_output)):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+        except FileNotFoundError:
+            return {}
+        if process.returncode != 0:
+            continue
+        try:
+            return parse(stdout.decode("utf-8"), sensor_map)
+        except ValueError:
+            continue
+    return {}
+
+
+class HostAgent:
+    """
+    每 interval 秒采样一次，快照先进入本地缓冲区 (最多 buffer_size 条，满时丢弃最旧的)，
+    每 flush_interval 秒把缓冲区中的快照作为一个批次发送，收到 ack 后才从缓冲区移除。
+    连接断开时按指数退避重连，断线期间的快照在重连后补发。
+    """
+
+    def __init__(
+        self,
+        server_host: str,
+        server_port: int,
+        token: str,
+        name: Optional[str] = None,
+        interval: float = 5,
+        flush_interval: float = 15,
+        buffer_size: int = 720,
+        max_batch: int = 120,
+        sysfs_root: str = "/sys",
+        sensor_map: Optional[SensorMap] = None,
+        docker: bool = True,
+        docker_host: Optional[str] = None,
+        max_backoff: float = 60,
+    ):
+        self.server_host = server_host
+        self.server_port = server_port
+        self.token = token
+        self.name = name or socket.gethostname()
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_backoff = max_backoff
+        self.sensor_map = sensor_map or SensorMap()
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+
+        self._sysfs_reader = SysfsTemperatureReader(sysfs_root, self.sensor_map)
+        self._sysfs_reader.open()
+        self._cpu_sampler = CpuUsageSampler(min(interval, 2))
+        self._docker_monitor = (
+            DockerStatsMonitor(DockerClient(docker_host, pool_size=0), ring_size=1) if docker else None
+        )
+        self._flush_now = asyncio.Event()
+        self._seq = 0
+        self.connected = False
+        self.sent = 0
+        self.last_error: Optional[str] = None
+
+    async def read_temperatures(self) -> Dict[str, float]:
+        if self._sysfs_reader.available:
+            temps = self._sysfs_reader.read()
+            if temps:
+                return temps
+        return await read_sensors_command(self.sensor_map)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        cpu = self._cpu_sampler.snapshot()
+        mem = psutil.virtual_memory()
+        containers = None
+        if self._docker_monitor is not None and self._docker_monitor.ready:
+            containers = []
+            for container in self._docker_monitor.snapshot():
+                latest = container["latest"]
+                containers.append([
+                    container["name"],
+                    container["state"],
+                    latest["cpu_percent"] if latest else None,
+                    latest["mem_usage"] if latest else None,
+                    latest["mem_limit"] if latest else None,
+                ])
+        return {
+            "ts": time.time(),
+            "temps": await self.read_temperatures(),
+            "cpu": cpu["cpu_percent"],
+            "load": cpu["load_avg"],
+            "mem": [mem.used, mem.total],
+            "containers": containers,
+        }
+
+    async def _sample_loop(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            try:
+                self.buffer.append(await self.snapshot())
+                if len(self.buffer) >= self.max_batch:
+                    self._flush_now.set()
+            except Exception as e:
+                logger.error("采样失败: %s", e, exc_info=True)
+            deadline = max(deadline + self.interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.server_host, self.server_port, limit=MAX_LINE_BYTES)
+        writer.write(encode_message({
+            "type": "hello", "version": PROTOCOL_VERSION, "host": self.name, "token": self.token,
+        }))
+        await writer.drain()
+        reply = json.loads(await asyncio.wait_for(reader.readline(), 10) or b"{}")
+        if reply.get("type") != "welcome":
+            writer.close()
+            raise AgentError(reply.get("message") or "连接被拒绝")
+        return reader, writer
+
+    async def _send_pending(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while self.buffer:
+            batch = [self.buffer[index] for index in range(min(self.max_batch, len(self.buffer)))]
+            self._seq += 1
+            writer.write(encode_message({"type": "batch", "seq": self._seq, "snapshots": batch}))
+            await writer.drain()
+            reply = await asyncio.wait_for(reader.readline(), 30)
+            if not reply:
+                raise ConnectionResetError("连接已被关闭")
+            ack = json.loads(reply)
+            if not isinstance(ack, dict) or ack.get("seq") != self._seq:
+                raise ConnectionResetError("收到不匹配的确认消息")
+            if ack.get("rejected"):
+                # 格式错误的快照重发也不会被接受，与其他快照一起从缓冲区移除
+                logger.warning("插件拒绝了 %s 条快照: %s", ack["rejected"], ack.get("error"))
+            # 发送期间缓冲区可能因溢出丢弃了最旧的快照，只移除仍在队首的已确认快照
+            for snapshot in batch:
+                if self.buffer and self.buffer[0] is snapshot:
+                    self.buffer.popleft()
+            self.sent += len(batch)
+
+    async def _send_loop(self):
+        backoff = 1.0
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                self.connected = True
+                self.last_error = None
+                backoff = 1.0
+                logger.info("已连接到 %s:%s，主机名 %s", self.server_host, self.server_port, self.name)
+                while True:
+                    await self._send_pending(reader, writer)
+                    try:
+                        await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._flush_now.clear()
+            except asyncio.CancelledError:
+                raise
+            except AgentError as e:
+                self.last_error = str(e)
+                logger.error("插件拒绝连接: %s", e)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.warning("与 %s:%s 的连接中断: %s", self.server_host, self.server_port, self.last_error)
+            finally:
+                self.connected = False
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def run(self):
+        self._cpu_sampler.sample()
+        tasks = [asyncio.create_task(self._cpu_sampler.run())]
+        if self._docker_monitor is not None:
+            tasks.append(asyncio.create_task(self._docker_monitor.run()))
+        tasks += [asyncio.create_task(self._sample_loop()), asyncio.create_task(self._send_loop())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.close()
+
+    async def close(self):
+        self._sysfs_reader.close()
+        if self._docker_monitor is not None:
+            await self._docker_monitor.close()
+            await self._docker_monitor.client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AstrBot 服务器温度插件的监控 agent")
+    parser.add_argument("--server", required=True, help="插件的 agent 接收地址，格式为 host:port")
+    parser.add_argument("--token", default=os.environ.get("ASTRBOT_AGENT_TOKEN"),
+                        help="认证令牌，默认读取环境变量 ASTRBOT_AGENT_TOKEN")
+    parser.add_argument("--name", default=None, help="上报的主机名，默认使用本机主机名")
+    parser.add_argument("--interval", type=float, default=5, help="采样间隔 (秒)")
+    parser.add_argument("--flush-interval", type=float, default=15, help="批量发送间隔 (秒)")
+    parser.add_argument("--sensor-map", action="append", default=None,
+                        help="传感器映射规则 芯片通配符:标签通配符=设备键，可重复指定")
+    parser.add_argument("--sysfs-root", default="/sys")
+    parser.add_argument("--docker-host", default=None)
+    parser.add_argument("--no-docker", action="store_true", help="不采集 Docker 容器状态")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        parser.error("必须通过 --token 或 ASTRBOT_AGENT_TOKEN 指定认证令牌")
+    host, _, port = args.server.rpartition(":")
+    if not host or not port.isdigit():
+        parser.error("--server 格式应为 host:port")
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    async def run():
+        agent = HostAgent(
+            host, int(port), args.token,
+            name=args.name,
+            interval=args.interval,
+            flush_interval=args.flush_interval,
+            sysfs_root=args.sysfs_root,
+            sensor_map=SensorMap(args.sensor_map) if args.sensor_map else None,
+            docker=not args.no_docker,
+            docker_host=args.docker_host,
+        )
+        await agent.run()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# 告警流水线：带迟滞与冷却的告警判定，以及并发、限速、可重试的群聊告警发送
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .trend import TrendResult
+
+ALERT_HIGH = "high"  # 温度超过阈值
+ALERT_RISING = "rising"  # 温度快速上升，预计很快超过阈值
+ALERT_RECOVERED = "recovered"  # 温度回落到解除阈值以下
+
+
+@dataclass
+class Alert:
+    kind: str
+    device: str
+    temp: float
+    threshold: float
+    slope: float = 0.0
+    eta_minutes: Optional[float] = None
+
+
+@dataclass
+class _DeviceState:
+    tripped: bool = False
+    last_high: float = float("-inf")
+    last_rising: float = float("-inf")
+
+
+class AlertEvaluator:
+    """
+    按设备维护告警状态。
+
+    - 温度 >= 阈值时进入告警状态并发出告警；此后仍高于阈值时，每个冷却周期最多提醒一次
+    - 温度 <= 阈值 - hysteresis 时解除告警并发出恢复通知，避免在阈值附近反复触发
+    - 未处于告警状态、但斜率 >= rising_slope 且预计 rising_eta_minutes 内到达阈值时发出"快速升温"预警
+    """
+
+    def __init__(
+        self,
+        thresholds: Dict[str, float],
+        hysteresis: float = 3.0,
+        cooldown_seconds: float = 1800,
+        rising_slope: float = 1.0,
+        rising_eta_minutes: float = 15,
+    ):
+        self.thresholds = thresholds
+        self.hysteresis = hysteresis
+        self.cooldown_seconds = cooldown_seconds
+        self.rising_slope = rising_slope
+        self.rising_eta_minutes = rising_eta_minutes
+        self._states: Dict[str, _DeviceState] = {}
+
+    def is_tripped(self, device: str) -> bool:
+        state = self._states.get(device)
+        return state is not None and state.tripped
+
+    def evaluate(
+        self, temps: Dict[str, float], trends: Dict[str, TrendResult], now: Optional[float] = None
+    ) -> List[Alert]:
+        now = now if now is not None else time.monotonic()
+        alerts = []
+        for device, temp in temps.items():
+            threshold = self.thresholds.get(device)
+            if threshold is None:
+                continue
+            state = self._states.setdefault(device, _DeviceState())
+            trend = trends.get(device)
+            slope = trend.slope if trend is not None else 0.0
+            eta = trend.eta_minutes if trend is not None else None
+
+            if temp >= threshold:
+                if not state.tripped or now - state.last_high >= self.cooldown_seconds:
+                    state.tripped = True
+                    state.last_high = now
+                    alerts.append(Alert(ALERT_HIGH, device, temp, threshold, slope, eta))
+            elif state.tripped:
+                if temp <= threshold - self.hysteresis:
+                    state.tripped = False
+                    alerts.append(Alert(ALERT_RECOVERED, device, temp, threshold, slope, eta))
+            elif (
+                slope >= self.rising_slope
+                and eta is not None and eta <= self.rising_eta_minutes
+                and now - state.last_rising >= self.cooldown_seconds
+            ):
+                state.last_rising = now
+                alerts.append(Alert(ALERT_RISING, device, temp, threshold, slope, eta))
+        return alerts
+
+
+class AlertDispatcher:
+    """
+    后台发送告警消息。
+
+    每个群聊有独立的队列与工作任务：submit() 只把消息放入各群聊的队列并立即返回，不阻塞采样循环；
+    某个群聊发送缓慢、重试或限速等待时，不影响其他群聊收到后续告警。
+    同一群聊两次发送之间至少间隔 min_interval 秒，失败时按指数退避重试。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str], Awaitable[None]],
+        groups: List[str],
+        min_interval: float = 5,
+        retries: int = 3,
+        retry_delay: float = 2,
+        queue_size: int = 100,
+    ):
+        self._send = send
+        self.groups = groups
+        self.min_interval = min_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queues: Dict[str, asyncio.Queue] = {group: asyncio.Queue(maxsize=queue_size) for group in groups}
+        self._group_last_sent: Dict[str, float] = {}
+        self.sent = 0
+        self.failed = 0
+        # 因群聊队列已满而丢弃的 (消息, 群聊) 数
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+    def submit(self, message: str) -> bool:
+        """放入每个群聊的队列，全部成功时返回 True；队列已满的群聊会丢弃这条消息。"""
+        accepted = True
+        for queue in self._queues.values():
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                accepted = False
+        return accepted
+
+    async def _send_to_group(self, group: str, message: str):
+        wait = self._group_last_sent.get(group, float("-inf")) + self.min_interval - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        for attempt in range(self.retries):
+            try:
+                await self._send(group, message)
+                self.sent += 1
+                return
+            except Exception as e:
+                self.last_error = f"{group}: {e}"
+                if attempt + 1 < self.retries:
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+            finally:
+                self._group_last_sent[group] = time.monotonic()
+        self.failed += 1
+
+    async def _group_worker(self, group: str, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            try:
+                await self._send_to_group(group, message)
+            finally:
+                queue.task_done()
+
+    async def run(self):
+        workers = [asyncio.create_task(self._group_worker(group, queue)) for group, queue in self._queues.items()]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def drain(self):
+        """等待所有群聊队列中已提交的消息全部处理完毕。"""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
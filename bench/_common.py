@@ -0,0 +1,72 @@
+# 基准测试公共工具：将插件目录注册为 astrbot_plugin_temp 包，使基准脚本无需安装即可导入插件模块
+import pathlib
+import sys
+import time
+import types
+
+PLUGIN_ROOT = pathlib.Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "astrbot_plugin_temp"
+
+if PACKAGE_NAME not in sys.modules:
+    _pkg = types.ModuleType(PACKAGE_NAME)
+    _pkg.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = _pkg
+
+SAMPLE_SENSORS_OUTPUT = """\
+iwlwifi_1-virtual-0
+Adapter: Virtual device
+temp1:        +51.0°C
+
+acpitz-acpi-0
+Adapter: ACPI interface
+temp1:        +27.8°C
+
+coretemp-isa-0000
+Adapter: ISA adapter
+Package id 0:  +46.0°C  (high = +100.0°C, crit = +100.0°C)
+Core 0:        +44.0°C  (high = +100.0°C, crit = +100.0°C)
+Core 1:        +45.0°C  (high = +100.0°C, crit = +100.0°C)
+Core 2:        +43.0°C  (high = +100.0°C, crit = +100.0°C)
+Core 3:        +46.0°C  (high = +100.0°C, crit = +100.0°C)
+
+nvme-pci-0100
+Adapter: PCI adapter
+Composite:    +48.9°C  (low  = -273.1°C, high = +84.8°C)
+                       (crit = +84.8°C)
+Sensor 1:     +48.9°C  (low  = -273.1°C, high = +65261.8°C)
+"""
+
+
+def build_fake_sysfs(root: pathlib.Path, temps=None) -> pathlib.Path:
+    """
+    在 root 下创建一个与 SAMPLE_SENSORS_OUTPUT 对应的最小 sysfs 目录树。
+    """
+    temps = temps or {"coretemp": 46000, "acpitz": 27800, "iwlwifi_1": 51000, "nvme": 48900}
+    labels = {"coretemp": "Package id 0", "nvme": "Composite"}
+    for index, (chip, value) in enumerate(temps.items()):
+        hwmon = root / "class" / "hwmon" / f"hwmon{index}"
+        hwmon.mkdir(parents=True, exist_ok=True)
+        (hwmon / "name").write_text(chip + "\n")
+        (hwmon / "temp1_input").write_text(f"{value}\n")
+        if chip in labels:
+            (hwmon / "temp1_label").write_text(labels[chip] + "\n")
+    return root
+
+
+def report(name: str, samples, unit: str = "us"):
+    scale = {"us": 1e6, "ms": 1e3}[unit]
+    samples = sorted(samples)
+    n = len(samples)
+    p50 = samples[n // 2] * scale
+    p95 = samples[min(n - 1, int(n * 0.95))] * scale
+    mean = sum(samples) / n * scale
+    print(f"{name:<40} n={n:<6} mean={mean:9.2f}{unit}  p50={p50:9.2f}{unit}  p95={p95:9.2f}{unit}")
+
+
+def timeit(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
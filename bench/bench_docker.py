@@ -0,0 +1,72 @@
+"""
+在伪造的 Docker 守护进程上对比串行与并发获取容器统计信息的耗时。
+
+用法: python bench/bench_docker.py [--containers M] [--stats-delay S] [--concurrency C]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import _common
+from fake_docker import FakeDockerDaemon
+from astrbot_plugin_temp.docker_client import DockerClient, calculate_cpu_percent
+from astrbot_plugin_temp.docker_monitor import DockerStatsMonitor, sparkline
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "docker.sock")
+        # 一个容器额外卡住 10 秒，用于验证单容器超时不会拖慢整体结果
+        daemon = FakeDockerDaemon(socket_path, args.containers, args.stats_delay, slow={"app0": 10})
+        await daemon.start()
+        client = DockerClient(f"unix://{socket_path}")
+        try:
+            containers = await client.list_containers(all=True)
+            running = [c["Id"] for c in containers if c["State"] == "running"]
+            print(f"容器总数: {len(containers)}, 运行中: {len(running)}")
+
+            start = time.perf_counter()
+            results = await client.stats_many(
+                running, concurrency=args.concurrency, timeout=args.stats_delay + 2
+            )
+            elapsed = time.perf_counter() - start
+            missing = sum(1 for value in results.values() if value is None)
+            sample = next(value for value in results.values() if value)
+            print(f"并发 stats_many: {elapsed:.2f}s, 超时/失败 {missing} 个, 示例 CPU {calculate_cpu_percent(sample)}%")
+            serial_estimate = len(running) * args.stats_delay + 10
+            print(f"串行 stats(stream=False) 预计: {serial_estimate:.2f}s")
+
+            # 后台监控：事件流 + 每容器 stats 流，查询直接读取内存
+            monitor = DockerStatsMonitor(DockerClient(f"unix://{socket_path}", pool_size=0), ring_size=30)
+            monitor_task = asyncio.create_task(monitor.run())
+            await asyncio.sleep(daemon.stream_interval * 5)
+            snapshot_samples = _common.timeit(monitor.snapshot, 200)
+            _common.report("DockerStatsMonitor.snapshot", snapshot_samples)
+            first = next(c for c in monitor.snapshot() if c["latest"])
+            print(f"示例容器 {first['name']}: CPU {first['latest']['cpu_percent']}% 趋势 {sparkline(first['cpu_history'])}")
+
+            # 通过事件流感知容器状态变化
+            await client.stop_container("app1")
+            await asyncio.sleep(0.1)
+            print(f"停止 app1 后监控中的状态: {next(c['state'] for c in monitor.snapshot() if c['name'] == 'app1')}")
+            monitor_task.cancel()
+            await asyncio.gather(monitor_task, return_exceptions=True)
+            await monitor.close()
+            await monitor.client.close()
+        finally:
+            await client.close()
+            await daemon.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--containers", type=int, default=40)
+    parser.add_argument("--stats-delay", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+在包含大量芯片的 `sensors` 输出上对比旧版逐行嵌套循环解析、编译后的文本解析以及 `sensors -j` JSON 解析。
+
+用法: python bench/bench_parser.py [--sockets N] [--disks N] [--other-chips N] [--repeat N]
+"""
+import argparse
+import json
+
+import _common
+from astrbot_plugin_temp.sensor_reader import SensorMap, parse_sensors_json, parse_sensors_output
+
+
+def legacy_parse(output: str):
+    """插件早期版本的解析逻辑：每行遍历所有段名前缀，每个设备只取第一个温度。"""
+    data_dict = {}
+    current_section_map = {"coretemp-isa": "CPU", "acpitz-acpi": "主板", "iwlwifi": "网卡", "nvme-pci": "硬盘"}
+    current_section_name = None
+    for line in output.splitlines():
+        line_stripped = line.strip()
+        for key, name in current_section_map.items():
+            if line_stripped.startswith(key):
+                current_section_name = name
+                break
+        temp_str = ""
+        if current_section_name == "CPU" and "Package id 0:" in line_stripped:
+            temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
+        elif current_section_name in ("主板", "网卡") and "temp1:" in line_stripped:
+            temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
+        elif current_section_name == "硬盘" and "Composite:" in line_stripped:
+            temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
+        if temp_str:
+            try:
+                data_dict[current_section_name] = float(temp_str.lstrip('+').replace("°C", ""))
+                current_section_name = None
+            except (ValueError, IndexError):
+                continue
+    return data_dict
+
+
+def build_outputs(sockets: int, cores: int, disks: int, other_chips: int):
+    """构造对应的文本输出与 JSON 输出。"""
+    chips = {}
+    for socket in range(sockets):
+        features = {f"Package id {socket}": 45.0 + socket}
+        for core in range(cores):
+            features[f"Core {core}"] = 40.0 + core % 10
+        chips[f"coretemp-isa-{socket:04d}"] = ("ISA adapter", features)
+    chips["acpitz-acpi-0"] = ("ACPI interface", {"temp1": 27.8, "temp2": 29.8})
+    chips["iwlwifi_1-virtual-0"] = ("Virtual device", {"temp1": 51.0})
+    for disk in range(disks):
+        chips[f"nvme-pci-{disk:02x}00"] = ("PCI adapter", {"Composite": 40.0 + disk % 20, "Sensor 1": 39.0, "Sensor 2": 41.0})
+    for index in range(other_chips):
+        chips[f"nct6798-isa-{index:04x}"] = ("ISA adapter", {f"SYSTIN{n}": 30.0 + n for n in range(6)})
+
+    text_lines = []
+    json_data = {}
+    for chip, (adapter, features) in chips.items():
+        text_lines.append(chip)
+        text_lines.append(f"Adapter: {adapter}")
+        json_chip = {"Adapter": adapter}
+        for number, (label, value) in enumerate(features.items(), start=1):
+            text_lines.append(f"{label + ':':<14}+{value:.1f}°C  (high = +100.0°C, crit = +100.0°C)")
+            text_lines.append(f"{'':<23}(crit alarm)")
+            json_chip[label] = {f"temp{number}_input": value, f"temp{number}_max": 100.0, f"temp{number}_crit": 100.0}
+        # 风扇与电压行，解析器需要跳过
+        text_lines.append("fan1:         1200 RPM  (min =    0 RPM)")
+        text_lines.append("in0:           1.02 V  (min =  +0.00 V, max =  +1.74 V)")
+        text_lines.append("")
+        json_data[chip] = json_chip
+    return "\n".join(text_lines), json.dumps(json_data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sockets", type=int, default=2)
+    parser.add_argument("--cores", type=int, default=64)
+    parser.add_argument("--disks", type=int, default=24)
+    parser.add_argument("--other-chips", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    text, json_text = build_outputs(args.sockets, args.cores, args.disks, args.other_chips)
+    sensor_map = SensorMap()
+    print(f"文本输出 {len(text.splitlines())} 行 / {len(text)} 字节，JSON {len(json_text)} 字节")
+    legacy = legacy_parse(text)
+    compiled = parse_sensors_output(text, sensor_map)
+    from_json = parse_sensors_json(json_text, sensor_map)
+    assert compiled == from_json, "文本与 JSON 解析结果不一致"
+    print(f"旧版解析得到 {len(legacy)} 个设备，新版解析得到 {len(compiled)} 个设备")
+
+    _common.report("旧版嵌套循环解析", _common.timeit(lambda: legacy_parse(text), args.repeat))
+    _common.report("编译后的文本解析", _common.timeit(lambda: parse_sensors_output(text, sensor_map), args.repeat))
+    _common.report("sensors -j JSON 解析", _common.timeit(lambda: parse_sensors_json(json_text, sensor_map), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
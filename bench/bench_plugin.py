@@ -0,0 +1,175 @@
+"""
+在伪造的传感器、Docker 守护进程与消息发送通道上运行完整的插件，测量：
+- 指令延迟：N 个并发聊天请求下 /temp、/status、/containers 的响应时间 (M 个容器)
+- 事件循环阻塞：指令测量期间事件循环的调度延迟
+- 温度监控：按自适应采样调度回放温度曲线，统计采样次数、产生的告警以及超过阈值到发出告警的延迟
+- 告警发送：G 个群聊、每次发送耗时 S 秒时告警发送流水线的吞吐量
+
+插件的 main.py 依赖 AstrBot，需要在安装了 AstrBot 的环境中运行。
+
+用法: python bench/bench_plugin.py [-n 并发请求数] [-m 容器数] [--rounds R] [--sensor-source sysfs|sensors]
+                                  [--groups G] [--alerts B] [--send-latency S] [--trace 曲线文件]
+"""
+import argparse
+import asyncio
+import pathlib
+import tempfile
+import time
+
+import _common
+from harness import TRACES_DIR, MockContext, MockEvent, PluginHarness, ThermalTrace, invoke
+from astrbot_plugin_temp.metrics import LoopLagMonitor
+
+COMMANDS = (
+    ("/temp", "get_server_temp_command"),
+    ("/status", "get_server_status_command"),
+    ("/containers", "get_docker_containers_command"),
+)
+
+
+async def bench_commands(harness: PluginHarness, args):
+    plugin = harness.plugin
+    await harness.wait_docker_ready()
+
+    for command, attr in COMMANDS:
+        handler = getattr(plugin, attr)
+        samples = []
+        kinds = set()
+
+        async def one():
+            start = time.perf_counter()
+            replies = await invoke(handler, MockEvent(command))
+            samples.append(time.perf_counter() - start)
+            kinds.update(reply.kind for reply in replies)
+
+        for round_index in range(args.rounds):
+            harness.set_time(round_index * harness.trace.duration / args.rounds)
+            # 每轮开始时让采样缓存失效，保证每轮至少有一次真实采样
+            harness.invalidate_samples()
+            await asyncio.gather(*(one() for _ in range(args.concurrency)))
+        _common.report(f"{command} x{args.concurrency} 并发 ({'/'.join(sorted(kinds))})", samples, "ms")
+
+
+async def replay_trace(harness: PluginHarness):
+    """
+    通过插件自身的 monitor_once() 回放温度曲线：读取传感器、更新趋势、判定告警、提交发送，
+    时间取自温度曲线，下一次采样时刻由自适应调度器决定，整段曲线在几十毫秒内回放完。
+    """
+    trace = harness.trace
+    start = time.perf_counter()
+    samples, timeline = await harness.replay()
+    elapsed = time.perf_counter() - start
+    await harness.dispatcher.drain()
+
+    fixed = harness.config.get("check_interval_minutes", 5) * 60
+    fastest = harness.config.get("monitor_min_interval_seconds", 15)
+    print(f"回放 {trace.duration:g}s 温度曲线：自适应采样 {samples} 次 "
+          f"(固定 {fixed:g}s 间隔为 {int(trace.duration // fixed) + 1} 次，"
+          f"固定 {fastest:g}s 间隔为 {int(trace.duration // fastest) + 1} 次)，"
+          f"耗时 {elapsed * 1000:.0f} ms")
+    for at, alert in timeline:
+        print(f"  t={at:6.0f}s  {alert.kind:<9} {alert.device:<12} {alert.temp:5.1f}°C  "
+              f"阈值 {alert.threshold}°C  斜率 {alert.slope:+.2f}°C/min")
+    for device in trace.devices:
+        threshold = harness.config["thresholds"].get(device)
+        crossing = next(
+            (at for at, frame in zip(trace.times, trace.frames) if threshold is not None and frame[device] >= threshold),
+            None,
+        )
+        if crossing is None:
+            continue
+        first_warning = next((at for at, alert in timeline if alert.device == device), None)
+        if first_warning is None:
+            print(f"  {device}: t={crossing:g}s 超过阈值，但没有产生告警")
+        else:
+            print(f"  {device}: t={crossing:g}s 超过阈值，首次告警/预警相对提前 {crossing - first_warning:+.0f}s")
+
+
+async def bench_dispatcher(harness: PluginHarness, args):
+    dispatcher = harness.dispatcher
+    context = harness.context
+    before = len(context.sent)
+    start = time.perf_counter()
+    submitted = sum(dispatcher.submit(f"基准测试告警 #{index}") for index in range(args.alerts))
+    await dispatcher.drain()
+    elapsed = time.perf_counter() - start
+    delivered = len(context.sent) - before
+    serial = submitted * len(dispatcher.groups) * args.send_latency
+    print(f"告警发送：{submitted} 条 x {len(dispatcher.groups)} 个群聊，送达 {delivered}，"
+          f"失败 {dispatcher.failed}，丢弃 {dispatcher.dropped}，耗时 {elapsed:.2f}s "
+          f"({delivered / elapsed:.0f} 条/秒，逐条串行发送约需 {serial:.1f}s)")
+
+
+async def run(args):
+    trace = ThermalTrace.load(args.trace)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        (tmp / "commands").mkdir()
+        (tmp / "alerts").mkdir()
+
+        print(f"--- 指令延迟：{args.containers} 个容器，传感器来源 {args.sensor_source} ---")
+        harness = PluginHarness(
+            tmp / "commands", trace,
+            containers=args.containers,
+            sensor_source=args.sensor_source,
+            render_latency=args.render_latency,
+            config={"render_cache_size": 0 if args.no_render_cache else 16},
+        )
+        await harness.start()
+        lag = LoopLagMonitor(interval=0.005, threshold=args.block_threshold / 1000)
+        lag_task = asyncio.create_task(lag.run())
+        try:
+            await bench_commands(harness, args)
+        finally:
+            lag_task.cancel()
+            await asyncio.gather(lag_task, return_exceptions=True)
+            histogram = lag.histogram
+            print(f"事件循环延迟：p50 {histogram.percentile(0.5) * 1000:.1f} ms，p99 {histogram.percentile(0.99) * 1000:.1f} ms，"
+                  f"最大 {histogram.max * 1000:.1f} ms，超过 {args.block_threshold:g} ms 共 {lag.blocked} 次")
+            print("插件热点路径耗时：")
+            for item in harness.perf_summary():
+                print(f"  {item['name']:<24} n={item['count']:<6} p50={item['p50'] * 1000:8.2f}ms  "
+                      f"p99={item['p99'] * 1000:8.2f}ms  max={item['max'] * 1000:8.2f}ms")
+            await harness.stop()
+
+        print(f"\n--- 温度监控与告警：{args.groups} 个群聊，单次发送 {args.send_latency * 1000:.0f} ms ---")
+        harness = PluginHarness(
+            tmp / "alerts", trace,
+            containers=0,
+            sensor_source=args.sensor_source,
+            context=MockContext(latency=args.send_latency, failure_rate=args.failure_rate),
+            config={
+                "docker_monitor_enabled": False,
+                "alert_groups": [f"bench:GroupMessage:{index}" for index in range(args.groups)],
+                "alert_group_min_interval_seconds": 0,
+                # 回放时每一轮都需要真实采样
+                "sample_ttl_seconds": 0,
+            },
+        )
+        await harness.start()
+        try:
+            await replay_trace(harness)
+            await bench_dispatcher(harness, args)
+        finally:
+            await harness.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--concurrency", type=int, default=20, help="每轮并发的聊天请求数")
+    parser.add_argument("-m", "--containers", type=int, default=20, help="伪造的容器数量")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--sensor-source", choices=("sysfs", "sensors"), default="sysfs")
+    parser.add_argument("--render-latency", type=float, default=0.3, help="模拟的图片渲染耗时 (秒)")
+    parser.add_argument("--no-render-cache", action="store_true")
+    parser.add_argument("--block-threshold", type=float, default=20, help="事件循环阻塞的判定阈值 (毫秒)")
+    parser.add_argument("--groups", type=int, default=10, help="告警群聊数量")
+    parser.add_argument("--alerts", type=int, default=50, help="告警发送基准中提交的告警条数")
+    parser.add_argument("--send-latency", type=float, default=0.05, help="模拟的单次消息发送耗时 (秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="模拟的消息发送失败率")
+    parser.add_argument("--trace", default=str(TRACES_DIR / "stress_run.csv"))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
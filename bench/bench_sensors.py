@@ -0,0 +1,73 @@
+"""
+对比 sysfs 读取器与 `sensors` 子进程 + 文本解析两条温度读取路径的耗时。
+
+用法: python bench/bench_sensors.py [--repeat N]
+"""
+import argparse
+import asyncio
+import pathlib
+import stat
+import sys
+import tempfile
+import time
+
+import _common
+from astrbot_plugin_temp.sensor_reader import SysfsTemperatureReader, parse_sensors_output
+
+
+async def _sensors_subprocess(binary: str):
+    process = await asyncio.create_subprocess_exec(
+        binary, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await process.communicate()
+    return parse_sensors_output(stdout.decode("utf-8"))
+
+
+async def _bench_subprocess(binary: str, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await _sensors_subprocess(binary)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = pathlib.Path(tmp)
+        sysfs_root = _common.build_fake_sysfs(tmp_path / "sys")
+
+        # 伪造的 sensors 可执行文件，只负责输出录制好的文本
+        output_file = tmp_path / "sensors.txt"
+        output_file.write_text(_common.SAMPLE_SENSORS_OUTPUT)
+        fake_sensors = tmp_path / "sensors"
+        fake_sensors.write_text(f"#!/bin/sh\ncat '{output_file}'\n")
+        fake_sensors.chmod(fake_sensors.stat().st_mode | stat.S_IEXEC)
+
+        reader = SysfsTemperatureReader(str(sysfs_root))
+        opened = reader.open()
+        sysfs_result = reader.read()
+        parsed_result = parse_sensors_output(_common.SAMPLE_SENSORS_OUTPUT)
+        if sysfs_result != parsed_result:
+            print(f"结果不一致: sysfs={sysfs_result} sensors={parsed_result}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"sysfs 设备数: {opened}, 读取结果: {sysfs_result}")
+        _common.report("sysfs pread", _common.timeit(reader.read, args.repeat))
+        _common.report(
+            "parse_sensors_output (仅解析)",
+            _common.timeit(lambda: parse_sensors_output(_common.SAMPLE_SENSORS_OUTPUT), args.repeat),
+        )
+        _common.report(
+            "sensors 子进程 + 解析",
+            asyncio.run(_bench_subprocess(str(fake_sensors), args.repeat)),
+        )
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
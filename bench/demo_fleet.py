@@ -0,0 +1,112 @@
+"""
+在本机启动插件侧的 agent 接收端与多个 agent (各自使用伪造的 sysfs，其中一个连接伪造的 Docker 守护进程)，
+验证批量上报、断线重连与增量聚合，并测量聚合器单条快照的写入耗时。
+
+用法: python bench/demo_fleet.py [--agents N] [--seconds S] [--hosts H]
+"""
+import argparse
+import asyncio
+import pathlib
+import random
+import tempfile
+import time
+
+import _common
+from fake_docker import FakeDockerDaemon
+from astrbot_plugin_temp.agent import HostAgent
+from astrbot_plugin_temp.fleet import FleetAggregator, FleetServer
+
+THRESHOLDS = {"CPU": 85.0, "Motherboard": 60.0, "WIFI": 80.0, "NVMe": 70.0}
+TOKEN = "demo-token"
+
+
+def print_fleet(aggregator: FleetAggregator):
+    now = time.time()
+    print(f"主机 {len(aggregator.hosts)} 台，在线 {aggregator.online_count(now)} 台，"
+          f"容器 {aggregator.containers_running}/{aggregator.containers_total} 运行中，"
+          f"高温主机 {sorted(aggregator.hot_hosts)}")
+    for state in aggregator.rows():
+        max_temp = f"{state.max_temp[0]} {state.max_temp[1]:.1f}°C" if state.max_temp else "-"
+        print(f"  {state.name:<10} {'在线' if aggregator.is_online(state, now) else '离线':<4} "
+              f"快照 {state.snapshots:<4} 最高 {max_temp:<16} CPU {state.cpu_percent}% 内存 {state.mem_percent}%")
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        daemon = FakeDockerDaemon(str(tmp / "docker.sock"), containers=6, stats_delay=0.05, stream_interval=0.5)
+        await daemon.start()
+
+        aggregator = FleetAggregator(THRESHOLDS, stale_seconds=5)
+        server = FleetServer(aggregator, TOKEN, "127.0.0.1", 0)
+        await server.start()
+        port = server.sockets[0].getsockname()[1]
+
+        agents = []
+        for index in range(args.agents):
+            # 最后一台主机的 CPU 温度超过阈值
+            cpu_temp = 90000 if index == args.agents - 1 else 40000 + index * 1000
+            sysfs = _common.build_fake_sysfs(
+                tmp / f"sysfs{index}", {"coretemp": cpu_temp, "acpitz": 30000, "nvme": 45000}
+            )
+            agents.append(HostAgent(
+                "127.0.0.1", port, TOKEN, name=f"host{index}", interval=0.2, flush_interval=1,
+                sysfs_root=str(sysfs), docker=index == 0, docker_host=f"unix://{tmp / 'docker.sock'}",
+            ))
+        # 使用错误令牌的 agent 应被拒绝
+        intruder = HostAgent("127.0.0.1", port, "wrong", name="intruder", docker=False, sysfs_root=str(tmp))
+        tasks = [asyncio.create_task(agent.run()) for agent in agents + [intruder]]
+
+        await asyncio.sleep(args.seconds)
+        print(f"--- 运行 {args.seconds}s 后 ---")
+        print_fleet(aggregator)
+        print(f"批次 {server.batches}，快照 {server.snapshots}，拒绝 {server.rejected} ({server.last_error})")
+
+        # 断开所有连接，agent 应自动重连并补发断线期间的快照
+        print("--- 重启接收端 ---")
+        await server.stop()
+        await asyncio.sleep(1.5)
+        server = FleetServer(aggregator, TOKEN, "127.0.0.1", port)
+        await server.start()
+        await asyncio.sleep(args.seconds)
+        print_fleet(aggregator)
+        print(f"重连后批次 {server.batches}，快照 {server.snapshots}")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.stop()
+        await daemon.stop()
+
+    # 聚合器写入耗时：模拟 H 台主机、每台 20 个容器的快照
+    aggregator = FleetAggregator(THRESHOLDS)
+    containers = [[f"app{i}", "running", 1.5, 100 << 20, 1 << 30] for i in range(20)]
+    snapshots = [
+        {"ts": time.time(), "temps": {"CPU": random.uniform(40, 90), "NVMe": 45.0, "NVMe#2": 47.0},
+         "cpu": 12.0, "load": [0.5, 0.4, 0.3], "mem": [4 << 30, 16 << 30], "containers": containers}
+        for _ in range(args.hosts)
+    ]
+    samples = []
+    for round_index in range(50):
+        for index, snapshot in enumerate(snapshots):
+            start = time.perf_counter()
+            aggregator.ingest(f"host{index}", dict(snapshot, ts=snapshot["ts"] + round_index))
+            samples.append(time.perf_counter() - start)
+    _common.report(f"FleetAggregator.ingest ({args.hosts} 台主机)", samples)
+    start = time.perf_counter()
+    rows = aggregator.rows()
+    _common.report("FleetAggregator.rows", [time.perf_counter() - start])
+    print(f"容器 {aggregator.containers_running}/{aggregator.containers_total}，高温主机 {len(aggregator.hot_hosts)} 台，"
+          f"列表 {len(rows)} 行")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--hosts", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+本地伪造的 Docker Engine API 服务器 (Unix socket)，用于在没有 Docker 守护进程的环境下测试和基准测试。
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+
+class FakeDockerDaemon:
+    def __init__(
+        self, socket_path: str, containers: int = 10, stats_delay: float = 1.0,
+        slow: Optional[Dict[str, float]] = None, stream_interval: float = 1.0,
+    ):
+        self.socket_path = socket_path
+        self.stats_delay = stats_delay
+        self.stream_interval = stream_interval
+        self._subscribers: List[asyncio.Queue] = []
+        # 容器名 -> 额外的统计延迟，用于模拟个别卡住的容器
+        self.slow = slow or {}
+        self.containers: Dict[str, Dict] = {}
+        self.requests: List[str] = []
+        self._tick = 0
+        self._closing = False
+        for index in range(containers):
+            self.add_container(f"app{index}", running=index % 5 != 4)
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_container(self, name: str, running: bool = True, labels: Optional[Dict[str, str]] = None) -> str:
+        container_id = f"{len(self.containers):012x}".ljust(64, "0")
+        self.containers[container_id] = {"name": name, "running": running, "labels": labels or {}}
+        return container_id
+
+    def emit(self, container_id: str, action: str):
+        # 与真实的守护进程一致，Attributes 包含容器标签以及 name、image 字段
+        info = self.containers.get(container_id, {})
+        attributes = {**info.get("labels", {}), "name": info.get("name", ""), "image": "fake:latest"}
+        if action == "die":
+            attributes["exitCode"] = "0"
+        event = {
+            "Type": "container",
+            "Action": action,
+            "Actor": {"ID": container_id, "Attributes": attributes},
+            "time": int(time.time()),
+        }
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def _resolve(self, key: str) -> Optional[str]:
+        for container_id, info in self.containers.items():
+            if key in (container_id, container_id[:12], info["name"]):
+                return container_id
+        return None
+
+    def _stats(self, container_id: str) -> Dict:
+        self._tick += 1
+        base = int(container_id[:12], 16) + 1
+        return {
+            "read": "2026-01-01T00:00:00Z",
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": 2_000_000 * self._tick * base + 500_000 * (self._tick % 7)},
+                "system_cpu_usage": 100_000_000 * self._tick,
+                "online_cpus": 4,
+            },
+            "precpu_stats": {
+                "cpu_usage": {"total_usage": 2_000_000 * (self._tick - 1) * base + 500_000 * ((self._tick - 1) % 7)},
+                "system_cpu_usage": 100_000_000 * (self._tick - 1),
+            },
+            "memory_stats": {"usage": 64 * 1024**2 * base, "limit": 8 * 1024**3},
+        }
+
+    async def _list(self, request: web.Request):
+        self.requests.append("list")
+        show_all = request.query.get("all") in ("1", "true")
+        result = []
+        for container_id, info in self.containers.items():
+            if not show_all and not info["running"]:
+                continue
+            result.append({
+                "Id": container_id,
+                "Names": ["/" + info["name"]],
+                "State": "running" if info["running"] else "exited",
+                "Labels": info["labels"],
+            })
+        return web.json_response(result)
+
+    async def _inspect(self, request: web.Request):
+        container_id = self._resolve(request.match_info["id"])
+        if container_id is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        info = self.containers[container_id]
+        return web.json_response({
+            "Id": container_id,
+            "Name": "/" + info["name"],
+            "State": {"Running": info["running"], "Status": "running" if info["running"] else "exited"},
+            "Config": {"Labels": info["labels"]},
+        })
+
+    async def _container_stats(self, request: web.Request):
+        container_id = self._resolve(request.match_info["id"])
+        if container_id is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        if request.query.get("stream") in ("1", "true"):
+            return await self._stream_stats(request, container_id)
+        self.requests.append("stats")
+        name = self.containers[container_id]["name"]
+        # 真实守护进程在 stream=false 时需要等待第二次采样
+        await asyncio.sleep(self.stats_delay + self.slow.get(name, 0))
+        return web.json_response(self._stats(container_id))
+
+    async def _stream_stats(self, request: web.Request, container_id: str):
+        self.requests.append("stats_stream")
+        response = web.StreamResponse()
+        await response.prepare(request)
+        try:
+            while not self._closing and container_id in self.containers and self.containers[container_id]["running"]:
+                await response.write((json.dumps(self._stats(container_id)) + "\n").encode())
+                await asyncio.sleep(self.stream_interval)
+        except ConnectionResetError:
+            # 客户端断开连接
+            pass
+        return response
+
+    async def _events(self, request: web.Request):
+        self.requests.append("events")
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    # stop() 发出的结束信号
+                    return response
+                await response.write((json.dumps(event) + "\n").encode())
+        except ConnectionResetError:
+            return response
+        finally:
+            self._subscribers.remove(queue)
+
+    async def _action(self, request: web.Request):
+        container_id = self._resolve(request.match_info["id"])
+        if container_id is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        action = request.match_info["action"]
+        self.requests.append(action)
+        info = self.containers[container_id]
+        if action == "start":
+            if info["running"]:
+                return web.Response(status=304)
+            info["running"] = True
+            self.emit(container_id, "start")
+        elif action == "stop":
+            if not info["running"]:
+                return web.Response(status=304)
+            info["running"] = False
+            self.emit(container_id, "die")
+        elif action == "restart":
+            info["running"] = True
+            self.emit(container_id, "die")
+            self.emit(container_id, "start")
+        return web.Response(status=204)
+
+    async def _remove(self, request: web.Request):
+        container_id = self._resolve(request.match_info["id"])
+        if container_id is None:
+            return web.json_response({"message": "No such container"}, status=404)
+        if self.containers[container_id]["running"]:
+            return web.json_response({"message": "container is running"}, status=409)
+        del self.containers[container_id]
+        self.emit(container_id, "destroy")
+        return web.Response(status=204)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/events", self._events)
+        app.router.add_get("/containers/json", self._list)
+        app.router.add_get("/containers/{id}/json", self._inspect)
+        app.router.add_get("/containers/{id}/stats", self._container_stats)
+        app.router.add_post("/containers/{id}/{action}", self._action)
+        app.router.add_delete("/containers/{id}", self._remove)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.UnixSite(self._runner, self.socket_path).start()
+
+    async def stop(self):
+        # 结束所有 stats 流与事件流，模拟守护进程退出
+        self._closing = True
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        if self._runner is not None:
+            await self._runner.cleanup()
+
@@ -0,0 +1,359 @@
+"""
+离线仿真工具：回放录制的温度曲线 (伪造的 sysfs 目录树或伪造的 `sensors` 可执行文件)，
+配合 fake_docker.FakeDockerDaemon 与模拟的 Context.send_message，在没有真实硬件与 Docker 的环境下运行插件。
+
+温度曲线为 CSV 文件，第一列 t 为相对时间 (秒)，其余列为设备键对应的温度 (°C)，见 traces/stress_run.csv。
+在真实服务器上录制温度曲线：
+    python bench/harness.py record --seconds 600 --interval 5 -o bench/traces/my_server.csv
+
+PluginHarness 需要导入插件的 main.py，因此只能在安装了 AstrBot 的环境中使用；其余工具不依赖 AstrBot。
+"""
+import argparse
+import asyncio
+import bisect
+import csv
+import json
+import os
+import pathlib
+import random
+import stat
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import _common
+from fake_docker import FakeDockerDaemon
+from astrbot_plugin_temp.sensor_reader import SysfsTemperatureReader, split_device_key
+
+TRACES_DIR = pathlib.Path(__file__).resolve().parent / "traces"
+
+# 设备键 -> (hwmon 名称, `sensors` 芯片段名, 传感器标签, 适配器)，与默认传感器映射规则一致
+DEVICE_CHIPS: Dict[str, Tuple[str, str, str, str]] = {
+    "CPU": ("coretemp", "coretemp-isa-0000", "Package id 0", "ISA adapter"),
+    "Motherboard": ("acpitz", "acpitz-acpi-0", "temp1", "ACPI interface"),
+    "WIFI": ("iwlwifi_1", "iwlwifi_1-virtual-0", "temp1", "Virtual device"),
+    "NVMe": ("nvme", "nvme-pci-0100", "Composite", "PCI adapter"),
+    "GPU": ("amdgpu", "amdgpu-pci-0300", "edge", "PCI adapter"),
+}
+
+
+def _chip_for(device: str) -> Tuple[str, str, str, str]:
+    """返回设备键对应的伪造芯片信息，NVMe#2 等多实例设备使用带序号的芯片段名。"""
+    base, index = split_device_key(device)
+    if base not in DEVICE_CHIPS:
+        raise ValueError(f"无法为设备 {device} 伪造传感器，支持的设备: {', '.join(DEVICE_CHIPS)}")
+    hwmon_name, chip, label, adapter = DEVICE_CHIPS[base]
+    return hwmon_name, chip if index == 1 else f"{chip}-{index}", label, adapter
+
+
+class ThermalTrace:
+    """按时间排序的温度帧，at(t) 在相邻两帧之间线性插值。"""
+
+    def __init__(self, times: List[float], frames: List[Dict[str, float]]):
+        if not times:
+            raise ValueError("温度曲线为空")
+        self.times = times
+        self.frames = frames
+        self.devices = list(frames[0])
+
+    @property
+    def duration(self) -> float:
+        return self.times[-1]
+
+    @classmethod
+    def load(cls, path) -> "ThermalTrace":
+        times, frames = [], []
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                times.append(float(row.pop("t")))
+                frames.append({key: float(value) for key, value in row.items() if value != ""})
+        return cls(times, frames)
+
+    def save(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["t"] + self.devices)
+            for t, frame in zip(self.times, self.frames):
+                writer.writerow([f"{t:g}"] + [f"{frame.get(key, ''):.1f}" for key in self.devices])
+
+    def at(self, t: float) -> Dict[str, float]:
+        if t <= self.times[0]:
+            return dict(self.frames[0])
+        if t >= self.times[-1]:
+            return dict(self.frames[-1])
+        index = bisect.bisect_right(self.times, t)
+        t0, t1 = self.times[index - 1], self.times[index]
+        ratio = (t - t0) / (t1 - t0)
+        before, after = self.frames[index - 1], self.frames[index]
+        return {key: round(before[key] + (after[key] - before[key]) * ratio, 1) for key in before if key in after}
+
+    @classmethod
+    def record(cls, reader: SysfsTemperatureReader, seconds: float, interval: float) -> "ThermalTrace":
+        """按固定间隔读取真实传感器，生成一段温度曲线。"""
+        times, frames = [], []
+        start = time.monotonic()
+        while True:
+            elapsed = time.monotonic() - start
+            times.append(round(elapsed, 1))
+            frames.append(reader.read())
+            if elapsed + interval > seconds:
+                break
+            time.sleep(interval)
+        return cls(times, frames)
+
+
+class FakeSysfs:
+    """每个设备一个 hwmon 目录；update() 原地改写 temp1_input，已打开的文件描述符能读到新值。"""
+
+    def __init__(self, root: pathlib.Path, devices: List[str]):
+        self.root = root
+        self._inputs: Dict[str, pathlib.Path] = {}
+        for index, device in enumerate(devices):
+            hwmon_name, _, label, _ = _chip_for(device)
+            hwmon = root / "class" / "hwmon" / f"hwmon{index}"
+            hwmon.mkdir(parents=True, exist_ok=True)
+            (hwmon / "name").write_text(hwmon_name + "\n")
+            (hwmon / "temp1_label").write_text(label + "\n")
+            (hwmon / "temp1_input").write_text("0\n")
+            self._inputs[device] = hwmon / "temp1_input"
+
+    def update(self, temps: Dict[str, float]):
+        for device, temp in temps.items():
+            self._inputs[device].write_text(f"{int(round(temp * 1000))}\n")
+
+
+class FakeSensorsBinary:
+    """
+    名为 sensors 的 shell 脚本，输出 update() 写入的最近一次温度 (支持 -j)。
+    把 directory 加到 PATH 最前面后，插件调用的 `sensors` 即为该脚本。
+    """
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self._text = directory / "sensors.txt"
+        self._json = directory / "sensors.json"
+        binary = directory / "sensors"
+        binary.write_text(
+            f"#!/bin/sh\nif [ \"$1\" = \"-j\" ]; then cat '{self._json}'; else cat '{self._text}'; fi\n"
+        )
+        binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+
+    def update(self, temps: Dict[str, float]):
+        text_sections, json_output = [], {}
+        for device, temp in temps.items():
+            _, chip, label, adapter = _chip_for(device)
+            text_sections.append(f"{chip}\nAdapter: {adapter}\n{label + ':':<14}+{temp:.1f}°C  (high = +100.0°C)\n")
+            json_output[chip] = {"Adapter": adapter, label: {"temp1_input": temp, "temp1_max": 100.0}}
+        # 先写临时文件再替换，脚本不会读到写了一半的内容
+        for path, content in ((self._text, "\n".join(text_sections)), (self._json, json.dumps(json_output))):
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(content)
+            os.replace(tmp, path)
+
+
+class MockContext:
+    """代替 AstrBot Context，只实现插件用到的 send_message，可模拟发送延迟与随机失败。"""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.sent: List[Tuple[float, str, str]] = []
+        self.failures = 0
+
+    async def send_message(self, unified_msg_origin: str, chain) -> bool:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.failures += 1
+            raise ConnectionError("模拟的消息发送失败")
+        text = "".join(getattr(component, "text", str(component)) for component in chain)
+        self.sent.append((time.monotonic(), unified_msg_origin, text))
+        return True
+
+
+@dataclass
+class MockResult:
+    kind: str
+    content: str
+
+
+class MockEvent:
+    """代替 AstrMessageEvent，plain_result / image_result 返回 MockResult 以便检查回复内容。"""
+
+    def __init__(self, message_str: str, sender: str = "bench", origin: str = "bench:GroupMessage:0"):
+        self.message_str = message_str
+        self.unified_msg_origin = origin
+        self._sender = sender
+
+    def get_sender_name(self) -> str:
+        return self._sender
+
+    def plain_result(self, text: str) -> MockResult:
+        return MockResult("plain", text)
+
+    def image_result(self, url: str) -> MockResult:
+        return MockResult("image", url)
+
+
+async def invoke(handler, event: MockEvent, *args) -> List[MockResult]:
+    """执行一个指令处理函数 (异步生成器) 并收集它产出的全部回复。"""
+    return [result async for result in handler(event, *args)]
+
+
+class PluginHarness:
+    """
+    在临时目录中搭建伪造的传感器与 Docker 守护进程，并创建一个插件实例。
+
+    sensor_source="sysfs" 时插件读取伪造的 sysfs 目录树；"sensors" 时插件调用伪造的 sensors 可执行文件。
+    html_render 被替换为固定延迟 render_latency 秒的假实现。
+    """
+
+    def __init__(
+        self,
+        workdir: pathlib.Path,
+        trace: ThermalTrace,
+        containers: int = 10,
+        sensor_source: str = "sysfs",
+        context: Optional[MockContext] = None,
+        config: Optional[Dict[str, Any]] = None,
+        render_latency: float = 0.2,
+        stats_delay: float = 0.05,
+    ):
+        self.workdir = workdir
+        self.trace = trace
+        self.sensor_source = sensor_source
+        self.context = context or MockContext()
+        self.render_latency = render_latency
+        self.renders = 0
+        self.daemon = FakeDockerDaemon(
+            str(workdir / "docker.sock"), containers, stats_delay=stats_delay, stream_interval=1.0
+        )
+        self.config = {
+            "enabled": False,
+            "history_enabled": False,
+            "metrics_exporter_enabled": False,
+            "fleet_enabled": False,
+            "docker_host": f"unix://{workdir / 'docker.sock'}",
+            "sensor_source": "sensors" if sensor_source == "sensors" else "auto",
+            "alert_groups": [],
+            "thresholds": {"CPU": 85.0, "Motherboard": 60.0, "WIFI": 80.0, "NVMe": 70.0, "GPU": 85.0},
+            **(config or {}),
+        }
+        if sensor_source == "sensors":
+            self._sink = FakeSensorsBinary(workdir)
+        else:
+            self._sink = FakeSysfs(workdir / "sys", trace.devices)
+        self._old_path = os.environ.get("PATH", "")
+        self.plugin = None
+
+    def set_time(self, t: float) -> Dict[str, float]:
+        """把伪造传感器的读数设为温度曲线在 t 时刻的值。"""
+        temps = self.trace.at(t)
+        self._sink.update(temps)
+        return temps
+
+    async def _fake_render(self, html: str, data: Dict[str, Any]) -> str:
+        self.renders += 1
+        await asyncio.sleep(self.render_latency)
+        return f"file://{self.workdir}/render_{self.renders}.png"
+
+    async def start(self):
+        # 插件模块依赖 AstrBot，延迟到这里才导入
+        from astrbot_plugin_temp.main import ServerTempPlugin
+
+        self.set_time(0)
+        if self.sensor_source == "sensors":
+            os.environ["PATH"] = f"{self.workdir}{os.pathsep}{self._old_path}"
+        await self.daemon.start()
+        plugin = ServerTempPlugin(self.context, self.config)
+        if self.sensor_source != "sensors":
+            # 插件固定读取 /sys，这里换成指向伪造目录树的读取器
+            if plugin._sysfs_reader is not None:
+                plugin._sysfs_reader.close()
+            plugin._sysfs_reader = SysfsTemperatureReader(str(self._sink.root), plugin._sensor_map)
+            plugin._sysfs_reader.open()
+        plugin.html_render = self._fake_render
+        self.plugin = plugin
+        return plugin
+
+    @property
+    def dispatcher(self):
+        """插件的告警发送器，用于等待发送完成与读取发送计数。"""
+        return self.plugin._alert_dispatcher
+
+    async def wait_docker_ready(self, timeout: float = 10):
+        """等待插件的后台 Docker 监控完成首次同步，之后的容器查询直接读取内存数据。"""
+        monitor = self.plugin._docker_monitor
+        deadline = time.monotonic() + timeout
+        while monitor is not None and not monitor.ready and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    def perf_summary(self) -> List[Dict[str, Any]]:
+        """插件热点路径的耗时统计，与 /perf 指令的数据相同。"""
+        return self.plugin._perf.summary()
+
+    def invalidate_samples(self):
+        """让插件的采样缓存失效，下一次查询一定进行真实采样。"""
+        self.plugin._temp_sampler.invalidate()
+        self.plugin._system_sampler.invalidate()
+
+    async def replay(self, start: float = 0.0) -> Tuple[int, List[Tuple[float, Any]]]:
+        """
+        用温度曲线的时间驱动插件自身的 monitor_once()：每一轮把传感器读数设为曲线在 t 时刻的值，
+        插件的时钟同时指向 t，下一轮的 t 由插件返回的采样间隔决定。返回 (采样次数, [(t, 告警)])。
+        插件配置中的 sample_ttl_seconds 应为 0，否则采样缓存会在回放中返回旧的读数。
+        """
+        plugin = self.plugin
+        t = start
+        samples = 0
+        timeline = []
+        plugin.clock = lambda: t
+        try:
+            while t <= self.trace.duration:
+                self.set_time(t)
+                interval, alerts = await plugin.monitor_once()
+                timeline.extend((t, alert) for alert in alerts)
+                samples += 1
+                t += interval
+        finally:
+            plugin.clock = time.monotonic
+        return samples, timeline
+
+    async def stop(self):
+        if self.plugin is not None:
+            await self.plugin.terminate()
+        await self.daemon.stop()
+        os.environ["PATH"] = self._old_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制或查看温度曲线")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="从本机 sysfs 录制温度曲线")
+    record.add_argument("--seconds", type=float, default=600)
+    record.add_argument("--interval", type=float, default=5)
+    record.add_argument("--sysfs-root", default="/sys")
+    record.add_argument("-o", "--output", required=True)
+    show = sub.add_parser("show", help="打印温度曲线的摘要")
+    show.add_argument("trace", nargs="?", default=str(TRACES_DIR / "stress_run.csv"))
+    args = parser.parse_args()
+
+    if args.command == "record":
+        reader = SysfsTemperatureReader(args.sysfs_root)
+        if not reader.open():
+            parser.error(f"未在 {args.sysfs_root} 中找到匹配的温度传感器")
+        trace = ThermalTrace.record(reader, args.seconds, args.interval)
+        reader.close()
+        trace.save(args.output)
+        print(f"已录制 {len(trace.times)} 帧，设备: {', '.join(trace.devices)}")
+    else:
+        trace = ThermalTrace.load(args.trace)
+        print(f"{len(trace.times)} 帧，时长 {trace.duration:g}s")
+        for device in trace.devices:
+            values = [frame[device] for frame in trace.frames]
+            print(f"  {device:<12} 最低 {min(values):.1f}°C  最高 {max(values):.1f}°C")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# 批量容器操作：按名称 / 通配符 / 标签选择容器，并发执行启动、停止等操作并汇总每个容器的结果
+import asyncio
+import fnmatch
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+# 以 ID 前缀匹配容器时要求的最短长度，避免过短的前缀误匹配
+MIN_ID_PREFIX = 4
+# 破坏性操作匹配到多个容器时，需要在指令中附带该参数才会执行
+CONFIRM_FLAG = "--yes"
+
+OUTCOME_OK = "ok"
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_FAILED = "failed"
+OUTCOME_TIMEOUT = "timeout"
+
+
+@dataclass
+class ContainerRef:
+    id: str
+    name: str
+    state: str
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class OpResult:
+    container: ContainerRef
+    outcome: str
+    message: str = ""
+    duration: float = 0.0
+
+
+class SkipOperation(Exception):
+    """操作的前置条件不满足 (例如启动一个已在运行的容器)，该容器被跳过而不是视为失败。"""
+
+
+def _is_glob(token: str) -> bool:
+    return any(char in token for char in "*?[")
+
+
+def select_containers(
+    selectors: Iterable[str], containers: Iterable[ContainerRef]
+) -> Tuple[List[ContainerRef], List[str]]:
+    """
+    返回 (匹配到的容器, 没有匹配到任何容器的选择器)，匹配结果按容器名排序且不重复。
+
+    选择器支持：
+    - 容器名或唯一的 ID 前缀 (至少 MIN_ID_PREFIX 位)，如 web、3f2a9c
+    - 通配符，如 app-*、*_worker_?
+    - 标签，如 label=com.docker.compose.project=blog (值可使用通配符)，label=traefik.enable (只要求存在该标签)
+    """
+    containers = list(containers)
+    matched: Dict[str, ContainerRef] = {}
+    unmatched = []
+    for selector in selectors:
+        hits = []
+        if selector.startswith("label="):
+            key, sep, pattern = selector[len("label="):].partition("=")
+            for container in containers:
+                if key in container.labels and (not sep or fnmatch.fnmatchcase(container.labels[key], pattern)):
+                    hits.append(container)
+        elif _is_glob(selector):
+            hits = [container for container in containers if fnmatch.fnmatchcase(container.name, selector)]
+        else:
+            hits = [container for container in containers if container.name == selector]
+            if not hits and len(selector) >= MIN_ID_PREFIX:
+                # 与 Docker 一致，ID 前缀只在唯一匹配时生效
+                hits = [container for container in containers if container.id.startswith(selector)]
+                if len(hits) > 1:
+                    hits = []
+        if not hits:
+            unmatched.append(selector)
+        for container in hits:
+            matched[container.id] = container
+    return sorted(matched.values(), key=lambda container: container.name), unmatched
+
+
+async def run_bulk(
+    containers: Iterable[ContainerRef],
+    operation: Callable[[ContainerRef], Awaitable[None]],
+    concurrency: int = 4,
+    timeout: float = 60,
+) -> List[OpResult]:
+    """
+    对每个容器并发执行 operation，最多同时进行 concurrency 个，单个操作超过 timeout 秒记为超时。
+    operation 抛出 SkipOperation 时记为跳过；其他异常记为失败，不影响其他容器。结果顺序与输入一致。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(container: ContainerRef) -> OpResult:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(operation(container), timeout)
+                outcome, message = OUTCOME_OK, ""
+            except SkipOperation as e:
+                outcome, message = OUTCOME_SKIPPED, str(e)
+            except asyncio.TimeoutError:
+                outcome, message = OUTCOME_TIMEOUT, f"超过 {timeout:g} 秒未完成"
+            except Exception as e:
+                outcome, message = OUTCOME_FAILED, str(e) or type(e).__name__
+            return OpResult(container, outcome, message, time.perf_counter() - started)
+
+    return list(await asyncio.gather(*(run_one(container) for container in containers)))
@@ -0,0 +1,120 @@
+# 后台 CPU 使用率采样：按固定周期读取 /proc/stat，根据两次读数的差值计算使用率
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+
+def _read_proc_stat(path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    读取 /proc/stat 中的 cpu 行，返回 {cpu名: (总时间, 空闲时间)}。
+    """
+    result = {}
+    with open(path, "r") as f:
+        for line in f:
+            if not line.startswith("cpu"):
+                # cpu 行总是位于文件开头
+                break
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal (guest 已计入 user，不重复累加)
+            values = [int(v) for v in fields[1:9]]
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            result[fields[0]] = (sum(values), idle)
+    return result
+
+
+def _usage(previous: Tuple[int, int], current: Tuple[int, int]) -> float:
+    total_delta = current[0] - previous[0]
+    idle_delta = current[1] - previous[1]
+    if total_delta <= 0:
+        return 0.0
+    return round(max(0.0, min(100.0, (total_delta - idle_delta) / total_delta * 100.0)), 1)
+
+
+class CpuUsageSampler:
+    """
+    周期性采样 CPU 使用率，查询时直接返回最近一次计算出的差值结果，不会阻塞调用方。
+
+    优先读取 /proc/stat；不可用时 (非 Linux) 使用 psutil.cpu_percent(interval=None)，
+    该调用同样基于与上一次调用之间的差值，不会阻塞。
+
+    run() 中单次采样失败不会结束任务：记录到 errors / last_error，连续失败的同一错误只调用一次 on_error(异常)。
+    """
+
+    def __init__(
+        self,
+        interval: float = 2.0,
+        proc_stat: str = "/proc/stat",
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.interval = interval
+        self.proc_stat = proc_stat
+        self.on_error = on_error
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._use_proc = os.path.exists(proc_stat)
+        self._previous: Optional[Dict[str, Tuple[int, int]]] = None
+        self.cpu_percent: Optional[float] = None
+        self.per_core: List[float] = []
+        self.load_avg: Optional[Tuple[float, float, float]] = None
+        self.timestamp: Optional[float] = None
+
+    def sample(self):
+        """
+        执行一次采样。第一次调用只记录基准值，从第二次开始产生使用率。
+        """
+        if self._use_proc:
+            try:
+                current = _read_proc_stat(self.proc_stat)
+            except (OSError, ValueError):
+                # 改用 psutil 后重新建立基准值，不能与 /proc/stat 的读数做差
+                self._use_proc = False
+                self._previous = None
+                current = None
+            if current is not None:
+                if self._previous is not None:
+                    self.cpu_percent = _usage(self._previous["cpu"], current["cpu"])
+                    cores = sorted(
+                        (name for name in current if name != "cpu" and name in self._previous),
+                        key=lambda name: int(name[3:]),
+                    )
+                    self.per_core = [_usage(self._previous[name], current[name]) for name in cores]
+                    self.timestamp = time.time()
+                self._previous = current
+
+        if not self._use_proc:
+            per_core = psutil.cpu_percent(interval=None, percpu=True)
+            if self._previous is not None:
+                self.per_core = per_core
+                self.cpu_percent = round(sum(per_core) / len(per_core), 1) if per_core else 0.0
+                self.timestamp = time.time()
+            self._previous = {}
+
+        try:
+            self.load_avg = os.getloadavg()
+        except (OSError, AttributeError):
+            self.load_avg = None
+
+    def snapshot(self) -> Dict:
+        return {
+            "cpu_percent": self.cpu_percent,
+            "per_core": list(self.per_core),
+            "load_avg": self.load_avg,
+            "timestamp": self.timestamp,
+        }
+
+    async def run(self):
+        # 调用方通常已在启动时执行过一次 sample() 建立基准值，先等待一个周期，
+        # 避免第一个结果只是相隔几毫秒的两次读数之差
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                if str(e) != self.last_error and self.on_error is not None:
+                    self.on_error(e)
+                self.last_error = str(e)
@@ -0,0 +1,227 @@
+# 异步 Docker Engine API 客户端：通过连接池复用与 Docker 守护进程的连接，并发采集容器统计信息
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import aiohttp
+
+DEFAULT_DOCKER_HOST = "unix:///var/run/docker.sock"
+
+
+class DockerError(Exception):
+    """Docker API 返回错误状态码或请求失败。"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class DockerNotFound(DockerError):
+    """容器不存在 (HTTP 404)。"""
+
+
+class DockerConnectionError(DockerError):
+    """无法连接到 Docker 守护进程。"""
+
+
+def calculate_cpu_percent(stats: Dict[str, Any]) -> Optional[float]:
+    """
+    根据一次统计结果中的 cpu_stats 与 precpu_stats 计算 CPU 使用率 (与 `docker stats` 一致)。
+    数据不完整时返回 None。
+    """
+    try:
+        cpu_stats = stats["cpu_stats"]
+        precpu_stats = stats["precpu_stats"]
+        cpu_delta = cpu_stats["cpu_usage"]["total_usage"] - precpu_stats["cpu_usage"]["total_usage"]
+        system_delta = cpu_stats["system_cpu_usage"] - precpu_stats["system_cpu_usage"]
+    except (KeyError, TypeError):
+        return None
+
+    num_cpus = cpu_stats.get("online_cpus") or len(cpu_stats["cpu_usage"].get("percpu_usage") or []) or 1
+    if system_delta > 0 and cpu_delta > 0:
+        return round((cpu_delta / system_delta) * num_cpus * 100.0, 2)
+    return 0.0
+
+
+def calculate_memory(stats: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """
+    返回 (已用内存字节数, 内存限制字节数)，数据不完整时返回 None。
+    """
+    memory_stats = stats.get("memory_stats") or {}
+    if "usage" not in memory_stats:
+        return None
+    return memory_stats["usage"], memory_stats.get("limit", 0)
+
+
+def format_memory(usage: int, limit: int) -> str:
+    if limit > 0:
+        return f"{round(usage / (1024**2), 2)}MB ({round((usage / limit) * 100, 2)}%)"
+    return f"{round(usage / (1024**2), 2)}MB"
+
+
+class DockerClient:
+    """
+    长期存活的 Docker Engine API 客户端。
+
+    底层使用 aiohttp 连接池，所有请求共享同一个会话；支持 unix:// 与 tcp:// 形式的 DOCKER_HOST。
+    设置 on_timing 后，每个非流式请求完成 (包括失败) 时调用 on_timing("docker.<操作>", 耗时秒数)。
+    """
+
+    def __init__(
+        self,
+        docker_host: Optional[str] = None,
+        pool_size: int = 16,
+        request_timeout: float = 30,
+        on_timing: Optional[Callable[[str, float], None]] = None,
+    ):
+        self.docker_host = docker_host or os.environ.get("DOCKER_HOST") or DEFAULT_DOCKER_HOST
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self.on_timing = on_timing
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        if self.docker_host.startswith("unix://"):
+            self._socket_path = self.docker_host[len("unix://"):]
+            self._base_url = "http://docker"
+        elif self.docker_host.startswith(("tcp://", "http://")):
+            self._socket_path = None
+            self._base_url = "http://" + self.docker_host.split("://", 1)[1].rstrip("/")
+        else:
+            raise ValueError(f"不支持的 DOCKER_HOST: {self.docker_host}")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            if self._socket_path:
+                connector = aiohttp.UnixConnector(path=self._socket_path, limit=self.pool_size)
+            else:
+                connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        op: str = "request",
+    ) -> Any:
+        session = self._get_session()
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        started = time.perf_counter()
+        try:
+            async with session.request(method, self._base_url + path, params=params, **kwargs) as resp:
+                if resp.status == 404:
+                    raise DockerNotFound(await self._error_message(resp), resp.status)
+                if resp.status >= 400:
+                    raise DockerError(await self._error_message(resp), resp.status)
+                if resp.content_type == "application/json":
+                    return await resp.json()
+                return await resp.read()
+        except aiohttp.ClientConnectionError as e:
+            raise DockerConnectionError(f"无法连接到 Docker 守护进程 ({self.docker_host}): {e}") from e
+        finally:
+            if self.on_timing is not None:
+                self.on_timing(f"docker.{op}", time.perf_counter() - started)
+
+    async def _stream_json(self, path: str, params: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        发起一个长连接请求，逐行解析并产出守护进程推送的 JSON 对象 (用于 events 与 stats 流)。
+        """
+        session = self._get_session()
+        try:
+            async with session.get(
+                self._base_url + path, params=params, timeout=aiohttp.ClientTimeout(total=None)
+            ) as resp:
+                if resp.status == 404:
+                    raise DockerNotFound(await self._error_message(resp), resp.status)
+                if resp.status >= 400:
+                    raise DockerError(await self._error_message(resp), resp.status)
+                async for line in resp.content:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        except aiohttp.ClientConnectionError as e:
+            raise DockerConnectionError(f"无法连接到 Docker 守护进程 ({self.docker_host}): {e}") from e
+
+    @staticmethod
+    async def _error_message(resp: aiohttp.ClientResponse) -> str:
+        try:
+            body = await resp.json(content_type=None)
+            return body.get("message", str(body))
+        except Exception:
+            return (await resp.text()).strip() or f"HTTP {resp.status}"
+
+    async def list_containers(self, all: bool = True) -> List[Dict[str, Any]]:
+        return await self._request("GET", "/containers/json", params={"all": "1" if all else "0"}, op="list")
+
+    async def inspect_container(self, container: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/containers/{quote(container, safe='')}/json", op="inspect")
+
+    async def container_stats(self, container: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._request(
+            "GET", f"/containers/{quote(container, safe='')}/stats", params={"stream": "false"}, timeout=timeout, op="stats"
+        )
+
+    def stream_stats(self, container: str) -> AsyncIterator[Dict[str, Any]]:
+        """持续产出容器统计信息，守护进程约每秒推送一次，precpu_stats 为上一次推送的数据。"""
+        return self._stream_json(f"/containers/{quote(container, safe='')}/stats", params={"stream": "true"})
+
+    def events(self, since: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """订阅容器相关的 Docker 事件。"""
+        params = {"filters": json.dumps({"type": ["container"]})}
+        if since is not None:
+            params["since"] = str(since)
+        return self._stream_json("/events", params=params)
+
+    async def stats_many(
+        self, containers: Iterable[str], concurrency: int = 8, timeout: float = 3
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        并发获取多个容器的统计信息，最多同时进行 concurrency 个请求。
+        单个容器超时或出错时对应结果为 None，不影响其他容器。
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(container: str):
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.container_stats(container), timeout)
+                except (asyncio.TimeoutError, DockerError, aiohttp.ClientError, ValueError):
+                    # ValueError 包括无法解析的统计数据 (json.JSONDecodeError)
+                    return None
+
+        containers = list(containers)
+        results = await asyncio.gather(*(fetch(container) for container in containers))
+        return dict(zip(containers, results))
+
+    async def start_container(self, container: str):
+        await self._request("POST", f"/containers/{quote(container, safe='')}/start", op="start")
+
+    async def stop_container(self, container: str, grace_seconds: int = 10):
+        # 请求超时需要覆盖容器的停止宽限期
+        await self._request(
+            "POST", f"/containers/{quote(container, safe='')}/stop",
+            params={"t": str(grace_seconds)}, timeout=grace_seconds + self.request_timeout, op="stop",
+        )
+
+    async def restart_container(self, container: str, grace_seconds: int = 10):
+        await self._request(
+            "POST", f"/containers/{quote(container, safe='')}/restart",
+            params={"t": str(grace_seconds)}, timeout=grace_seconds + self.request_timeout, op="restart",
+        )
+
+    async def remove_container(self, container: str):
+        await self._request("DELETE", f"/containers/{quote(container, safe='')}", op="remove")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,263 @@
+# 后台 Docker 监控：通过 /events 事件流维护容器清单，并为每个运行中的容器保持一条 stats 流
+import asyncio
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from .docker_client import DockerClient, DockerError, DockerNotFound, calculate_cpu_percent, calculate_memory
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# 容器事件 Actor.Attributes 中除容器标签外的字段
+_EVENT_ATTRIBUTES = {"name", "image", "exitCode", "execDuration", "signal", "oldName"}
+
+
+def sparkline(values: List[float], width: int = 12, upper: Optional[float] = None) -> str:
+    """
+    将数值序列渲染为迷你折线图。upper 为刻度上限，默认取序列最大值。
+    """
+    values = values[-width:]
+    if not values:
+        return ""
+    upper = upper if upper is not None else max(values)
+    lower = min(0.0, min(values))
+    span = upper - lower
+    if span <= 0:
+        return SPARK_CHARS[0] * len(values)
+    last = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[max(0, min(last, int((v - lower) / span * last + 0.5)))] for v in values)
+
+
+class StatsRing:
+    """
+    固定容量的环形缓冲区，以紧凑数组保存 (时间戳, CPU%, 内存字节数)。
+    """
+
+    __slots__ = ("capacity", "_times", "_cpu", "_mem", "_next", "_size", "mem_limit")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._cpu = array("f", bytes(4 * capacity))
+        self._mem = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+        self.mem_limit = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, cpu_percent: float, mem_usage: float):
+        self._times[self._next] = timestamp
+        self._cpu[self._next] = cpu_percent
+        self._mem[self._next] = mem_usage
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _ordered(self, data: array) -> List[float]:
+        if self._size < self.capacity:
+            return list(data[:self._size])
+        return list(data[self._next:]) + list(data[:self._next])
+
+    def cpu_values(self) -> List[float]:
+        return self._ordered(self._cpu)
+
+    def mem_values(self) -> List[float]:
+        return self._ordered(self._mem)
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self._size:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {
+            "timestamp": self._times[index],
+            "cpu_percent": round(self._cpu[index], 2),
+            "mem_usage": self._mem[index],
+            "mem_limit": self.mem_limit,
+        }
+
+
+@dataclass
+class ContainerInfo:
+    id: str
+    name: str
+    state: str
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+class DockerStatsMonitor:
+    """
+    保持内存中的容器清单与每个容器最近的资源占用。
+
+    - 启动时全量同步一次容器列表，之后依靠 /events 事件流增量更新
+    - 每个运行中的容器对应一条 stats 流，CPU% 由相邻两次推送计算，写入 StatsRing
+    - 事件流断开后自动重连并重新全量同步
+    """
+
+    def __init__(self, client: DockerClient, ring_size: int = 60, max_backoff: float = 60):
+        self.client = client
+        self.ring_size = ring_size
+        self.max_backoff = max_backoff
+        self.containers: Dict[str, ContainerInfo] = {}
+        self.rings: Dict[str, StatsRing] = {}
+        self._stream_tasks: Dict[str, asyncio.Task] = {}
+        self.ready = False
+        self.last_error: Optional[str] = None
+
+    def snapshot(self) -> List[Dict]:
+        """返回所有容器的最新状态，按容器名排序。"""
+        result = []
+        for info in sorted(self.containers.values(), key=lambda c: c.name):
+            ring = self.rings.get(info.id)
+            latest = ring.latest() if ring is not None and info.state == "running" else None
+            result.append({
+                "id": info.id,
+                "name": info.name,
+                "state": info.state,
+                "labels": info.labels,
+                "latest": latest,
+                "cpu_history": ring.cpu_values() if ring is not None else [],
+            })
+        return result
+
+    def _set_container(self, container_id: str, name: str, state: str, labels: Optional[Dict[str, str]] = None):
+        info = self.containers.get(container_id)
+        if info is None:
+            info = ContainerInfo(container_id, name, state, labels or {})
+            self.containers[container_id] = info
+        else:
+            info.name = name or info.name
+            info.state = state
+            if labels is not None:
+                info.labels = labels
+        if state == "running":
+            self._ensure_stream(container_id)
+        else:
+            self._cancel_stream(container_id)
+
+    def _remove_container(self, container_id: str):
+        self._cancel_stream(container_id)
+        self.containers.pop(container_id, None)
+        self.rings.pop(container_id, None)
+
+    def _ensure_stream(self, container_id: str):
+        task = self._stream_tasks.get(container_id)
+        if task is None or task.done():
+            self._stream_tasks[container_id] = asyncio.create_task(self._stream_container(container_id))
+
+    def _cancel_stream(self, container_id: str):
+        task = self._stream_tasks.pop(container_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def _stream_container(self, container_id: str):
+        ring = self.rings.get(container_id)
+        if ring is None:
+            ring = self.rings[container_id] = StatsRing(self.ring_size)
+        backoff = 1.0
+        try:
+            while True:
+                try:
+                    async for stats in self.client.stream_stats(container_id):
+                        cpu_percent = calculate_cpu_percent(stats)
+                        memory = calculate_memory(stats)
+                        if cpu_percent is None or memory is None:
+                            # 第一次推送没有 precpu 数据，跳过
+                            continue
+                        ring.mem_limit = memory[1]
+                        ring.append(time.time(), cpu_percent, memory[0])
+                        backoff = 1.0
+                except DockerNotFound:
+                    # 容器已被删除，由事件流负责后续状态更新
+                    return
+                except (DockerError, aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    # 连接断开、守护进程重启或推送内容无法解析
+                    pass
+                # 流结束后等待一段时间，若容器仍在运行 (事件流没有报告停止) 则重新订阅
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                info = self.containers.get(container_id)
+                if info is None or info.state != "running":
+                    return
+        finally:
+            if self._stream_tasks.get(container_id) is asyncio.current_task():
+                del self._stream_tasks[container_id]
+
+    async def _sync(self) -> int:
+        """全量同步容器列表，返回同步时刻的时间戳，用于从该时刻开始订阅事件，避免遗漏。"""
+        since = int(time.time())
+        containers = await self.client.list_containers(all=True)
+        seen = set()
+        for container in containers:
+            container_id = container["Id"]
+            seen.add(container_id)
+            name = (container.get("Names") or [container_id[:12]])[0].lstrip("/")
+            self._set_container(container_id, name, container.get("State", "unknown"), container.get("Labels") or {})
+        for container_id in list(self.containers):
+            if container_id not in seen:
+                self._remove_container(container_id)
+        return since
+
+    async def _handle_event(self, event: Dict):
+        action = event.get("Action") or event.get("status") or ""
+        actor = event.get("Actor") or {}
+        container_id = actor.get("ID") or event.get("id")
+        if not container_id:
+            return
+        attributes = actor.get("Attributes") or {}
+        name = attributes.get("name", "")
+        # 事件的 Attributes 包含容器标签；没有标签时传 None，保留已有的标签
+        labels = {key: value for key, value in attributes.items() if key not in _EVENT_ATTRIBUTES} or None
+        info = self.containers.get(container_id)
+
+        if action == "destroy":
+            self._remove_container(container_id)
+        elif action in ("start", "unpause", "restart"):
+            self._set_container(container_id, name, "running", labels)
+        elif action == "die":
+            self._set_container(container_id, name, "exited", labels)
+        elif action == "pause":
+            self._set_container(container_id, name, "paused", labels)
+        elif action == "create":
+            self._set_container(container_id, name, "created", labels)
+        elif action == "rename" and info is not None:
+            info.name = name or info.name
+        elif info is None and not action.startswith(("exec_", "health_status")):
+            # 未知容器的其他事件：查询一次完整状态
+            try:
+                detail = await self.client.inspect_container(container_id)
+            except DockerNotFound:
+                return
+            self._set_container(
+                container_id, detail.get("Name", "").lstrip("/"),
+                detail.get("State", {}).get("Status", "unknown"),
+                (detail.get("Config") or {}).get("Labels") or {},
+            )
+
+    async def run(self):
+        backoff = 1.0
+        while True:
+            try:
+                since = await self._sync()
+                self.ready = True
+                self.last_error = None
+                backoff = 1.0
+                async for event in self.client.events(since=since):
+                    await self._handle_event(event)
+                # 事件流被守护进程正常关闭，重新同步
+                self.ready = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.ready = False
+                self.last_error = str(e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def close(self):
+        for container_id in list(self._stream_tasks):
+            self._cancel_stream(container_id)
+        self.ready = False
@@ -0,0 +1,72 @@
+# 轻量级 OpenMetrics 导出端点：基于 asyncio 的最小 HTTP 服务，只提供 GET /metrics
+import asyncio
+from typing import Callable, Optional
+
+from .metrics import OpenMetricsWriter
+
+# 请求头的最大读取量，超出时直接断开
+_MAX_HEADER_BYTES = 16 * 1024
+
+
+class MetricsExporter:
+    """
+    在 host:port 上监听 HTTP 请求，GET /metrics 时调用 collect() 生成指标文本。
+    collect() 必须只读取内存中的数据，不能触发新的硬件或 Docker 采样。
+    """
+
+    def __init__(self, collect: Callable[[], str], host: str = "127.0.0.1", port: int = 9110):
+        self._collect = collect
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.scrapes = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else []
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            header = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+            if len(header) > _MAX_HEADER_BYTES:
+                return
+            request_line = header.split(b"\r\n", 1)[0].decode("latin-1")
+            parts = request_line.split(" ")
+            method = parts[0] if parts else ""
+            path = parts[1].split("?", 1)[0] if len(parts) > 1 else ""
+
+            if method not in ("GET", "HEAD"):
+                await self._respond(writer, 405, "text/plain; charset=utf-8", b"method not allowed\n")
+            elif path != "/metrics":
+                await self._respond(writer, 404, "text/plain; charset=utf-8", b"not found\n")
+            else:
+                self.scrapes += 1
+                body = self._collect().encode("utf-8")
+                await self._respond(writer, 200, OpenMetricsWriter.CONTENT_TYPE, b"" if method == "HEAD" else body, len(body))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, status: int, content_type: str, body: bytes, length: Optional[int] = None
+    ):
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {length if length is not None else len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
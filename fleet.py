@@ -0,0 +1,303 @@
+# 多主机监控：agent 与插件之间的批量上报协议、增量聚合器与 TCP 接收端
+#
+# 协议为基于 TCP 长连接的换行分隔 JSON，每行一条消息：
+#   agent -> 插件  {"type": "hello", "version": 1, "host": "web-1", "token": "..."}
+#   插件 -> agent  {"type": "welcome"} 或 {"type": "error", "message": "..."} (随后断开)
+#   agent -> 插件  {"type": "batch", "seq": 7, "snapshots": [快照, ...]}
+#   插件 -> agent  {"type": "ack", "seq": 7}，其中有快照格式错误时附带 "rejected": 条数 与 "error": 原因，
+#                  被拒绝的快照不会重发；无法解析或不是批次格式的消息回复 {"type": "error", "message": "..."}
+# 快照格式：
+#   {"ts": 时间戳, "temps": {设备键: 温度}, "cpu": 使用率, "load": [1/5/15 分钟负载],
+#    "mem": [已用字节, 总字节], "containers": [[名称, 状态, CPU%, 内存字节, 内存限制], ...] 或 null}
+import asyncio
+import hmac
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .sensor_reader import split_device_key
+
+PROTOCOL_VERSION = 1
+# 单行消息的最大长度，一个批次包含几十个快照时也远小于该值
+MAX_LINE_BYTES = 4 * 1024 * 1024
+HELLO_TIMEOUT = 10
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_snapshot(snapshot: Any):
+    """检查快照格式，不符合协议时抛出 ValueError。"""
+    if not isinstance(snapshot, dict):
+        raise ValueError("快照必须是 JSON 对象")
+    for key in ("ts", "cpu"):
+        if snapshot.get(key) is not None and not _is_number(snapshot[key]):
+            raise ValueError(f"{key} 必须是数值")
+    temps = snapshot.get("temps")
+    if temps is not None:
+        if not isinstance(temps, dict) or not all(_is_number(value) for value in temps.values()):
+            raise ValueError("temps 必须是 {设备键: 温度} 对象")
+    load = snapshot.get("load")
+    if load is not None and (not isinstance(load, list) or not all(_is_number(value) for value in load)):
+        raise ValueError("load 必须是数值数组")
+    mem = snapshot.get("mem")
+    if mem is not None and (not isinstance(mem, list) or len(mem) != 2 or not all(_is_number(v) for v in mem)):
+        raise ValueError("mem 必须是 [已用字节, 总字节]")
+    containers = snapshot.get("containers")
+    if containers is not None:
+        if not isinstance(containers, list) or not all(
+            isinstance(container, list) and len(container) == 5
+            and isinstance(container[0], str) and isinstance(container[1], str)
+            for container in containers
+        ):
+            raise ValueError("containers 必须是 [[名称, 状态, CPU%, 内存字节, 内存限制], ...]")
+
+
+@dataclass
+class HostState:
+    """单台主机的最新快照，以及在写入时预先计算好的摘要字段。"""
+
+    name: str
+    address: str = ""
+    connected: bool = False
+    # 插件本机收到最新快照的时间，用于计算数据时长与判定离线
+    last_seen: float = 0.0
+    # 最新快照中 agent 自己的时间戳，只用于排序与丢弃过期快照，不与本机时钟比较
+    last_ts: Optional[float] = None
+    snapshots: int = 0
+    snapshot: Dict[str, Any] = field(default_factory=dict)
+    # (设备键, 温度)，没有温度数据时为 None
+    max_temp: Optional[Tuple[str, float]] = None
+    # 超过阈值的 (设备键, 温度, 阈值)
+    hot: List[Tuple[str, float, float]] = field(default_factory=list)
+    cpu_percent: Optional[float] = None
+    mem_percent: Optional[float] = None
+    containers_running: int = 0
+    containers_total: int = 0
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.last_seen
+
+
+class FleetAggregator:
+    """
+    保存各主机的最新快照。摘要字段在 ingest() 时按主机增量更新，
+    集群级别的计数器只加减发生变化的那台主机的贡献，查询时无需重新遍历快照内容。
+    """
+
+    def __init__(self, thresholds: Dict[str, float], stale_seconds: float = 60):
+        self.thresholds = thresholds
+        self.stale_seconds = stale_seconds
+        self.hosts: Dict[str, HostState] = {}
+        self.hot_hosts = set()
+        self.containers_running = 0
+        self.containers_total = 0
+
+    def _threshold(self, device_key: str) -> Optional[float]:
+        threshold = self.thresholds.get(device_key)
+        if threshold is None:
+            threshold = self.thresholds.get(split_device_key(device_key)[0])
+        return threshold
+
+    def _state(self, name: str) -> HostState:
+        state = self.hosts.get(name)
+        if state is None:
+            state = self.hosts[name] = HostState(name)
+        return state
+
+    def set_connected(self, name: str, connected: bool, address: str = ""):
+        state = self._state(name)
+        state.connected = connected
+        if address:
+            state.address = address
+
+    def ingest(self, name: str, snapshot: Dict[str, Any], received: Optional[float] = None):
+        """
+        写入一条快照。同一批次中的快照按顺序写入，agent 时间戳早于当前快照的会被忽略。
+        两台机器的时钟可能不一致，在线状态与数据时长使用本机的接收时间 received。
+        快照格式错误时抛出 ValueError，此时主机状态与集群计数器都不会被修改。
+        """
+        validate_snapshot(snapshot)
+        state = self._state(name)
+        ts = snapshot.get("ts")
+        if ts is not None and state.last_ts is not None and ts < state.last_ts:
+            return
+
+        # 先计算全部摘要字段，再一起写入状态
+        temps = snapshot.get("temps") or {}
+        max_temp = max(temps.items(), key=lambda item: item[1]) if temps else None
+        hot = []
+        for device_key, temp in temps.items():
+            threshold = self._threshold(device_key)
+            if threshold is not None and temp >= threshold:
+                hot.append((device_key, temp, threshold))
+        mem = snapshot.get("mem")
+        mem_percent = round(mem[0] / mem[1] * 100, 1) if mem and mem[1] else None
+        containers = snapshot.get("containers") or []
+        running = sum(1 for container in containers if container[1] == "running")
+
+        if ts is not None:
+            state.last_ts = float(ts)
+        state.last_seen = received if received is not None else time.time()
+        state.snapshots += 1
+        state.snapshot = snapshot
+        state.max_temp = max_temp
+        state.hot = hot
+        if hot:
+            self.hot_hosts.add(name)
+        else:
+            self.hot_hosts.discard(name)
+        state.cpu_percent = snapshot.get("cpu")
+        state.mem_percent = mem_percent
+        self.containers_running += running - state.containers_running
+        self.containers_total += len(containers) - state.containers_total
+        state.containers_running = running
+        state.containers_total = len(containers)
+
+    def get(self, name: str) -> Optional[HostState]:
+        state = self.hosts.get(name)
+        if state is not None:
+            return state
+        lowered = name.lower()
+        for host_name, state in self.hosts.items():
+            if host_name.lower() == lowered:
+                return state
+        return None
+
+    def is_online(self, state: HostState, now: Optional[float] = None) -> bool:
+        return state.connected and state.age(now) <= self.stale_seconds
+
+    def rows(self) -> List[HostState]:
+        return sorted(self.hosts.values(), key=lambda state: state.name)
+
+    def online_count(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        return sum(1 for state in self.hosts.values() if self.is_online(state, now))
+
+
+class FleetServer:
+    """
+    接收 agent 上报的 TCP 服务。每个连接先完成 hello 认证，之后每收到一个批次就写入聚合器并回复 ack。
+    同名主机重复连接时关闭旧连接。
+    """
+
+    def __init__(self, aggregator: FleetAggregator, token: str, host: str = "0.0.0.0", port: int = 9120):
+        if not token:
+            raise ValueError("必须设置 agent 认证令牌")
+        self.aggregator = aggregator
+        self.token = token
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Dict[str, asyncio.StreamWriter] = {}
+        self.batches = 0
+        self.snapshots = 0
+        self.rejected = 0
+        # 因格式错误被丢弃的快照数
+        self.invalid_snapshots = 0
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE_BYTES)
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else []
+
+    @property
+    def connections(self) -> int:
+        return len(self._writers)
+
+    async def _reject(self, writer: asyncio.StreamWriter, message: str):
+        self.rejected += 1
+        self.last_error = message
+        writer.write(encode_message({"type": "error", "message": message}))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        address = f"{peer[0]}:{peer[1]}" if isinstance(peer, tuple) else str(peer or "")
+        name = None
+        try:
+            try:
+                hello = json.loads(await asyncio.wait_for(reader.readline(), HELLO_TIMEOUT))
+            except (asyncio.TimeoutError, ValueError):
+                await self._reject(writer, "无效的握手消息")
+                return
+            if not isinstance(hello, dict) or hello.get("type") != "hello":
+                await self._reject(writer, "无效的握手消息")
+                return
+            if hello.get("version") != PROTOCOL_VERSION:
+                await self._reject(writer, f"不支持的协议版本: {hello.get('version')}")
+                return
+            if not hmac.compare_digest(str(hello.get("token", "")).encode(), self.token.encode()):
+                await self._reject(writer, f"认证失败 ({address})")
+                return
+            name = str(hello.get("host") or "").strip()
+            if not name:
+                await self._reject(writer, "主机名不能为空")
+                return
+
+            previous = self._writers.pop(name, None)
+            if previous is not None:
+                previous.close()
+            self._writers[name] = writer
+            self.aggregator.set_connected(name, True, address)
+            writer.write(encode_message({"type": "welcome"}))
+            await writer.drain()
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict) or message.get("type") != "batch" \
+                        or not isinstance(message.get("snapshots"), list):
+                    self.last_error = f"{name}: 无效的消息"
+                    writer.write(encode_message({"type": "error", "message": "无效的消息，应为 batch 批次"}))
+                    await writer.drain()
+                    continue
+                ack = {"type": "ack", "seq": message.get("seq")}
+                rejected = 0
+                for snapshot in message["snapshots"]:
+                    try:
+                        self.aggregator.ingest(name, snapshot)
+                        self.snapshots += 1
+                    except ValueError as e:
+                        rejected += 1
+                        ack["error"] = str(e)
+                if rejected:
+                    ack["rejected"] = rejected
+                    self.invalid_snapshots += rejected
+                    self.last_error = f"{name}: {rejected} 条快照格式错误 ({ack['error']})"
+                self.batches += 1
+                writer.write(encode_message(ack))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            self.last_error = f"{name or address}: {e}"
+        finally:
+            # 已被同名新连接替换时，不要把主机标记为离线
+            if name is not None and self._writers.get(name) is writer:
+                del self._writers[name]
+                self.aggregator.set_connected(name, False)
+            writer.close()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers.values()):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
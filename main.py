@@ -1,14 +1,75 @@
 # 导入 astrbot API 和 asyncio
 import asyncio
-from typing import Dict, Any, Deque
-from collections import deque # 导入 deque 用于存储有限历史数据
+import re
+import time
+from typing import Dict, Any, List, Awaitable, Callable, Optional, Tuple
 from astrbot.api import logger, AstrBotConfig
 from astrbot.api.event import filter, AstrMessageEvent
-from astrbot.api.star import Context, Star, register
+from astrbot.api.star import Context, Star, StarTools, register
 import astrbot.api.message_components as Comp
 from datetime import datetime, timezone
-import re
+import jinja2
 import psutil
+from .sensor_reader import (
+    SensorMap, SysfsTemperatureReader, parse_sensors_json, parse_sensors_output, split_device_key,
+)
+from .sampler import CachedSampler
+from .cpu_sampler import CpuUsageSampler
+from .resource_sampler import ResourceSampler, format_bytes
+from .docker_client import (
+    DockerClient, DockerConnectionError, DockerError,
+    calculate_cpu_percent, calculate_memory, format_memory,
+)
+from .docker_monitor import DockerStatsMonitor, sparkline
+from .metrics_store import MetricsStore, parse_range
+from .trend import TrendEngine
+from .render_cache import RenderCache
+from .scheduler import AdaptiveScheduler
+from .alerting import ALERT_HIGH, ALERT_RECOVERED, ALERT_RISING, Alert, AlertDispatcher, AlertEvaluator
+from .metrics import Histogram, LoopLagMonitor, OpenMetricsWriter, PerfRecorder
+from .exporter import MetricsExporter
+from .fleet import FleetAggregator, FleetServer, HostState
+from .container_ops import (
+    CONFIRM_FLAG, OUTCOME_FAILED, OUTCOME_OK, OUTCOME_SKIPPED, OUTCOME_TIMEOUT,
+    ContainerRef, OpResult, SkipOperation, run_bulk, select_containers,
+)
+
+# Docker 容器状态表格的 HTML 模板
+CONTAINERS_HTML_TEMPLATE = '''
+<div style="font-family: Arial, sans-serif; padding: 10px; background-color: #f0f2f5; border-radius: 8px;">
+    <h2 style="color: #333; text-align: center; margin-bottom: 15px;">{{ title }}</h2>
+    <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
+        <thead style="background-color: #4CAF50; color: white;">
+            <tr>
+                <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">容器名</th>
+                <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">CPU占用</th>
+                <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">CPU趋势</th>
+                <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">内存占用</th>
+                <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">运行状态</th>
+                </tr>
+        </thead>
+        <tbody>
+            {% for container in containers %}
+            <tr style="background-color: {% if loop.index % 2 == 0 %}#f9f9f9{% else %}#ffffff{% endif %};">
+                <td style="padding: 8px; border: 1px solid #ddd;">{{ container.name }}</td>
+                <td style="padding: 8px; border: 1px solid #ddd;">{{ container.cpu_percent }}</td>
+                <td style="padding: 8px; border: 1px solid #ddd; font-family: monospace;">{{ container.cpu_trend }}</td>
+                <td style="padding: 8px; border: 1px solid #ddd;">{{ container.mem_usage }}</td>
+                <td style="padding: 8px; border: 1px solid #ddd;">{{ container.status }}</td>
+                </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+    <p style="font-size: 12px; color: #666; text-align: right; margin-top: 15px;">数据更新时间: {{ current_time }}</p>
+</div>
+'''
+CONTAINERS_TEMPLATE = jinja2.Environment(autoescape=True).from_string(CONTAINERS_HTML_TEMPLATE)
+
+# 指令中的主机参数：留空或以下关键字表示本机，FLEET_SELECTORS 表示显示所有 agent 主机的概览
+LOCAL_SELECTORS = {"", "local", "本机"}
+FLEET_SELECTORS = {"all", "fleet", "全部", "集群"}
+# 旧版本 lm-sensors 不认识 -j 时 getopt 输出的错误信息
+SENSORS_BAD_OPTION = re.compile(r"(invalid|unrecognized|unknown) option", re.IGNORECASE)
 # 插件元数据注册
 @register(
     "astrbot_plugin_temp",  # 插件名称
@@ -28,34 +89,207 @@ class ServerTempPlugin(Star):
             "CPU": "CPU",
             "Motherboard": "主板",
             "WIFI": "网卡",
-            "NVMe": "硬盘"
-        }
-        # 存储每个设备的温度历史，使用 deque 限制长度
-        # deque 的最大长度为 (趋势计算时间窗口 / 检查间隔) + 1，以确保至少有2个点用于计算变化率
-        # 假设 check_interval_minutes 默认为5分钟，半小时是30分钟，则 30/5 + 1 = 7个点
-        self.history_length = (self.config.get("trend_window_minutes", 30) // self.config.get("check_interval_minutes", 5)) + 1
-        self._temperature_history: Dict[str, Deque[float]] = {
-            "CPU": deque(maxlen=self.history_length),
-            "主板": deque(maxlen=self.history_length),
-            "网卡": deque(maxlen=self.history_length),
-            "硬盘": deque(maxlen=self.history_length)
+            "NVMe": "硬盘",
+            "GPU": "显卡"
         }
+        # 传感器映射：配置中的 "芯片通配符:标签通配符=设备键" 规则，启动时编译一次
+        try:
+            self._sensor_map = SensorMap(self.config.get("sensor_map") or None)
+        except ValueError as e:
+            logger.error(f"{e}，将使用默认传感器映射。")
+            self._sensor_map = SensorMap()
+        # `sensors -j` 是否可用，None 表示尚未检测
+        self._sensors_json_supported = None
+        # 各设备实例的告警阈值 (如 NVMe#2 继承 NVMe 的阈值)，由趋势引擎、告警判定与采样调度共享
+        self._thresholds: Dict[str, float] = dict(self.config.get("thresholds", {}))
+        # 温度趋势引擎：在 trend_window_minutes 时间窗口内增量计算斜率、EWMA 与到达阈值的预计时间
+        trend_window_seconds = self.config.get("trend_window_minutes", 30) * 60
+        self._trend = TrendEngine(
+            trend_window_seconds,
+            ewma_tau_seconds=self.config.get("trend_ewma_minutes", 5) * 60,
+            # 容量按最高采样频率 (每个采样有效期一次) 估算，保证窗口内的样本都能放下
+            capacity=max(64, int(trend_window_seconds / max(1, self.config.get("sample_ttl_seconds", 5))) + 1),
+        )
+        self._trend.set_thresholds(self._thresholds)
+
+        # 热点路径的耗时统计 (传感器、psutil、每个 Docker API 调用、图片渲染)，由 /perf 与指标导出端点读取
+        self._perf = PerfRecorder(
+            slow_threshold=self.config.get("perf_slow_call_ms", 0) / 1000,
+            on_slow=self._log_slow_call,
+        )
+
+        # sysfs 温度读取器：启动时扫描一次设备映射并保持文件描述符常开
+        self._sysfs_reader = None
+        if self.config.get("sensor_source", "auto") != "sensors":
+            self._sysfs_reader = SysfsTemperatureReader(sensor_map=self._sensor_map)
+            count = self._sysfs_reader.open()
+            if count:
+                logger.info(f"已通过 sysfs 找到 {count} 个温度传感器。")
+            else:
+                logger.info("未在 sysfs 中找到匹配的温度传感器，将使用 'sensors' 命令。")
+
+        # 后台 CPU 采样任务：按固定周期计算使用率差值，/status 直接读取最近结果
+        self._cpu_sampler = CpuUsageSampler(
+            self.config.get("cpu_sample_interval_seconds", 2),
+            on_error=lambda e: self._log_sampler_error("CPU 使用率", e),
+        )
+        self._cpu_sampler.sample()
+        self.cpu_sampler_task = asyncio.create_task(self._cpu_sampler.run())
+
+        # 后台资源采样任务：磁盘/网络速率、文件系统占用与进程排行。遍历进程在线程中进行，/status 直接读取最近结果
+        self._resource_sampler = None
+        self.resource_sampler_task = None
+        if self.config.get("resource_sampler_enabled", True):
+            self._resource_sampler = ResourceSampler(
+                self.config.get("resource_sample_interval_seconds", 5),
+                top_n=self.config.get("status_top_processes", 5),
+                on_timing=self._perf.observe,
+                on_error=lambda e: self._log_sampler_error("资源", e),
+            )
+            self.resource_sampler_task = asyncio.create_task(self._resource_sampler.run())
+
+        # 长期存活的 Docker 客户端，所有容器相关指令共享同一个连接池
+        self._docker = DockerClient(self.config.get("docker_host") or None, on_timing=self._perf.observe)
+
+        # 后台 Docker 监控：事件流维护容器清单，每个运行中的容器一条 stats 流。
+        # 长连接数量随容器数增长，因此使用独立且不限连接数的客户端，避免占满指令使用的连接池
+        self._docker_monitor = None
+        self.docker_monitor_task = None
+        if self.config.get("docker_monitor_enabled", True):
+            self._docker_monitor = DockerStatsMonitor(
+                DockerClient(self.config.get("docker_host") or None, pool_size=0, on_timing=self._perf.observe),
+                ring_size=self.config.get("docker_stats_ring_size", 60),
+            )
+            self.docker_monitor_task = asyncio.create_task(self._docker_monitor.run())
+
+        # 容器状态图片的渲染缓存：相同内容在 render_cache_seconds 内复用同一张图片
+        self._render_cache = RenderCache(
+            max_entries=self.config.get("render_cache_size", 16),
+            granularity=self.config.get("render_cache_seconds", 30),
+        )
+
+        # 温度监控循环的调度延迟
+        self._monitor_lag = Histogram()
+        self._monitor_last_lag = None
+
+        # 事件循环延迟监控：某个处理函数阻塞事件循环超过 loop_lag_threshold_ms 时记录警告
+        self._loop_lag = None
+        self.loop_lag_task = None
+        if self.config.get("loop_lag_monitor_enabled", True):
+            self._loop_lag = LoopLagMonitor(
+                threshold=self.config.get("loop_lag_threshold_ms", 100) / 1000,
+                on_block=self._log_loop_block,
+            )
+            self.loop_lag_task = asyncio.create_task(self._loop_lag.run())
+
+        # 共享采样层：TTL 内的重复查询直接复用上一次采样结果，并发查询共享同一次采样
+        sample_ttl = self.config.get("sample_ttl_seconds", 5)
+        self._temp_sampler = CachedSampler(self._sample_temperatures, sample_ttl)
+        self._system_sampler = CachedSampler(self._sample_system_status, sample_ttl)
+
+        # 告警流水线：判定 (迟滞 + 冷却 + 快速升温预警) 与后台并发发送
+        self._alert_evaluator = AlertEvaluator(
+            self._thresholds,
+            hysteresis=self.config.get("alert_hysteresis", 3.0),
+            cooldown_seconds=self.config.get("alert_cooldown_minutes", 30) * 60,
+            rising_slope=self.config.get("alert_rising_slope", 1.0),
+            rising_eta_minutes=self.config.get("alert_rising_eta_minutes", 15),
+        )
+        self._alert_dispatcher = AlertDispatcher(
+            self._send_alert,
+            self.config.get("alert_groups", []),
+            min_interval=self.config.get("alert_group_min_interval_seconds", 5),
+        )
+        self.alert_task = asyncio.create_task(self._alert_dispatcher.run())
+
+        # 自适应采样调度：温度稳定时按 check_interval_minutes 采样，接近阈值或快速升温时缩短到 monitor_min_interval_seconds
+        # 趋势计算与告警判定使用的单调时钟；离线回放工具 (bench/harness.py) 将其替换为温度曲线的时间
+        self.clock: Callable[[], float] = time.monotonic
+
+        self._scheduler = AdaptiveScheduler(
+            min_interval=self.config.get("monitor_min_interval_seconds", 15),
+            max_interval=self.config.get("check_interval_minutes", 5) * 60,
+            far_margin=self.config.get("monitor_far_margin", 15.0),
+            steep_slope=self.config.get("monitor_steep_slope", 2.0),
+        )
 
         if self.config.get("enabled", False):
             self.monitor_task = asyncio.create_task(self._temperature_monitor())
             logger.info("服务器温度监控任务已启动。")
 
+        # 持久化历史数据：定期记录温度、CPU、内存与容器指标，供 /history 查询
+        self._metrics_store = None
+        self.history_task = None
+        if self.config.get("history_enabled", True):
+            db_path = StarTools.get_data_dir("astrbot_plugin_temp") / "metrics.db"
+            self._metrics_store = MetricsStore(str(db_path), {
+                "rollup_1m": self.config.get("history_retention_minute_days", 7),
+                "rollup_1h": self.config.get("history_retention_hour_days", 90),
+                "rollup_1d": self.config.get("history_retention_day_days", 730),
+            })
+            self.history_task = asyncio.create_task(self._history_recorder())
+
+        # OpenMetrics 导出端点：只读取上面各组件在内存中的最新数据，抓取不会触发新的采样
+        self._exporter = None
+        self.exporter_task = None
+        if self.config.get("metrics_exporter_enabled", False):
+            self._exporter = MetricsExporter(
+                self._collect_metrics,
+                host=self.config.get("metrics_exporter_host", "127.0.0.1"),
+                port=self.config.get("metrics_exporter_port", 9110),
+            )
+            self.exporter_task = asyncio.create_task(self._start_exporter())
+
+        # 多主机监控：接收各 agent 推送的批量快照，按主机增量聚合，指令直接读取内存中的最新数据
+        self._fleet = None
+        self._fleet_server = None
+        self.fleet_task = None
+        if self.config.get("fleet_enabled", False):
+            self._fleet = FleetAggregator(self._thresholds, stale_seconds=self.config.get("fleet_stale_seconds", 60))
+            try:
+                self._fleet_server = FleetServer(
+                    self._fleet,
+                    self.config.get("fleet_token", ""),
+                    host=self.config.get("fleet_listen_host", "0.0.0.0"),
+                    port=self.config.get("fleet_listen_port", 9120),
+                )
+                self.fleet_task = asyncio.create_task(self._start_fleet_server())
+            except ValueError as e:
+                logger.error(f"{e} (fleet_token)，多主机监控未启动。")
+
+    @staticmethod
+    async def _run_sensors(*args: str) -> Tuple[int, str, str]:
+        """执行 `sensors` 命令，返回 (退出码, 标准输出, 标准错误)。"""
+        process = await asyncio.create_subprocess_exec(
+            'sensors', *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        return process.returncode, stdout.decode('utf-8'), stderr.decode('utf-8', errors='replace').strip()
+
     async def _get_sensor_data_structured(self) -> Dict[str, float]:
-        data_dict = {}
+        # 优先使用 sysfs 读取器，读取失败或无数据时回退到 `sensors` 命令
+        if self._sysfs_reader is not None and self._sysfs_reader.available:
+            data_dict = self._sysfs_reader.read()
+            if data_dict:
+                return data_dict
+            logger.warning("sysfs 温度读取失败，回退到 'sensors' 命令。")
+
+        # 优先使用 `sensors -j` 的 JSON 输出，旧版本 lm-sensors 不支持时改用文本输出
+        use_json = self._sensors_json_supported is not False
         try:
-            process = await asyncio.create_subprocess_exec(
-                'sensors', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            if process.returncode != 0:
-                logger.error(f"执行 'sensors' 命令失败: {stderr.decode('utf-8').strip()}")
+            returncode, output, error = await self._run_sensors('-j') if use_json else await self._run_sensors()
+            if returncode != 0 and use_json and self._sensors_json_supported is None:
+                # 只有错误信息表明 -j 参数无效，或不带 -j 的调用随即成功时才永久改用文本输出；
+                # 其他失败 (如传感器驱动暂时不可用) 保持未确定状态，下次仍会尝试 -j
+                json_error = error
+                returncode, output, error = await self._run_sensors()
+                if returncode == 0 or SENSORS_BAD_OPTION.search(json_error):
+                    logger.info("当前 lm-sensors 不支持 -j 参数，改用文本输出。")
+                    self._sensors_json_supported = False
+                use_json = False
+            if returncode != 0:
+                logger.error(f"执行 'sensors' 命令失败: {error}")
                 return {}
-            output = stdout.decode('utf-8')
         except FileNotFoundError:
             logger.error("错误: 'sensors' 命令未找到。请在服务器上安装 lm-sensors。")
             return {}
@@ -63,120 +297,536 @@ class ServerTempPlugin(Star):
             logger.error(f"获取传感器数据时发生未知错误: {e}")
             return {}
 
-        lines = output.splitlines()
-        current_section_map = {
-            "coretemp-isa": "CPU",
-            "acpitz-acpi": "主板",
-            "iwlwifi": "网卡",
-            "nvme-pci": "硬盘"
+        if use_json:
+            try:
+                data_dict = parse_sensors_json(output, self._sensor_map)
+                self._sensors_json_supported = True
+                return data_dict
+            except ValueError:
+                logger.info("无法解析 'sensors -j' 的输出，改用文本输出。")
+                self._sensors_json_supported = False
+                return await self._get_sensor_data_structured()
+        return parse_sensors_output(output, self._sensor_map)
+
+    def _display_name(self, device_key: str) -> str:
+        base_key, index = split_device_key(device_key)
+        display_name = self.device_name_map.get(base_key, base_key)
+        return display_name if index == 1 else f"{display_name}#{index}"
+
+    def _register_devices(self, device_keys):
+        """为首次出现的设备实例 (如 NVMe#2) 继承其基础设备的告警阈值。"""
+        thresholds = self.config.get("thresholds", {})
+        added = False
+        for device_key in device_keys:
+            if device_key in self._thresholds:
+                continue
+            base_key, _ = split_device_key(device_key)
+            if base_key in thresholds:
+                self._thresholds[device_key] = thresholds[base_key]
+                added = True
+        if added:
+            self._trend.set_thresholds(self._thresholds)
+
+    async def _sample_temperatures(self) -> Dict[str, float]:
+        """
+        执行一次真实的温度采样并更新趋势引擎。只由 _temp_sampler 调用，保证每次采样只记录一次。
+        """
+        with self._perf.time("sensors"):
+            current_temps = await self._get_sensor_data_structured()
+        self._register_devices(current_temps)
+        if current_temps:
+            self._trend.update(current_temps, self.clock())
+        return current_temps
+
+    async def _sample_system_status(self) -> Dict[str, Any]:
+        cpu = self._cpu_sampler.snapshot()
+        if cpu["cpu_percent"] is None:
+            # 后台采样尚未产生第一个差值，使用非阻塞的 psutil 调用
+            with self._perf.time("psutil.cpu_percent"):
+                cpu["cpu_percent"] = psutil.cpu_percent(interval=None)
+        with self._perf.time("psutil.virtual_memory"):
+            mem = psutil.virtual_memory()
+        return {
+            **cpu,
+            "mem_total": mem.total,
+            "mem_used": mem.used,
+            "mem_percent": mem.percent,
         }
-        current_section_name = None
-
-        for line in lines:
-            line_stripped = line.strip()
-            # 检查是否为新设备的开始
-            for key, name in current_section_map.items():
-                if line_stripped.startswith(key):
-                    current_section_name = name
-                    break
-            
-            temp_str = ""
-            if current_section_name == "CPU" and "Package id 0:" in line_stripped:
-                temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
-            elif current_section_name == "主板" and "temp1:" in line_stripped:
-                temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
-            elif current_section_name == "网卡" and "temp1:" in line_stripped:
-                temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
-            elif current_section_name == "硬盘" and "Composite:" in line_stripped:
-                temp_str = line_stripped.split(":")[1].strip().split(" ")[0]
-            
-            if temp_str:
-                try:
-                    temp_value = float(temp_str.lstrip('+').replace("°C", ""))
-                    data_dict[current_section_name] = temp_value
-                    # 重置 current_section_name，因为我们已经找到了这个设备的关键温度
-                    current_section_name = None 
-                except (ValueError, IndexError):
-                    continue
-        return data_dict
-
-    def _get_temperature_trend(self, device_name: str) -> str:
+
+    async def _record_history_samples(self):
+        now = datetime.now().timestamp()
+        store = self._metrics_store
+        for device_key, temp in (await self._temp_sampler.get()).items():
+            store.add(f"temp.{device_key}", temp, now)
+
+        system_status = await self._system_sampler.get()
+        if system_status["cpu_percent"] is not None:
+            store.add("sys.cpu", system_status["cpu_percent"], now)
+        store.add("sys.mem", system_status["mem_percent"], now)
+
+        if self._docker_monitor is not None and self._docker_monitor.ready:
+            for container in self._docker_monitor.snapshot():
+                latest = container["latest"]
+                if latest is not None:
+                    store.add(f"docker.{container['name']}.cpu", latest["cpu_percent"], now)
+                    store.add(f"docker.{container['name']}.mem", latest["mem_usage"] / (1024**2), now)
+
+    async def _history_recorder(self):
+        interval = self.config.get("history_record_interval_seconds", 60)
+        last_prune = 0.0
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                await self._record_history_samples()
+                # 缓冲区在事件循环中取出，数据库写入在线程中批量完成
+                batch = self._metrics_store.drain()
+                await asyncio.to_thread(self._metrics_store.write, batch)
+
+                if datetime.now().timestamp() - last_prune > 3600:
+                    deleted = await asyncio.to_thread(self._metrics_store.prune)
+                    last_prune = datetime.now().timestamp()
+                    if deleted:
+                        logger.info(f"已清理 {deleted} 条过期的历史数据。")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"记录历史数据时出现错误: {e}", exc_info=True)
+
+    def _resolve_history_series(self, name: str):
+        """
+        将用户输入解析为 (series 名称, 显示名称, 单位)，无法识别时返回 None。
+        """
+        base_name, index = split_device_key(name)
+        display_to_key = {display: key for key, display in self.device_name_map.items()}
+        base_key = base_name if base_name in self.device_name_map else display_to_key.get(base_name)
+        if base_key is not None:
+            device_key = base_key if index == 1 else f"{base_key}#{index}"
+            return f"temp.{device_key}", f"{self._display_name(device_key)}温度", "°C"
+        if name.lower() in ("cpu_usage", "cpu使用率", "使用率"):
+            return "sys.cpu", "CPU使用率", "%"
+        if name.lower() in ("mem", "memory", "内存"):
+            return "sys.mem", "内存使用率", "%"
+        # 容器名，或 容器名:mem / 容器名:内存 查询容器内存占用
+        container, _, metric = name.partition(":")
+        series = self._metrics_store.series()
+        if metric.lower() in ("", "cpu") and f"docker.{container}.cpu" in series:
+            return f"docker.{container}.cpu", f"容器 {container} CPU占用", "%"
+        if metric.lower() in ("mem", "memory", "内存") and f"docker.{container}.mem" in series:
+            return f"docker.{container}.mem", f"容器 {container} 内存占用", "MB"
+        return None
+
+    @filter.command("history", alias={"历史"})
+    async def get_history_command(self, event: AstrMessageEvent, device: str, time_range: str = "6h"):
+        logger.info(f"用户 {event.get_sender_name()} 触发了历史数据查询指令: {device} {time_range}")
+        if self._metrics_store is None:
+            yield event.plain_result("历史数据记录未启用 (history_enabled)。")
+            return
+
+        seconds = parse_range(time_range)
+        if seconds is None:
+            yield event.plain_result(f"无法识别的时间范围 '{time_range}'，示例: 30m、6h、7d。")
+            return
+
+        resolved = self._resolve_history_series(device)
+        if resolved is None:
+            devices = "、".join(self.device_name_map.values())
+            yield event.plain_result(f"未知的设备 '{device}'。可用: {devices}、cpu_usage、内存、容器名 或 容器名:内存。")
+            return
+        series, title, unit = resolved
+
+        end = datetime.now().timestamp()
+        # 先写入尚未落盘的样本，保证能查询到最新数据
+        await asyncio.to_thread(self._metrics_store.write, self._metrics_store.drain())
+        rows = await asyncio.to_thread(self._metrics_store.query, series, end - seconds, end, 12)
+        if not rows:
+            yield event.plain_result(f"{title} 在最近 {time_range} 内没有历史数据。")
+            return
+
+        overall_min = min(row[1] for row in rows)
+        overall_max = max(row[3] for row in rows)
+        # 各点的样本数可能不同 (如插件重启造成的空缺)，总体平均值按样本数加权
+        overall_avg = sum(row[2] * row[4] for row in rows) / sum(row[4] for row in rows)
+        time_format = "%H:%M" if seconds <= 86400 else "%m-%d %H:%M"
+        output_parts = [
+            f"--- {title} 最近 {time_range} ---",
+            f"最低/平均/最高: {overall_min:.1f}{unit} / {overall_avg:.1f}{unit} / {overall_max:.1f}{unit}",
+            f"趋势: {sparkline([row[2] for row in rows], width=len(rows))}",
+        ]
+        for timestamp, low, avg, high, _ in rows:
+            output_parts.append(
+                f"{datetime.fromtimestamp(timestamp).strftime(time_format)}  {avg:.1f}{unit} ({low:.1f}~{high:.1f})"
+            )
+        yield event.plain_result("\n".join(output_parts))
+
+    def _get_temperature_trend(self, device_key: str) -> str:
         """
-        根据历史温度数据计算并返回温度趋势。
-        使用历史数据的平均变化率判断。
+        返回设备的温度趋势描述，例如 "↑ +0.8°C/min，约 12 分钟后达到阈值"。
+        结果由趋势引擎在采样时增量算好，这里只做格式化。
         """
-        history = self._temperature_history.get(device_name)
-        if not history or len(history) < 2:
+        result = self._trend.get(device_key)
+        if result is None or result.samples < 2:
             return "" # 数据不足以判断趋势
 
-        # 计算平均变化率
-        diff_sum = 0
-        count = 0
-        for i in range(1, len(history)):
-            diff_sum += history[i] - history[i-1]
-            count += 1
-        
-        if count > 0:
-            avg_diff = diff_sum / count
-            if avg_diff > 0.1: # 设定一个微小的阈值，避免微小波动显示趋势
-                return "↑"
-            elif avg_diff < -0.1:
-                return "↓"
-        return "" # 变化不明显或数据不足
+        # 设定一个微小的阈值 (°C/分钟)，避免微小波动显示趋势
+        slope_threshold = self.config.get("trend_slope_threshold", 0.1)
+        if result.slope > slope_threshold:
+            trend = f"↑ {result.slope:+.1f}°C/min"
+            if result.eta_minutes is not None and result.eta_minutes < 120:
+                trend += f"，约 {result.eta_minutes:.0f} 分钟后达到阈值"
+            return trend
+        if result.slope < -slope_threshold:
+            return f"↓ {result.slope:+.1f}°C/min"
+        return "" # 变化不明显
+
+    def _format_alerts(self, alerts: List[Alert]) -> str:
+        sections = []
+        high = [a for a in alerts if a.kind == ALERT_HIGH]
+        rising = [a for a in alerts if a.kind == ALERT_RISING]
+        recovered = [a for a in alerts if a.kind == ALERT_RECOVERED]
+        if high:
+            sections.append("⚠️ 服务器高温告警 ⚠️\n" + "\n".join(
+                f"检测到 {self._display_name(a.device)} 温度异常，当前: {a.temp}°C, 阈值: {a.threshold}°C"
+                for a in high
+            ))
+        if rising:
+            sections.append("📈 温度快速上升预警\n" + "\n".join(
+                f"{self._display_name(a.device)} 当前 {a.temp}°C，升温 {a.slope:+.1f}°C/min，"
+                f"预计约 {a.eta_minutes:.0f} 分钟后达到阈值 {a.threshold}°C"
+                for a in rising
+            ))
+        if recovered:
+            sections.append("✅ 温度已恢复\n" + "\n".join(
+                f"{self._display_name(a.device)} 已回落至 {a.temp}°C (阈值: {a.threshold}°C)"
+                for a in recovered
+            ))
+        return "\n\n".join(sections)
+
+    async def _send_alert(self, group_umo: str, message: str):
+        logger.info(f"向群聊 {group_umo} 发送温度告警。")
+        await self.context.send_message(group_umo, [Comp.Plain(message)])
+
+    async def monitor_once(self) -> Tuple[float, List[Alert]]:
+        """
+        执行一次定时温度检查：采样、判定告警并提交发送，返回 (下一次采样间隔秒数, 本次产生的告警)。
+        由 _temperature_monitor 循环调用，离线回放工具也直接调用它驱动插件。
+        """
+        logger.debug("正在执行定时温度检查...")
+        current_temps = await self._temp_sampler.get()
+        if not current_temps:
+            logger.warning("定时检查无法获取到温度数据，跳过本次检查。")
+            return self._scheduler.max_interval, []
+
+        # 告警判定只修改内存状态，消息交给后台发送任务，不阻塞采样循环
+        trends = self._trend.results()
+        alerts = self._alert_evaluator.evaluate(current_temps, trends, now=self.clock())
+        if alerts and not self._alert_dispatcher.groups:
+            logger.warning("温度达到告警条件，但未配置告警群聊 (alert_groups)。")
+        elif alerts:
+            logger.info(f"提交 {len(alerts)} 条温度告警，发送至 {len(self._alert_dispatcher.groups)} 个群聊。")
+            if not self._alert_dispatcher.submit(self._format_alerts(alerts)):
+                logger.warning("告警发送队列已满，本次告警被丢弃。")
+
+        return self._scheduler.next_interval(current_temps, trends, self._thresholds), alerts
 
     async def _temperature_monitor(self):
         logger.info("温度监控后台任务正在运行...")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        current_interval = None
         while True:
             try:
-                interval_minutes = self.config.get("check_interval_minutes", 5)
-                await asyncio.sleep(interval_minutes * 60)
-
-                logger.info("正在执行定时温度检查...")
-                current_temps = await self._get_sensor_data_structured()
-                if not current_temps:
-                    logger.warning("定时检查无法获取到温度数据，跳过本次检查。")
-                    continue
-
-                # 更新温度历史
-                for device_key, temp in current_temps.items():
-                    # 确保设备名称在 device_name_map 中是中文显示名
-                    display_name = self.device_name_map.get(device_key, device_key)
-                    if display_name not in self._temperature_history:
-                        self._temperature_history[display_name] = deque(maxlen=self.history_length)
-                    self._temperature_history[display_name].append(temp)
-
-                thresholds = self.config.get("thresholds", {})
-                alert_messages = []
-
-                for device_key, temp in current_temps.items():
-                    if device_key in thresholds and temp > thresholds[device_key]:
-                        display_name = self.device_name_map.get(device_key, device_key)
-                        msg = f"检测到 {display_name} 温度异常，当前: {temp}°C, 阈值: {thresholds[device_key]}°C"
-                        alert_messages.append(msg)
-                
-                if alert_messages:
-                    full_alert_message = "⚠️ 服务器高温告警 ⚠️\n" + "\n".join(alert_messages)
-                    alert_groups = self.config.get("alert_groups", [])
-                    
-                    if not alert_groups:
-                        logger.warning("温度达到阈值，但未配置告警群聊 (alert_groups)。")
-                        continue
-
-                    for group_umo in alert_groups:
-                        logger.info(f"向群聊 {group_umo} 发送高温告警。")
-                        await self.context.send_message(group_umo, [Comp.Plain(full_alert_message)])
+                # 按单调时钟的截止时间休眠，采样与告警本身的耗时不会累积成漂移
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tick_start = loop.time()
+                # 实际唤醒时刻相对截止时间的延迟，反映事件循环是否被阻塞
+                self._monitor_last_lag = max(0.0, tick_start - deadline)
+                self._monitor_lag.observe(self._monitor_last_lag)
+                interval, _ = await self.monitor_once()
+
+                if interval != current_interval:
+                    logger.info(f"温度监控采样间隔调整为 {interval:.0f} 秒。")
+                    current_interval = interval
+                # 下一次截止时间从本轮开始时刻计算；本轮耗时已超过间隔时从当前时刻开始，不补采错过的样本
+                deadline = max(tick_start + interval, loop.time())
             
             except asyncio.CancelledError:
                 logger.info("温度监控任务被取消，正在停止...")
                 break
             except Exception as e:
                 logger.error(f"温度监控任务出现错误: {e}", exc_info=True)
-                await asyncio.sleep(300)
+                deadline = loop.time() + 300
+
+    async def _start_exporter(self):
+        try:
+            await self._exporter.start()
+            logger.info(f"指标导出端点已启动：http://{self._exporter.host}:{self._exporter.port}/metrics")
+        except OSError as e:
+            logger.error(f"指标导出端点启动失败 ({self._exporter.host}:{self._exporter.port}): {e}")
+
+    async def _start_fleet_server(self):
+        try:
+            await self._fleet_server.start()
+            logger.info(f"多主机监控已启动，正在 {self._fleet_server.host}:{self._fleet_server.port} 等待 agent 连接。")
+        except OSError as e:
+            logger.error(f"多主机监控启动失败 ({self._fleet_server.host}:{self._fleet_server.port}): {e}")
+
+    @staticmethod
+    def _format_age(seconds: float) -> str:
+        if seconds < 60:
+            return f"{max(0, int(seconds))} 秒前"
+        if seconds < 3600:
+            return f"{int(seconds // 60)} 分钟前"
+        return f"{int(seconds // 3600)} 小时前"
+
+    def _lookup_fleet_host(self, host: str):
+        """
+        返回 (主机状态, 错误提示)。未开启多主机监控或主机不存在时主机状态为 None。
+        """
+        if self._fleet is None:
+            return None, "未开启多主机监控 (fleet_enabled)，只能查询本机。"
+        state = self._fleet.get(host)
+        if state is None or not state.snapshot:
+            known = "、".join(row.name for row in self._fleet.rows()) or "暂无"
+            return None, f"未找到主机 {host}。已连接过的主机：{known}"
+        return state, None
+
+    def _format_fleet_header(self, state: HostState) -> str:
+        age = self._format_age(state.age())
+        if self._fleet.is_online(state):
+            return f"=== {state.name} (更新于 {age}) ==="
+        return f"=== {state.name} (离线，数据来自 {age}) ==="
+
+    def _format_fleet_temps(self, state: HostState) -> List[str]:
+        temps = state.snapshot.get("temps") or {}
+        if not temps:
+            return ["--- 温度信息 (无法获取) ---"]
+        hot = {device_key for device_key, _, _ in state.hot}
+        lines = ["--- 温度信息 ---"]
+        for device_key, temp in temps.items():
+            marker = " ⚠️" if device_key in hot else ""
+            lines.append(f"{self._display_name(device_key)}温度: {temp}°C{marker}")
+        return lines
+
+    def _format_fleet_status(self, state: HostState) -> List[str]:
+        snapshot = state.snapshot
+        lines = ["\n--- 系统状态 ---"]
+        if state.cpu_percent is not None:
+            lines.append(f"CPU使用率: {state.cpu_percent}%")
+        if snapshot.get("load"):
+            load_avg = " / ".join(f"{value:.2f}" for value in snapshot["load"])
+            lines.append(f"系统负载 (1/5/15分钟): {load_avg}")
+        mem = snapshot.get("mem")
+        if mem and mem[1]:
+            lines.append(
+                f"内存使用率: {state.mem_percent}% ({round(mem[0] / (1024**3), 2)}GB/{round(mem[1] / (1024**3), 2)}GB)"
+            )
+        return lines
+
+    def _format_fleet_summary(self) -> str:
+        if self._fleet is None:
+            return "未开启多主机监控 (fleet_enabled)。"
+        rows = self._fleet.rows()
+        if not rows:
+            return "暂无 agent 主机连接。"
+        now = time.time()
+        lines = [f"--- 集群概览 (在线 {self._fleet.online_count(now)}/{len(rows)} 台) ---"]
+        for state in rows:
+            if not state.snapshot:
+                lines.append(f"{state.name}: 等待首次上报")
+                continue
+            parts = []
+            if state.max_temp is not None:
+                parts.append(f"最高 {self._display_name(state.max_temp[0])} {state.max_temp[1]}°C")
+            if state.cpu_percent is not None:
+                parts.append(f"CPU {state.cpu_percent}%")
+            if state.mem_percent is not None:
+                parts.append(f"内存 {state.mem_percent}%")
+            if state.snapshot.get("containers") is not None:
+                parts.append(f"容器 {state.containers_running}/{state.containers_total}")
+            if not self._fleet.is_online(state, now):
+                parts.append(f"离线 ({self._format_age(state.age(now))})")
+            lines.append(f"{state.name}: " + " | ".join(parts))
+        if self._fleet.containers_total:
+            lines.append(f"容器合计: {self._fleet.containers_running}/{self._fleet.containers_total} 运行中")
+        for name in sorted(self._fleet.hot_hosts):
+            state = self._fleet.hosts[name]
+            details = "，".join(
+                f"{self._display_name(device_key)} {temp}°C (阈值 {threshold}°C)"
+                for device_key, temp, threshold in state.hot
+            )
+            lines.append(f"⚠️ {name} 高温: {details}")
+        return "\n".join(lines)
+
+    def _log_slow_call(self, name: str, seconds: float):
+        logger.warning(f"慢调用: {name} 耗时 {seconds * 1000:.0f} ms。")
+
+    def _log_sampler_error(self, name: str, error: Exception):
+        logger.error(f"后台{name}采样失败: {error}，将在下一个周期重试。", exc_info=error)
+
+    def _log_loop_block(self, lag: float):
+        logger.warning(f"事件循环被阻塞约 {lag * 1000:.0f} ms，可能有处理函数执行了同步阻塞操作。")
+
+    def _collect_metrics(self) -> str:
+        """
+        生成 OpenMetrics 文本。所有数据均来自内存中的最近一次采样，不调用传感器、psutil 或 Docker API。
+        """
+        writer = OpenMetricsWriter()
+
+        temps = self._temp_sampler.value or {}
+        writer.gauge(
+            "astrbot_temperature_celsius", "各硬件设备最近一次采样的温度",
+            [({"device": key, "name": self._display_name(key)}, temp) for key, temp in temps.items()],
+            unit="celsius",
+        )
+        writer.gauge(
+            "astrbot_temperature_threshold_celsius", "各硬件设备的告警阈值",
+            [({"device": key}, float(value)) for key, value in self._thresholds.items()],
+            unit="celsius",
+        )
+        trends = self._trend.results()
+        writer.gauge(
+            "astrbot_temperature_slope", "趋势窗口内的升温速率 (°C/分钟)",
+            [({"device": key}, trend.slope) for key, trend in trends.items()],
+        )
+        writer.gauge(
+            "astrbot_temperature_alerting", "设备当前是否处于高温告警状态",
+            [({"device": key}, int(self._alert_evaluator.is_tripped(key))) for key in temps],
+        )
+
+        cpu = self._cpu_sampler.snapshot()
+        if cpu["cpu_percent"] is not None:
+            writer.gauge("astrbot_cpu_usage_percent", "整体 CPU 使用率", [(None, cpu["cpu_percent"])])
+        writer.gauge(
+            "astrbot_cpu_core_usage_percent", "各核心 CPU 使用率",
+            [({"core": str(index)}, value) for index, value in enumerate(cpu["per_core"])],
+        )
+        if cpu["load_avg"]:
+            writer.gauge(
+                "astrbot_load_average", "系统平均负载",
+                [({"period": period}, value) for period, value in zip(("1m", "5m", "15m"), cpu["load_avg"])],
+            )
+        system_status = self._system_sampler.value
+        if system_status is not None:
+            writer.gauge("astrbot_memory_used_bytes", "已用内存", [(None, system_status["mem_used"])], unit="bytes")
+            writer.gauge("astrbot_memory_total_bytes", "内存总量", [(None, system_status["mem_total"])], unit="bytes")
+
+        if self._resource_sampler is not None:
+            resources = self._resource_sampler.snapshot()
+            if resources["disk"] is not None:
+                writer.gauge(
+                    "astrbot_disk_io_bytes_per_second", "磁盘读写速率",
+                    [({"direction": "read"}, resources["disk"]["read_bps"]),
+                     ({"direction": "write"}, resources["disk"]["write_bps"])],
+                )
+            if resources["net"] is not None:
+                writer.gauge(
+                    "astrbot_network_bytes_per_second", "网络收发速率",
+                    [({"direction": "recv"}, resources["net"]["recv_bps"]),
+                     ({"direction": "sent"}, resources["net"]["sent_bps"])],
+                )
+            writer.gauge(
+                "astrbot_filesystem_used_bytes", "文件系统已用空间",
+                [({"mountpoint": fs["mountpoint"]}, fs["used"]) for fs in resources["filesystems"]],
+                unit="bytes",
+            )
+            writer.gauge(
+                "astrbot_filesystem_size_bytes", "文件系统总容量",
+                [({"mountpoint": fs["mountpoint"]}, fs["total"]) for fs in resources["filesystems"]],
+                unit="bytes",
+            )
+
+        if self._docker_monitor is not None and self._docker_monitor.ready:
+            containers = self._docker_monitor.snapshot()
+            writer.gauge(
+                "astrbot_container_running", "容器是否处于运行状态",
+                [({"name": c["name"]}, int(c["state"] == "running")) for c in containers],
+            )
+            running = [c for c in containers if c["latest"] is not None]
+            writer.gauge(
+                "astrbot_container_cpu_percent", "容器 CPU 使用率",
+                [({"name": c["name"]}, c["latest"]["cpu_percent"]) for c in running],
+            )
+            writer.gauge(
+                "astrbot_container_memory_usage_bytes", "容器内存使用量",
+                [({"name": c["name"]}, c["latest"]["mem_usage"]) for c in running],
+                unit="bytes",
+            )
+
+        if self._fleet is not None:
+            now = time.time()
+            rows = self._fleet.rows()
+            writer.gauge(
+                "astrbot_fleet_host_online", "agent 主机是否在线",
+                [({"host": state.name}, int(self._fleet.is_online(state, now))) for state in rows],
+            )
+            writer.gauge(
+                "astrbot_fleet_temperature_celsius", "agent 主机最近一次上报的温度",
+                [
+                    ({"host": state.name, "device": key}, temp)
+                    for state in rows for key, temp in (state.snapshot.get("temps") or {}).items()
+                ],
+                unit="celsius",
+            )
+
+        # 插件自身的健康指标
+        writer.histogram(
+            "astrbot_plugin_call_duration_seconds", "传感器、psutil、Docker API 与图片渲染等调用的耗时",
+            [({"op": name}, histogram) for name, histogram in self._perf.items()],
+            unit="seconds",
+        )
+        writer.counter(
+            "astrbot_plugin_sampler_requests", "共享采样层的请求数",
+            [
+                ({"sampler": name, "result": result}, sampler.stats()[result])
+                for name, sampler in (("temperature", self._temp_sampler), ("system", self._system_sampler))
+                for result in ("hits", "misses", "coalesced")
+            ],
+        )
+        dispatcher = self._alert_dispatcher
+        writer.counter(
+            "astrbot_plugin_alert_messages", "告警消息发送结果",
+            [({"result": "sent"}, dispatcher.sent), ({"result": "failed"}, dispatcher.failed),
+             ({"result": "dropped"}, dispatcher.dropped)],
+        )
+        if self.monitor_task is not None:
+            writer.histogram(
+                "astrbot_plugin_monitor_lag_seconds", "温度监控循环实际唤醒时间相对计划时间的延迟",
+                [(None, self._monitor_lag)], unit="seconds",
+            )
+            if self._monitor_last_lag is not None:
+                writer.gauge(
+                    "astrbot_plugin_monitor_last_lag_seconds", "最近一次温度监控循环的唤醒延迟",
+                    [(None, self._monitor_last_lag)], unit="seconds",
+                )
+        if self._loop_lag is not None:
+            writer.histogram(
+                "astrbot_plugin_event_loop_lag_seconds", "事件循环的调度延迟",
+                [(None, self._loop_lag.histogram)], unit="seconds",
+            )
+            writer.counter(
+                "astrbot_plugin_event_loop_blocked", "事件循环延迟超过阈值的次数",
+                [(None, self._loop_lag.blocked)],
+            )
+        return writer.finish()
 
     @filter.command("servertemp", alias={"温度", "temp"})
-    async def get_server_temp_command(self, event: AstrMessageEvent):
+    async def get_server_temp_command(self, event: AstrMessageEvent, host: str = ""):
         logger.info(f"用户 {event.get_sender_name()} 触发了温度查询指令")
-        structured_data = await self._get_sensor_data_structured()
+        host = host.strip()
+        if host.lower() in FLEET_SELECTORS:
+            yield event.plain_result(self._format_fleet_summary())
+            return
+        if host.lower() not in LOCAL_SELECTORS:
+            state, error = self._lookup_fleet_host(host)
+            if state is None:
+                yield event.plain_result(error)
+                return
+            yield event.plain_result("\n".join([self._format_fleet_header(state)] + self._format_fleet_temps(state)))
+            return
+
+        structured_data = await self._temp_sampler.get()
 
         if not structured_data:
             yield event.plain_result("无法获取服务器温度信息，请检查后台日志。")
@@ -184,50 +834,58 @@ class ServerTempPlugin(Star):
 
         output_parts = []
         for device_key, temp in structured_data.items():
-            display_name = self.device_name_map.get(device_key, device_key)
-            # 在这里将当前温度加入历史记录，以便后续计算趋势
-            if display_name not in self._temperature_history:
-                self._temperature_history[display_name] = deque(maxlen=self.history_length)
-            self._temperature_history[display_name].append(temp)
-            
-            trend = self._get_temperature_trend(display_name)
+            display_name = self._display_name(device_key)
+            trend = self._get_temperature_trend(device_key)
             output_parts.append(f"{display_name}温度: {temp}°C {trend}".strip()) # strip 避免趋势为空时多余空格
         
         yield event.plain_result("--- 温度信息 ---\n" + "\n".join(output_parts))
 
     @filter.command("status", alias={"状态"})
-    async def get_server_status_command(self, event: AstrMessageEvent):
+    async def get_server_status_command(self, event: AstrMessageEvent, host: str = ""):
         logger.info(f"用户 {event.get_sender_name()} 触发了服务器状态查询指令")
+        host = host.strip()
+        if host.lower() in FLEET_SELECTORS:
+            yield event.plain_result(self._format_fleet_summary())
+            return
+        if host.lower() not in LOCAL_SELECTORS:
+            state, error = self._lookup_fleet_host(host)
+            if state is None:
+                yield event.plain_result(error)
+                return
+            yield event.plain_result("\n".join(
+                [self._format_fleet_header(state)] + self._format_fleet_temps(state) + self._format_fleet_status(state)
+            ))
+            return
         
         output_message_parts = []
 
         # 获取温度信息
-        structured_data = await self._get_sensor_data_structured()
+        structured_data = await self._temp_sampler.get()
         if structured_data:
             output_message_parts.append("--- 温度信息 ---")
             for device_key, temp in structured_data.items():
-                display_name = self.device_name_map.get(device_key, device_key)
-                # 在这里将当前温度加入历史记录，以便后续计算趋势
-                if display_name not in self._temperature_history:
-                    self._temperature_history[display_name] = deque(maxlen=self.history_length)
-                self._temperature_history[display_name].append(temp)
-
-                trend = self._get_temperature_trend(display_name)
+                display_name = self._display_name(device_key)
+                trend = self._get_temperature_trend(device_key)
                 output_message_parts.append(f"{display_name}温度: {temp}°C {trend}".strip())
         else:
             output_message_parts.append("--- 温度信息 (无法获取) ---")
 
         # 获取CPU和内存信息
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            mem = psutil.virtual_memory()
-            mem_total_gb = round(mem.total / (1024**3), 2)
-            mem_used_gb = round(mem.used / (1024**3), 2)
-            mem_percent = mem.percent
+            system_status = await self._system_sampler.get()
+            cpu_percent = system_status["cpu_percent"]
+            mem_total_gb = round(system_status["mem_total"] / (1024**3), 2)
+            mem_used_gb = round(system_status["mem_used"] / (1024**3), 2)
+            mem_percent = system_status["mem_percent"]
 
             output_message_parts.append("\n--- 系统状态 ---")
             output_message_parts.append(f"CPU使用率: {cpu_percent}%")
+            if system_status["per_core"]:
+                per_core = " ".join(f"{value}%" for value in system_status["per_core"])
+                output_message_parts.append(f"各核心使用率: {per_core}")
+            if system_status["load_avg"]:
+                load_avg = " / ".join(f"{value:.2f}" for value in system_status["load_avg"])
+                output_message_parts.append(f"系统负载 (1/5/15分钟): {load_avg}")
             output_message_parts.append(f"内存使用率: {mem_percent}% ({mem_used_gb}GB/{mem_total_gb}GB)")
 
         except Exception as e:
@@ -235,209 +893,410 @@ class ServerTempPlugin(Star):
             output_message_parts.append("\n--- 系统状态 (无法获取) ---")
             output_message_parts.append("获取服务器CPU/内存状态失败，请检查后台日志。")
 
+        if self._resource_sampler is not None:
+            output_message_parts.extend(self._format_resources(self._resource_sampler.snapshot()))
+
         yield event.plain_result("\n".join(output_message_parts))
 
+    @staticmethod
+    def _format_resources(resources: Dict[str, Any]) -> List[str]:
+        parts = []
+        if resources["timestamp"] is None:
+            parts.append("\n--- 磁盘与网络 (首次采样尚未完成) ---")
+            return parts
+
+        parts.append("\n--- 磁盘与网络 ---")
+        disk = resources["disk"]
+        if disk is not None:
+            parts.append(
+                f"磁盘读写: 读 {format_bytes(disk['read_bps'])}/s，写 {format_bytes(disk['write_bps'])}/s "
+                f"(IOPS {disk['read_iops']:.0f}/{disk['write_iops']:.0f})"
+            )
+        net = resources["net"]
+        if net is not None:
+            parts.append(f"网络: 接收 {format_bytes(net['recv_bps'])}/s，发送 {format_bytes(net['sent_bps'])}/s")
+        if disk is None and net is None:
+            parts.append("速率需要两次采样，请稍后再试")
+        for fs in resources["filesystems"]:
+            parts.append(
+                f"{fs['mountpoint']}: {fs['percent']}% ({format_bytes(fs['used'])}/{format_bytes(fs['total'])})"
+            )
+
+        if resources["top_cpu"]:
+            parts.append(f"\n--- CPU 占用最高的进程 (共 {resources['process_count']} 个) ---")
+            for proc in resources["top_cpu"]:
+                parts.append(f"{proc['name']} [{proc['pid']}]: CPU {proc['cpu_percent']:.1f}%，内存 {format_bytes(proc['rss'])}")
+        if resources["top_mem"]:
+            parts.append("\n--- 内存占用最高的进程 ---")
+            for proc in resources["top_mem"]:
+                parts.append(f"{proc['name']} [{proc['pid']}]: 内存 {format_bytes(proc['rss'])} ({proc['mem_percent']}%)")
+        return parts
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("perf", alias={"性能"})
+    async def get_perf_command(self, event: AstrMessageEvent):
+        logger.info(f"用户 {event.get_sender_name()} 触发了性能统计查询指令")
+
+        def ms(seconds) -> str:
+            return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+        lines = ["--- 调用耗时 (ms) ---"]
+        summary = self._perf.summary()
+        if summary:
+            lines.append("操作 | 次数 | p50 | p95 | p99 | 最大")
+            for item in summary:
+                lines.append(
+                    f"{item['name']} | {item['count']} | {ms(item['p50'])} | {ms(item['p95'])} | "
+                    f"{ms(item['p99'])} | {ms(item['max'])}"
+                )
+        else:
+            lines.append("暂无数据。")
+
+        lines.append("\n--- 采样缓存 ---")
+        for name, sampler in (("温度", self._temp_sampler), ("系统状态", self._system_sampler)):
+            stats = sampler.stats()
+            lines.append(f"{name}: 命中 {stats['hits']} / 未命中 {stats['misses']} / 合并 {stats['coalesced']}")
+        lines.append(f"容器图片: 命中 {self._render_cache.hits} / 未命中 {self._render_cache.misses}")
+
+        if self._loop_lag is not None and self._loop_lag.histogram.count:
+            histogram = self._loop_lag.histogram
+            lines.append("\n--- 事件循环延迟 (ms) ---")
+            lines.append(
+                f"p50 {ms(histogram.percentile(0.5))} / p99 {ms(histogram.percentile(0.99))} / "
+                f"最大 {ms(histogram.max)}，超过阈值 {self._loop_lag.blocked} 次"
+            )
+        if self._monitor_lag.count:
+            lines.append(f"温度监控唤醒延迟 p99: {ms(self._monitor_lag.percentile(0.99))} ms")
+
+        yield event.plain_result("\n".join(lines))
+
+    def _container_data_from_monitor(self) -> List[Dict[str, str]]:
+        """从后台 Docker 监控的内存数据构建容器表格，不访问 Docker 守护进程。"""
+        container_data = []
+        for container in self._docker_monitor.snapshot():
+            cpu_percent = "N/A"
+            mem_usage = "N/A"
+            latest = container["latest"]
+            if latest is not None:
+                cpu_percent = f"{latest['cpu_percent']}%"
+                mem_usage = format_memory(latest["mem_usage"], latest["mem_limit"])
+            container_data.append({
+                "name": container["name"],
+                "cpu_percent": cpu_percent,
+                "mem_usage": mem_usage,
+                "status": container["state"],
+                "cpu_trend": sparkline(container["cpu_history"]) if latest is not None else "",
+            })
+        return container_data
+
+    async def _container_data_from_api(self) -> List[Dict[str, str]]:
+        """按需向 Docker 守护进程查询容器列表与统计信息。"""
+        containers = await self._docker.list_containers(all=True)
+
+        # 只有运行中的容器才有统计数据，并发获取，超时的容器显示为 N/A
+        running_ids = [c["Id"] for c in containers if c.get("State") == "running"]
+        all_stats = await self._docker.stats_many(
+            running_ids,
+            concurrency=self.config.get("docker_stats_concurrency", 8),
+            timeout=self.config.get("docker_stats_timeout_seconds", 3),
+        )
+
+        container_data = []
+        for container in containers:
+            name = (container.get("Names") or [container["Id"][:12]])[0].lstrip("/")
+            status = container.get("State", "unknown")
+            
+            cpu_percent = "N/A"
+            mem_usage = "N/A"
+
+            stats = all_stats.get(container["Id"])
+            if stats:
+                cpu = calculate_cpu_percent(stats)
+                cpu_percent = f"{cpu}%" if cpu is not None else "数据不完整"
+                memory = calculate_memory(stats)
+                mem_usage = format_memory(*memory) if memory is not None else "数据不完整"
+            elif container["Id"] in all_stats:
+                logger.warning(f"无法在限定时间内获取容器 {name} 的统计信息。")
+            
+            container_data.append({
+                "name": name,
+                "cpu_percent": cpu_percent,
+                "mem_usage": mem_usage,
+                "status": status,
+                "cpu_trend": "",
+            })
+        return container_data
+
+    async def _collect_container_data(self) -> List[Dict[str, str]]:
+        if self._docker_monitor is not None and self._docker_monitor.ready:
+            return self._container_data_from_monitor()
+        if self._docker_monitor is not None and self._docker_monitor.last_error:
+            logger.warning(f"Docker 后台监控未就绪 ({self._docker_monitor.last_error})，改为按需查询。")
+        return await self._container_data_from_api()
+
+    def _format_containers_text(self, container_data: List[Dict[str, str]]) -> str:
+        text_lines = ["容器名          | 容器CPU占用 | 容器内存占用 | 容器运行状态"]
+        for data in container_data: 
+            text_lines.append(f"{data['name']:<15} | {data['cpu_percent']:<12} | {data['mem_usage']:<12} | {data['status']:<12}")
+        return "\n".join(text_lines)
+
+    async def _render_containers(self, container_data: List[Dict[str, str]], title: str) -> str:
+        # 模板在模块加载时已编译，这里直接在本地渲染出 HTML，再交给 html_render 生成图片
+        with self._perf.time("render.template"):
+            html = CONTAINERS_TEMPLATE.render(
+                title=title,
+                containers=container_data,
+                current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        start = time.perf_counter()
+        try:
+            return await self.html_render(html, {})
+        finally:
+            elapsed = time.perf_counter() - start
+            self._perf.observe("render.image", elapsed)
+            logger.info(f"容器状态图片渲染耗时 {elapsed * 1000:.0f} ms。")
+
+    def _container_data_from_fleet(self, state: HostState) -> List[Dict[str, str]]:
+        """从 agent 上报的快照构建容器表格。"""
+        container_data = []
+        for name, status, cpu, mem_usage, mem_limit in state.snapshot.get("containers") or []:
+            container_data.append({
+                "name": name,
+                "cpu_percent": f"{cpu}%" if cpu is not None else "N/A",
+                "mem_usage": format_memory(mem_usage, mem_limit or 0) if mem_usage is not None else "N/A",
+                "status": status,
+                "cpu_trend": "",
+            })
+        return container_data
+
+    async def _containers_result(self, event: AstrMessageEvent, container_data: List[Dict[str, str]], title: str):
+        # 同一主机在同一刷新周期内容器列表与状态不变时复用已渲染的图片；渲染过慢或失败时立即回退到文本。
+        # 标题包含主机名，作为缓存键的一部分，避免不同主机上同名容器共用一张图片
+        timeout = self.config.get("render_timeout_seconds", 8)
+        cache_key = self._render_cache.key(container_data, ("name", "status"), scope=title)
+        url = None
+        try:
+            url = await self._render_cache.get_or_render(
+                cache_key, lambda: self._render_containers(container_data, title), timeout
+            )
+            if url is None:
+                logger.warning(f"容器状态图片渲染超过 {timeout} 秒，先返回文本结果，渲染完成后供后续查询复用。")
+        except Exception as e:
+            logger.error(f"容器状态图片渲染失败: {e}", exc_info=True)
+
+        if url:
+            return event.image_result(url)
+        return event.plain_result(f"--- {title} ---\n" + self._format_containers_text(container_data))
+
     @filter.command("containers", alias={"容器", "docker"})
-    async def get_docker_containers_command(self, event: AstrMessageEvent):
+    async def get_docker_containers_command(self, event: AstrMessageEvent, host: str = ""):
         logger.info(f"用户 {event.get_sender_name()} 触发了Docker容器查询指令")
-        
+        host = host.strip()
+        if host.lower() in FLEET_SELECTORS:
+            yield event.plain_result(self._format_fleet_summary())
+            return
+        if host.lower() not in LOCAL_SELECTORS:
+            state, error = self._lookup_fleet_host(host)
+            if state is None:
+                yield event.plain_result(error)
+            elif state.snapshot.get("containers") is None:
+                yield event.plain_result(f"主机 {state.name} 未上报 Docker 容器信息。")
+            elif not state.containers_total:
+                yield event.plain_result(f"主机 {state.name} 上没有 Docker 容器。")
+            else:
+                yield await self._containers_result(
+                    event, self._container_data_from_fleet(state), f"{state.name} Docker 容器状态"
+                )
+            return
+
+        container_data = []
         try:
-            client = docker.from_env()
-            containers = client.containers.list(all=True)
+            container_data = await self._collect_container_data()
 
-            if not containers:
+            if not container_data:
                 yield event.plain_result("当前没有运行的 Docker 容器。")
                 return
 
-            container_data = []
-            for container in containers:
-                name = container.name
-                status = container.status
-                
-                cpu_percent = "N/A"
-                mem_usage = "N/A"
-
-                try:
-                    stats = container.stats(stream=False)
-                    if stats:
-                        # CPU使用率计算
-                        if 'cpu_stats' in stats and 'precpu_stats' in stats and \
-                           'cpu_usage' in stats['cpu_stats'] and 'total_usage' in stats['cpu_stats']['cpu_usage'] and \
-                           'cpu_usage' in stats['precpu_stats'] and 'total_usage' in stats['precpu_stats']['cpu_usage'] and \
-                           'system_cpu_usage' in stats['cpu_stats'] and 'system_cpu_usage' in stats['precpu_stats']:
-
-                            cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - stats['precpu_stats']['cpu_usage']['total_usage']
-                            system_delta = stats['cpu_stats']['system_cpu_usage'] - stats['precpu_stats']['system_cpu_usage']
-                            
-                            num_cpus = len(stats['cpu_stats'].get('online_cpus', [])) if isinstance(stats['cpu_stats'].get('online_cpus'), list) else 1
-
-                            if system_delta > 0 and cpu_delta > 0 and num_cpus > 0:
-                                cpu_percent = f"{round((cpu_delta / system_delta) * num_cpus * 100.0, 2)}%"
-                            else:
-                                   cpu_percent = "0.00%"
-                        else:
-                            cpu_percent = "数据不完整"
-
-                        # 内存使用率
-                        if 'memory_stats' in stats and 'usage' in stats['memory_stats']:
-                            mem_usage_bytes = stats['memory_stats']['usage']
-                            mem_limit_bytes = stats['memory_stats'].get('limit', 0)
-
-                            if mem_limit_bytes > 0:
-                                mem_usage = f"{round(mem_usage_bytes / (1024**2), 2)}MB ({round((mem_usage_bytes / mem_limit_bytes) * 100, 2)}%)"
-                            else:
-                                mem_usage = f"{round(mem_usage_bytes / (1024**2), 2)}MB"
-                        else:
-                            mem_usage = "数据不完整"
-
-                except Exception as stats_e:
-                    logger.warning(f"无法获取容器 {name} 的统计信息: {stats_e}")
-                
-                container_data.append({
-                    "name": name,
-                    "cpu_percent": cpu_percent,
-                    "mem_usage": mem_usage,
-                    "status": status,
-                })
-            
-            # HTML 模板，包含基本样式，并移除运行时间列
-            HTML_TEMPLATE = '''
-            <div style="font-family: Arial, sans-serif; padding: 10px; background-color: #f0f2f5; border-radius: 8px;">
-                <h2 style="color: #333; text-align: center; margin-bottom: 15px;">Docker 容器状态</h2>
-                <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
-                    <thead style="background-color: #4CAF50; color: white;">
-                        <tr>
-                            <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">容器名</th>
-                            <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">CPU占用</th>
-                            <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">内存占用</th>
-                            <th style="padding: 8px; border: 1px solid #ddd; text-align: left;">运行状态</th>
-                            </tr>
-                    </thead>
-                    <tbody>
-                        {% for container in containers %}
-                        <tr style="background-color: {% if loop.index % 2 == 0 %}#f9f9f9{% else %}#ffffff{% endif %};">
-                            <td style="padding: 8px; border: 1px solid #ddd;">{{ container.name }}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{{ container.cpu_percent }}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{{ container.mem_usage }}</td>
-                            <td style="padding: 8px; border: 1px solid #ddd;">{{ container.status }}</td>
-                            </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-                <p style="font-size: 12px; color: #666; text-align: right; margin-top: 15px;">数据更新时间: {{ current_time }}</p>
-            </div>
-            '''
-            
-            # 渲染 HTML 并获取图片 URL
-            render_data = {
-                "containers": container_data,
-                "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            url = await self.html_render(HTML_TEMPLATE, render_data)
-            
-            yield event.image_result(url)
+            yield await self._containers_result(event, container_data, "Docker 容器状态")
 
-        except docker.errors.DockerException as e:
+        except DockerConnectionError as e:
             logger.error(f"连接Docker守护进程失败或Docker环境问题: {e}", exc_info=True)
             yield event.plain_result("无法连接到 Docker 守护进程，请检查 Docker 服务是否正在运行。")
         except Exception as e:
-            logger.error(f"获取Docker容器信息或图片渲染时发生错误: {e}", exc_info=True)
-            # 如果 HTML 渲染失败，则回退到文本输出
-            fallback_message = "获取 Docker 容器信息或图片渲染失败，请检查后台日志。\n"
-            fallback_message += "--- 回退到文本输出 ---\n"
-            
-            text_lines = ["容器名          | 容器CPU占用 | 容器内存占用 | 容器运行状态"]
-            for data in container_data: 
-                text_lines.append(f"{data['name']:<15} | {data['cpu_percent']:<12} | {data['mem_usage']:<12} | {data['status']:<12}")
-            
-            yield event.plain_result(fallback_message + "\n".join(text_lines))
+            logger.error(f"获取Docker容器信息时发生错误: {e}", exc_info=True)
+            fallback_message = "获取 Docker 容器信息失败，请检查后台日志。"
+            if container_data:
+                fallback_message += "\n" + self._format_containers_text(container_data)
+            yield event.plain_result(fallback_message)
 
-    @filter.command("启动容器", alias={"start_container"})
-    async def start_container_command(self, event: AstrMessageEvent, container_name: str):
-        logger.info(f"用户 {event.get_sender_name()} 触发了启动容器指令: {container_name}")
+    async def _list_container_refs(self) -> List[ContainerRef]:
+        """返回所有容器的 ID、名称、状态与标签，优先使用后台监控的容器清单。"""
+        if self._docker_monitor is not None and self._docker_monitor.ready:
+            return [
+                ContainerRef(c["id"], c["name"], c["state"], c["labels"])
+                for c in self._docker_monitor.snapshot()
+            ]
+        return [
+            ContainerRef(
+                c["Id"], (c.get("Names") or [c["Id"][:12]])[0].lstrip("/"),
+                c.get("State", "unknown"), c.get("Labels") or {},
+            )
+            for c in await self._docker.list_containers(all=True)
+        ]
+
+    @staticmethod
+    def _command_args(event: AstrMessageEvent, first_arg: str) -> List[str]:
+        """指令参数只声明了第一个，其余的选择器从完整消息中指令词之后的部分取出。"""
+        args = event.message_str.split()[1:]
+        if args and args[0] == first_arg:
+            return args
+        return [first_arg]
+
+    async def _bulk_container_operation(
+        self,
+        event: AstrMessageEvent,
+        first_arg: str,
+        verb: str,
+        operation: Callable[[str], Awaitable[None]],
+        skip_reason: Callable[[ContainerRef], Optional[str]],
+        confirm_multiple: bool = False,
+    ) -> str:
+        """confirm_multiple 为 True 时，匹配到多个容器且指令中没有 CONFIRM_FLAG 则只回复预览，不执行操作。"""
+        args = self._command_args(event, first_arg)
+        confirmed = CONFIRM_FLAG in args
+        selectors = [arg for arg in args if arg != CONFIRM_FLAG]
+        if not selectors:
+            return f"错误：请指定要{verb}的容器。"
+        logger.info(f"用户 {event.get_sender_name()} 触发了{verb}容器指令: {' '.join(selectors)}")
         try:
-            client = docker.from_env()
-            container = client.containers.get(container_name)
-            if container.status == "running":
-                yield event.plain_result(f"容器 {container_name} 已经在运行中。")
-                return
-            
-            container.start()
-            yield event.plain_result(f"容器 {container_name} 启动成功。")
-        except docker.errors.NotFound:
-            yield event.plain_result(f"错误：未找到名为 '{container_name}' 的容器。")
-        except docker.errors.APIError as e:
-            logger.error(f"启动容器 {container_name} 失败: {e}", exc_info=True)
-            yield event.plain_result(f"启动容器 {container_name} 失败：{e}")
+            containers, unmatched = select_containers(selectors, await self._list_container_refs())
+        except DockerConnectionError as e:
+            logger.error(f"连接Docker守护进程失败或Docker环境问题: {e}", exc_info=True)
+            return "无法连接到 Docker 守护进程，请检查 Docker 服务是否正在运行。"
+        except DockerError as e:
+            logger.error(f"获取容器列表失败: {e}", exc_info=True)
+            return f"获取容器列表失败：{e}"
         except Exception as e:
-            logger.error(f"启动容器 {container_name} 时发生未知错误: {e}", exc_info=True)
-            yield event.plain_result(f"启动容器 {container_name} 时发生未知错误。")
+            logger.error(f"获取容器列表时发生错误: {e}", exc_info=True)
+            return "获取容器列表时发生错误，请检查后台日志。"
+        if not containers:
+            if len(selectors) == 1:
+                return f"错误：未找到名为 '{selectors[0]}' 的容器。"
+            return f"错误：没有找到与 {' '.join(selectors)} 匹配的容器。"
+        if confirm_multiple and len(containers) > 1 and not confirmed:
+            lines = [f"--- 将{verb}以下 {len(containers)} 个容器 ---"]
+            lines.extend(f"{container.name} ({container.state})" for container in containers)
+            if unmatched:
+                lines.append(f"未匹配到容器：{' '.join(unmatched)}")
+            lines.append(f"确认无误后请在指令末尾加上 {CONFIRM_FLAG} 重新发送。")
+            return "\n".join(lines)
+
+        async def run(container: ContainerRef):
+            reason = skip_reason(container)
+            if reason:
+                raise SkipOperation(reason)
+            await operation(container.id)
+
+        # 各容器的操作并发进行，单个容器卡住 (例如停止宽限期) 不会拖慢其他容器
+        results = await run_bulk(
+            containers, run,
+            concurrency=self.config.get("docker_op_concurrency", 4),
+            timeout=self.config.get("docker_op_timeout_seconds", 60),
+        )
+        for result in results:
+            if result.outcome in (OUTCOME_FAILED, OUTCOME_TIMEOUT):
+                logger.error(f"{verb}容器 {result.container.name} 失败: {result.message}")
+        return self._format_bulk_results(verb, results, unmatched)
+
+    @staticmethod
+    def _format_bulk_results(verb: str, results: List[OpResult], unmatched: List[str]) -> str:
+        def line(result: OpResult) -> str:
+            name = result.container.name
+            if result.outcome == OUTCOME_OK:
+                return f"✅ 容器 {name} {verb}成功 ({result.duration:.1f}s)"
+            if result.outcome == OUTCOME_SKIPPED:
+                return f"⏭️ 容器 {name} {result.message}"
+            if result.outcome == OUTCOME_TIMEOUT:
+                return f"⏱️ 容器 {name} {verb}超时：{result.message}，操作可能仍在进行"
+            return f"❌ 容器 {name} {verb}失败：{result.message} ({result.duration:.1f}s)"
+
+        if len(results) == 1 and not unmatched:
+            return line(results[0])
+        counts = {outcome: 0 for outcome in (OUTCOME_OK, OUTCOME_SKIPPED, OUTCOME_FAILED, OUTCOME_TIMEOUT)}
+        for result in results:
+            counts[result.outcome] += 1
+        lines = [
+            f"--- 批量{verb} {len(results)} 个容器：成功 {counts[OUTCOME_OK]} / 跳过 {counts[OUTCOME_SKIPPED]}"
+            f" / 失败 {counts[OUTCOME_FAILED] + counts[OUTCOME_TIMEOUT]} ---"
+        ]
+        lines.extend(line(result) for result in results)
+        if unmatched:
+            lines.append(f"未匹配到容器：{' '.join(unmatched)}")
+        return "\n".join(lines)
+
+    @filter.command("启动容器", alias={"start_container"})
+    async def start_container_command(self, event: AstrMessageEvent, container_name: str):
+        yield event.plain_result(await self._bulk_container_operation(
+            event, container_name, "启动", self._docker.start_container,
+            lambda c: "已经在运行中。" if c.state == "running" else None,
+        ))
 
     @filter.command("关闭容器", alias={"stop_container"})
     async def stop_container_command(self, event: AstrMessageEvent, container_name: str):
-        logger.info(f"用户 {event.get_sender_name()} 触发了关闭容器指令: {container_name}")
-        try:
-            client = docker.from_env()
-            container = client.containers.get(container_name)
-            if container.status != "running":
-                yield event.plain_result(f"容器 {container_name} 没有在运行中。")
-                return
-            
-            container.stop()
-            yield event.plain_result(f"容器 {container_name} 关闭成功。")
-        except docker.errors.NotFound:
-            yield event.plain_result(f"错误：未找到名为 '{container_name}' 的容器。")
-        except docker.errors.APIError as e:
-            logger.error(f"关闭容器 {container_name} 失败: {e}", exc_info=True)
-            yield event.plain_result(f"关闭容器 {container_name} 失败：{e}")
-        except Exception as e:
-            logger.error(f"关闭容器 {container_name} 时发生未知错误: {e}", exc_info=True)
-            yield event.plain_result(f"关闭容器 {container_name} 时发生未知错误。")
+        yield event.plain_result(await self._bulk_container_operation(
+            event, container_name, "关闭", self._docker.stop_container,
+            lambda c: "没有在运行中。" if c.state != "running" else None,
+        ))
 
     @filter.command("删除容器", alias={"remove_container"})
     async def remove_container_command(self, event: AstrMessageEvent, container_name: str):
-        logger.info(f"用户 {event.get_sender_name()} 触发了删除容器指令: {container_name}")
-        try:
-            client = docker.from_env()
-            # remove 之前最好先 stop，或者使用 force=True
-            container = client.containers.get(container_name)
-            if container.status == "running":
-                yield event.plain_result(f"容器 {container_name} 正在运行中，请先关闭后再尝试删除。")
-                return
-
-            container.remove()
-            yield event.plain_result(f"容器 {container_name} 删除成功。")
-        except docker.errors.NotFound:
-            yield event.plain_result(f"错误：未找到名为 '{container_name}' 的容器。")
-        except docker.errors.APIError as e:
-            logger.error(f"删除容器 {container_name} 失败: {e}", exc_info=True)
-            yield event.plain_result(f"删除容器 {container_name} 失败：{e}")
-        except Exception as e:
-            logger.error(f"删除容器 {container_name} 时发生未知错误: {e}", exc_info=True)
-            yield event.plain_result(f"删除容器 {container_name} 时发生未知错误。")
+        # 只删除已停止的容器，运行中的容器需要先关闭；匹配到多个容器时先回复预览，附带 --yes 才执行
+        yield event.plain_result(await self._bulk_container_operation(
+            event, container_name, "删除", self._docker.remove_container,
+            lambda c: "正在运行中，请先关闭后再尝试删除。" if c.state == "running" else None,
+            confirm_multiple=True,
+        ))
 
     @filter.command("重启容器", alias={"restart_container"})
     async def restart_container_command(self, event: AstrMessageEvent, container_name: str):
-        logger.info(f"用户 {event.get_sender_name()} 触发了重启容器指令: {container_name}")
-        try:
-            client = docker.from_env()
-            container = client.containers.get(container_name)
-            
-            # 容器不一定在运行才能重启，但如果已经停止，重启会尝试启动它
-            container.restart()
-            yield event.plain_result(f"容器 {container_name} 重启成功。")
-        except docker.errors.NotFound:
-            yield event.plain_result(f"错误：未找到名为 '{container_name}' 的容器。")
-        except docker.errors.APIError as e:
-            logger.error(f"重启容器 {container_name} 失败: {e}", exc_info=True)
-            yield event.plain_result(f"重启容器 {container_name} 失败：{e}")
-        except Exception as e:
-            logger.error(f"重启容器 {container_name} 时发生未知错误: {e}", exc_info=True)
-            yield event.plain_result(f"重启容器 {container_name} 时发生未知错误。")
+        # 容器不一定在运行才能重启，但如果已经停止，重启会尝试启动它
+        yield event.plain_result(await self._bulk_container_operation(
+            event, container_name, "重启", self._docker.restart_container, lambda c: None,
+        ))
 
 
     async def terminate(self):
+        if self._fleet_server is not None:
+            await asyncio.gather(self.fleet_task, return_exceptions=True)
+            await self._fleet_server.stop()
+        if self.loop_lag_task:
+            self.loop_lag_task.cancel()
+            await asyncio.gather(self.loop_lag_task, return_exceptions=True)
+        if self._exporter is not None:
+            await asyncio.gather(self.exporter_task, return_exceptions=True)
+            await self._exporter.stop()
+        self.alert_task.cancel()
+        await asyncio.gather(self.alert_task, return_exceptions=True)
+        self.cpu_sampler_task.cancel()
+        await asyncio.gather(self.cpu_sampler_task, return_exceptions=True)
+        if self.resource_sampler_task:
+            self.resource_sampler_task.cancel()
+            await asyncio.gather(self.resource_sampler_task, return_exceptions=True)
         if self.monitor_task:
             self.monitor_task.cancel()
             await asyncio.gather(self.monitor_task, return_exceptions=True)
-            logger.info("服务器温度监控任务已成功停止。")
\ No newline at end of file
+            logger.info("服务器温度监控任务已成功停止。")
+        if self.history_task:
+            self.history_task.cancel()
+            await asyncio.gather(self.history_task, return_exceptions=True)
+        if self._metrics_store is not None:
+            await asyncio.to_thread(self._metrics_store.flush)
+            self._metrics_store.close()
+        if self._sysfs_reader is not None:
+            self._sysfs_reader.close()
+        if self.docker_monitor_task:
+            self.docker_monitor_task.cancel()
+            await asyncio.gather(self.docker_monitor_task, return_exceptions=True)
+            await self._docker_monitor.close()
+            await self._docker_monitor.client.close()
+        await self._docker.close()
\ No newline at end of file
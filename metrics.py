@@ -0,0 +1,215 @@
+# 指标基础类型与 OpenMetrics 文本格式输出
+import asyncio
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 默认的耗时分桶上限 (秒)，覆盖从亚毫秒级的文件读取到秒级的 Docker/渲染调用
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Dict[str, str]
+
+
+class Histogram:
+    """
+    固定分桶的直方图，observe() 只做一次二分查找和两次加法。
+    bucket_counts[i] 为落入第 i 个桶 (<= buckets[i]) 的样本数，最后一个元素为超出所有桶的样本数。
+    """
+
+    __slots__ = ("buckets", "bucket_counts", "count", "sum", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram(self.buckets)
+        histogram.bucket_counts = list(self.bucket_counts)
+        histogram.count = self.count
+        histogram.sum = self.sum
+        histogram.max = self.max
+        return histogram
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        估算第 q 分位数 (0 < q <= 1)：在命中的桶内线性插值，超出最后一个桶时返回观测到的最大值。
+        没有样本时返回 None。
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.bucket_counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return self.max
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return min(self.max, lower + (upper - lower) * (rank - cumulative) / count)
+            cumulative += count
+        return self.max
+
+
+class PerfRecorder:
+    """
+    按操作名记录耗时直方图。单次耗时达到 slow_threshold 秒 (大于 0 时) 会调用 on_slow(操作名, 耗时)。
+    observe() 可能在 asyncio.to_thread 的工作线程中调用，写入与读取都在锁内进行，
+    读取方通过 items() / summary() 拿到的是直方图的副本。
+    """
+
+    def __init__(self, slow_threshold: float = 0, on_slow: Optional[Callable[[str, float], None]] = None):
+        self.slow_threshold = slow_threshold
+        self.on_slow = on_slow
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+        if 0 < self.slow_threshold <= seconds and self.on_slow is not None:
+            self.on_slow(name, seconds)
+
+    @contextmanager
+    def time(self, name: str):
+        """计时上下文，可包裹同步代码或 await 表达式；抛出异常的调用同样计入。"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def items(self) -> List[Tuple[str, Histogram]]:
+        """按操作名排序返回 (操作名, 直方图副本)。"""
+        with self._lock:
+            return [(name, histogram.copy()) for name, histogram in sorted(self.histograms.items())]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按操作名排序返回各操作的调用次数、平均值、p50/p95/p99 与最大值 (秒)。"""
+        return [
+            {
+                "name": name,
+                "count": histogram.count,
+                "mean": histogram.sum / histogram.count,
+                "p50": histogram.percentile(0.5),
+                "p95": histogram.percentile(0.95),
+                "p99": histogram.percentile(0.99),
+                "max": histogram.max,
+            }
+            for name, histogram in self.items()
+            if histogram.count
+        ]
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控：每 interval 秒休眠一次，实际唤醒时间超出预期的部分即为循环被阻塞的时长。
+    延迟达到 threshold 秒时计入 blocked 并调用 on_block(延迟)。
+    """
+
+    def __init__(
+        self, interval: float = 0.5, threshold: float = 0.1, on_block: Optional[Callable[[float], None]] = None
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.on_block = on_block
+        self.histogram = Histogram()
+        self.last: Optional[float] = None
+        self.blocked = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last = lag
+            self.histogram.observe(lag)
+            if lag >= self.threshold:
+                self.blocked += 1
+                if self.on_block is not None:
+                    self.on_block(lag)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class OpenMetricsWriter:
+    """按 OpenMetrics 文本格式拼接指标，finish() 追加结尾的 # EOF。"""
+
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def _family(self, name: str, metric_type: str, help_text: str, unit: str = ""):
+        self._lines.append(f"# TYPE {name} {metric_type}")
+        if unit:
+            self._lines.append(f"# UNIT {name} {unit}")
+        self._lines.append(f"# HELP {name} {_escape(help_text)}")
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], float]], unit: str = ""):
+        samples = list(samples)
+        if not samples:
+            return
+        self._family(name, "gauge", help_text, unit)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], float]]):
+        samples = list(samples)
+        if not samples:
+            return
+        self._family(name, "counter", help_text)
+        for labels, value in samples:
+            self._lines.append(f"{name}_total{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Optional[Labels], Histogram]], unit: str = ""):
+        samples = list(samples)
+        if not samples:
+            return
+        self._family(name, "histogram", help_text, unit)
+        for labels, histogram in samples:
+            labels = labels or {}
+            cumulative = 0
+            for upper, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                self._lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(upper)})} {cumulative}")
+            self._lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+            self._lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            self._lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+
+    def finish(self) -> str:
+        return "\n".join(self._lines + ["# EOF"]) + "\n"
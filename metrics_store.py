@@ -0,0 +1,169 @@
+# 持久化的指标时序存储：SQLite 批量写入，按 1分钟 / 1小时 / 1天 三级聚合 (最小/平均/最大) 并按保留期清理
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# (表名, 聚合粒度秒数)
+RESOLUTIONS: Tuple[Tuple[str, int], ...] = (
+    ("rollup_1m", 60),
+    ("rollup_1h", 3600),
+    ("rollup_1d", 86400),
+)
+
+# 查询时间范围不超过该值时使用对应粒度
+_QUERY_RESOLUTION_LIMITS = {
+    "rollup_1m": 6 * 3600,
+    "rollup_1h": 30 * 86400,
+}
+
+
+def parse_range(text: str) -> Optional[int]:
+    """
+    将 30m / 6h / 7d / 2w 形式的时间范围解析为秒数，无法解析时返回 None。
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+    text = text.strip().lower()
+    if len(text) < 2 or text[-1] not in units:
+        return None
+    try:
+        value = float(text[:-1])
+    except ValueError:
+        return None
+    if value <= 0:
+        return None
+    return int(value * units[text[-1]])
+
+
+class MetricsStore:
+    """
+    指标按 series 名称 (如 temp.CPU、sys.cpu) 存储。
+
+    写入先进入内存缓冲区，write() 时在一个事务中把整批样本合并进三张聚合表；
+    聚合表保存 min/max/sum/count，因此可以逐批增量合并，查询时再计算平均值。
+    所有方法都是同步的，插件通过 asyncio.to_thread 调用，内部用锁串行化对连接的访问。
+    """
+
+    def __init__(self, path: str, retention_days: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.retention_days = {"rollup_1m": 7, "rollup_1h": 90, "rollup_1d": 730}
+        if retention_days:
+            self.retention_days.update(retention_days)
+        self._buffer: List[Tuple[str, float, float]] = []
+        self._series_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS series (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+            for table, _ in RESOLUTIONS:
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "series_id INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+                    "min REAL NOT NULL, max REAL NOT NULL, sum REAL NOT NULL, count INTEGER NOT NULL, "
+                    "PRIMARY KEY (series_id, bucket)) WITHOUT ROWID"
+                )
+        for series_id, name in self._conn.execute("SELECT id, name FROM series"):
+            self._series_ids[name] = series_id
+
+    def add(self, series: str, value: float, timestamp: Optional[float] = None):
+        """把一个样本放入写缓冲区，不访问数据库。"""
+        self._buffer.append((series, timestamp if timestamp is not None else time.time(), float(value)))
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def _series_id(self, name: str) -> int:
+        series_id = self._series_ids.get(name)
+        if series_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO series (name) VALUES (?)", (name,))
+            series_id = self._conn.execute("SELECT id FROM series WHERE name = ?", (name,)).fetchone()[0]
+            self._series_ids[name] = series_id
+        return series_id
+
+    def drain(self) -> List[Tuple[str, float, float]]:
+        """取出并清空写缓冲区。应在添加样本的同一线程 (事件循环) 中调用。"""
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def flush(self) -> int:
+        return self.write(self.drain())
+
+    def write(self, batch: List[Tuple[str, float, float]]) -> int:
+        """把一批样本合并写入所有聚合表，返回写入的样本数。"""
+        if not batch:
+            return 0
+        with self._lock, self._conn:
+            for table, step in RESOLUTIONS:
+                # 先在内存中按 (series, bucket) 聚合整批样本，再一次性 upsert
+                rows: Dict[Tuple[int, int], List[float]] = {}
+                for series, timestamp, value in batch:
+                    key = (self._series_id(series), int(timestamp) // step * step)
+                    row = rows.get(key)
+                    if row is None:
+                        rows[key] = [value, value, value, 1]
+                    else:
+                        row[0] = min(row[0], value)
+                        row[1] = max(row[1], value)
+                        row[2] += value
+                        row[3] += 1
+                self._conn.executemany(
+                    f"INSERT INTO {table} (series_id, bucket, min, max, sum, count) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (series_id, bucket) DO UPDATE SET "
+                    "min = MIN(min, excluded.min), max = MAX(max, excluded.max), "
+                    "sum = sum + excluded.sum, count = count + excluded.count",
+                    [(key[0], key[1], *row) for key, row in rows.items()],
+                )
+        return len(batch)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """删除超出保留期的聚合数据，返回删除的行数。"""
+        now = now if now is not None else time.time()
+        deleted = 0
+        with self._lock, self._conn:
+            for table, _ in RESOLUTIONS:
+                cutoff = int(now - self.retention_days[table] * 86400)
+                deleted += self._conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (cutoff,)).rowcount
+        return deleted
+
+    def series(self) -> List[str]:
+        # _series_ids 在 write() 的线程中扩充，复制时持有同一把锁
+        with self._lock:
+            return sorted(self._series_ids)
+
+    def query(
+        self, series: str, start: float, end: float, max_points: int = 24
+    ) -> List[Tuple[int, float, float, float, int]]:
+        """
+        查询 [start, end] 范围内的数据，返回 [(时间戳, 最小值, 平均值, 最大值, 样本数)]。
+        平均值为 sum / count，按各聚合桶的样本数加权；合并多个点时同样应以样本数加权。
+
+        根据范围长度自动选择聚合粒度，并在 SQL 中进一步合并为不超过 max_points 个点，
+        不会把原始数据整体加载到内存。
+        """
+        with self._lock:
+            series_id = self._series_ids.get(series)
+        if series_id is None:
+            return []
+        span = end - start
+        table, step = RESOLUTIONS[-1]
+        for candidate, candidate_step in RESOLUTIONS:
+            limit = _QUERY_RESOLUTION_LIMITS.get(candidate)
+            if limit is None or span <= limit:
+                table, step = candidate, candidate_step
+                break
+        # 输出点的间隔为聚合粒度的整数倍
+        group = max(step, -(-int(span / max_points) // step) * step)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket / ? * ? AS b, MIN(min), SUM(sum) / SUM(count), MAX(max), SUM(count) FROM {table} "
+                "WHERE series_id = ? AND bucket >= ? AND bucket <= ? GROUP BY b ORDER BY b",
+                (group, group, series_id, int(start) // step * step, int(end)),
+            ).fetchall()
+        return [(int(b), lo, avg, hi, int(count)) for b, lo, avg, hi, count in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,74 @@
+# 图片渲染缓存：相同内容在同一刷新周期内复用已渲染的图片 URL，渲染超时时不阻塞调用方
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+
+class RenderCache:
+    """
+    以 (数据摘要, 时间桶) 为键的 LRU 缓存，最多保存 max_entries 个渲染结果。
+
+    同一个键的并发渲染请求共享同一个渲染任务；渲染超过 timeout 秒时调用方立即得到 None，
+    渲染任务继续在后台完成并写入缓存，供后续请求使用。
+    """
+
+    def __init__(self, max_entries: int = 16, granularity: float = 30):
+        self.max_entries = max_entries
+        self.granularity = granularity
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self, rows: Iterable[Dict[str, Any]], fields: Iterable[str], now: Optional[float] = None, scope: str = ""
+    ) -> str:
+        """根据 scope (如主机名)、rows 中指定字段的内容与当前时间桶生成缓存键。"""
+        now = now if now is not None else time.time()
+        fields = tuple(fields)
+        digest = hashlib.sha1(
+            json.dumps([scope, [[row.get(field) for field in fields] for row in rows]], ensure_ascii=False).encode()
+        ).hexdigest()
+        bucket = int(now // self.granularity) if self.granularity > 0 else int(now)
+        return f"{digest}:{bucket}"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _on_done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.put(key, task.result())
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[str]], timeout: float) -> Optional[str]:
+        """
+        返回缓存的渲染结果；未命中时发起 (或等待已有的) 渲染任务，超时返回 None，渲染失败时抛出异常。
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(render())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            return None
+        return task.result()
@@ -0,0 +1,181 @@
+# 后台资源采样：磁盘 I/O 与网络吞吐 (相邻两次计数器快照的差值)、文件系统占用以及 CPU / 内存占用最高的进程
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+# 不统计的文件系统类型 (只读镜像、容器层等)，挂载在根目录时除外
+_IGNORED_FSTYPES = {"squashfs", "overlay", "iso9660"}
+# 每隔多少次采样重新枚举一次挂载点
+_PARTITION_REFRESH = 12
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+class ResourceSampler:
+    """
+    周期性采样磁盘、网络、文件系统与进程信息，查询时直接返回最近一次的结果。
+
+    - 磁盘与网络速率由本次与上一次计数器快照的差值除以时间间隔得到，第一次采样只记录基准值
+    - 进程通过 psutil.process_iter(attrs=...) 遍历。psutil 会按 PID 缓存 Process 对象，
+      同一进程两次调用 cpu_percent() 之间的差值即为该进程的 CPU 使用率，因此不需要阻塞等待
+    - 排行使用 heapq.nlargest，只保留前 top_n 个进程，不对全部进程排序
+
+    sample() 包含同步的系统调用，run() 在线程中执行它，避免进程数很多时阻塞事件循环。
+    设置 on_timing 后，每次采样完成时调用 on_timing("resource.<步骤>", 耗时秒数)。
+    run() 中单次采样失败不会结束任务：记录到 errors / last_error，连续失败的同一错误只调用一次 on_error(异常)。
+    """
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        top_n: int = 5,
+        on_timing: Optional[Callable[[str, float], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.interval = interval
+        self.top_n = top_n
+        self.on_timing = on_timing
+        self.on_error = on_error
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._previous_disk = None
+        self._previous_net = None
+        self._previous_time: Optional[float] = None
+        self._partitions: List[Any] = []
+        self._samples = 0
+        self._latest: Dict[str, Any] = {
+            "disk": None,
+            "net": None,
+            "filesystems": [],
+            "top_cpu": [],
+            "top_mem": [],
+            "process_count": 0,
+            "timestamp": None,
+        }
+
+    def _timed(self, name: str, started: float):
+        if self.on_timing is not None:
+            self.on_timing(f"resource.{name}", time.perf_counter() - started)
+
+    def _sample_io(self, now: float) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, float]]]:
+        started = time.perf_counter()
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        disk_rates = net_rates = None
+        if self._previous_time is not None and now > self._previous_time:
+            elapsed = now - self._previous_time
+            if disk is not None and self._previous_disk is not None:
+                disk_rates = {
+                    "read_bps": max(0, disk.read_bytes - self._previous_disk.read_bytes) / elapsed,
+                    "write_bps": max(0, disk.write_bytes - self._previous_disk.write_bytes) / elapsed,
+                    "read_iops": max(0, disk.read_count - self._previous_disk.read_count) / elapsed,
+                    "write_iops": max(0, disk.write_count - self._previous_disk.write_count) / elapsed,
+                }
+            if net is not None and self._previous_net is not None:
+                net_rates = {
+                    "recv_bps": max(0, net.bytes_recv - self._previous_net.bytes_recv) / elapsed,
+                    "sent_bps": max(0, net.bytes_sent - self._previous_net.bytes_sent) / elapsed,
+                }
+        self._previous_disk = disk
+        self._previous_net = net
+        self._previous_time = now
+        self._timed("io_counters", started)
+        return disk_rates, net_rates
+
+    def _list_partitions(self) -> List[Any]:
+        partitions = psutil.disk_partitions(all=False)
+        if not any(partition.mountpoint == "/" for partition in partitions):
+            # 在容器中运行时根目录通常是 overlay，all=False 不会列出，单独补上
+            partitions = [p for p in psutil.disk_partitions(all=True) if p.mountpoint == "/"][:1] + partitions
+        seen = set()
+        result = []
+        for partition in partitions:
+            if partition.mountpoint != "/" and partition.fstype in _IGNORED_FSTYPES:
+                continue
+            if partition.device in seen:
+                continue
+            seen.add(partition.device)
+            result.append(partition)
+        return result
+
+    def _sample_filesystems(self) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        if self._samples % _PARTITION_REFRESH == 0 or not self._partitions:
+            self._partitions = self._list_partitions()
+
+        filesystems = []
+        for partition in self._partitions:
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except OSError:
+                continue
+            filesystems.append({
+                "mountpoint": partition.mountpoint,
+                "total": usage.total,
+                "used": usage.used,
+                "percent": usage.percent,
+            })
+        self._timed("filesystems", started)
+        return filesystems
+
+    def _sample_processes(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        mem_total = psutil.virtual_memory().total or 1
+        processes = []
+        for proc in psutil.process_iter(attrs=["pid", "name", "cpu_percent", "memory_info"], ad_value=None):
+            info = proc.info
+            rss = info["memory_info"].rss if info["memory_info"] is not None else 0
+            processes.append({
+                "pid": info["pid"],
+                "name": info["name"] or "?",
+                "cpu_percent": info["cpu_percent"] or 0.0,
+                "rss": rss,
+                "mem_percent": round(rss / mem_total * 100, 1),
+            })
+        self._timed("processes", started)
+        return {
+            "top_cpu": heapq.nlargest(self.top_n, processes, key=lambda p: p["cpu_percent"]),
+            "top_mem": heapq.nlargest(self.top_n, processes, key=lambda p: p["rss"]),
+            "process_count": len(processes),
+        }
+
+    def sample(self):
+        """
+        执行一次采样。结果先在本地组装成一个字典，最后一次赋值发布，
+        事件循环中的 snapshot() 只会看到完整的某一次采样结果。
+        """
+        disk, net = self._sample_io(time.monotonic())
+        filesystems = self._sample_filesystems()
+        processes = self._sample_processes()
+        self._samples += 1
+        self._latest = {
+            "disk": disk,
+            "net": net,
+            "filesystems": filesystems,
+            **processes,
+            "timestamp": time.time(),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self._latest)
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                if str(e) != self.last_error and self.on_error is not None:
+                    self.on_error(e)
+                self.last_error = str(e)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,77 @@
+# 带有效期 (TTL) 的共享采样层：同一时间窗口内只进行一次真实采样，并发调用共享同一个结果
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CachedSampler(Generic[T]):
+    """
+    包装一个异步采样函数，缓存其结果 ttl 秒。
+
+    - 缓存有效时直接返回 (hit)
+    - 缓存过期且没有进行中的采样时发起一次新采样 (miss)
+    - 采样进行中到达的调用者等待同一个 Future (coalesced)
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[T]], ttl: float):
+        self._fetch = fetch
+        self.ttl = ttl
+        self._value: Optional[T] = None
+        self._timestamp: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def value(self) -> Optional[T]:
+        """最近一次采样结果，不触发采样。"""
+        return self._value
+
+    @property
+    def age(self) -> Optional[float]:
+        """最近一次采样距今的秒数，从未采样时为 None。"""
+        if self._timestamp is None:
+            return None
+        return time.monotonic() - self._timestamp
+
+    def _is_fresh(self) -> bool:
+        age = self.age
+        return age is not None and age < self.ttl
+
+    async def get(self) -> T:
+        if self._is_fresh():
+            self.hits += 1
+            return self._value
+
+        if self._inflight is not None:
+            self.coalesced += 1
+            # shield: 某个调用者被取消时不影响其他等待者和采样本身
+            return await asyncio.shield(self._inflight)
+
+        self.misses += 1
+        self._inflight = asyncio.ensure_future(self._run())
+        return await asyncio.shield(self._inflight)
+
+    async def _run(self) -> T:
+        try:
+            value = await self._fetch()
+            self._value = value
+            self._timestamp = time.monotonic()
+            return value
+        finally:
+            self._inflight = None
+
+    def invalidate(self):
+        self._timestamp = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "ttl": self.ttl,
+            "age": self.age,
+        }
@@ -0,0 +1,52 @@
+# 自适应采样调度：温度稳定且远离阈值时低频采样，接近阈值或快速升温时高频采样
+from typing import Dict
+
+from .trend import TrendResult
+
+
+class AdaptiveScheduler:
+    """
+    根据当前温度与趋势计算下一次采样的间隔 (秒)，结果限制在 [min_interval, max_interval]。
+
+    - 任一设备已达到阈值：使用 min_interval
+    - 按与阈值的最小温差 (headroom) 在 [0, far_margin] 区间内线性插值，温差越小间隔越短
+    - 温度上升时，保证在预计到达阈值之前至少还能采样 samples_before_eta 次
+    - 斜率达到 steep_slope (°C/分钟) 时直接使用 min_interval
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        far_margin: float = 15.0,
+        steep_slope: float = 2.0,
+        samples_before_eta: int = 4,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.far_margin = far_margin
+        self.steep_slope = steep_slope
+        self.samples_before_eta = samples_before_eta
+
+    def next_interval(
+        self, temps: Dict[str, float], trends: Dict[str, TrendResult], thresholds: Dict[str, float]
+    ) -> float:
+        interval = self.max_interval
+        for device, temp in temps.items():
+            threshold = thresholds.get(device)
+            if threshold is None:
+                continue
+            headroom = threshold - temp
+            if headroom <= 0:
+                return self.min_interval
+            ratio = min(1.0, headroom / self.far_margin) if self.far_margin > 0 else 1.0
+            interval = min(interval, self.min_interval + (self.max_interval - self.min_interval) * ratio)
+
+            trend = trends.get(device)
+            if trend is None or trend.slope <= 0:
+                continue
+            if trend.slope >= self.steep_slope:
+                return self.min_interval
+            if trend.eta_minutes is not None:
+                interval = min(interval, trend.eta_minutes * 60 / self.samples_before_eta)
+        return max(self.min_interval, interval)
@@ -0,0 +1,260 @@
+# 硬件温度读取：直接读取 sysfs (hwmon / thermal)，并保留 `sensors` 输出解析 (JSON / 文本) 作为回退方案
+import fnmatch
+import glob
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 传感器映射规则，格式为 "芯片通配符:标签通配符=设备键"
+# 芯片名使用 `sensors` 输出中的段名 (如 coretemp-isa-0000)；通过 sysfs 读取时芯片名为 "<hwmon name>-hwmonN"
+# 或 "<thermal type>-thermalN"，因此规则中的芯片通配符应以 "-*" 结尾以同时匹配两种来源
+DEFAULT_SENSOR_MAP: Tuple[str, ...] = (
+    "coretemp-*:Package id *=CPU",
+    "k10temp-*:Tctl=CPU",
+    "zenpower-*:Tdie=CPU",
+    "acpitz-*:temp1=Motherboard",
+    "iwlwifi*:temp1=WIFI",
+    "nvme-*:Composite=NVMe",
+    "amdgpu-*:edge=GPU",
+    "nouveau-*:temp1=GPU",
+)
+
+# 单次读取的最大字节数，sysfs 温度文件内容形如 "45000\n"
+_READ_SIZE = 32
+
+# `sensors` 文本输出中的温度行，例如 "Package id 0:  +46.0°C  (high = +100.0°C, crit = +100.0°C)"
+_TEMP_LINE = re.compile(r"^([^:]+):\s+([+-]?\d+(?:\.\d+)?)\s*°C")
+_INPUT_KEY = re.compile(r"^temp\d+_input$")
+
+
+def split_device_key(device_key: str) -> Tuple[str, int]:
+    """
+    将设备键拆分为 (基础键, 实例序号)，例如 "NVMe#2" -> ("NVMe", 2)，"CPU" -> ("CPU", 1)。
+    """
+    base, sep, index = device_key.rpartition("#")
+    if sep and index.isdigit():
+        return base, int(index)
+    return device_key, 1
+
+
+class SensorMap:
+    """
+    把传感器映射规则编译为一个正则表达式：每条规则是一个命名分组，
+    对 "芯片名\\0标签" 做一次匹配即可得到命中的规则 (lastgroup)。
+    匹配结果按 (芯片名, 标签) 缓存，重复解析时只需一次字典查找。
+    """
+
+    def __init__(self, rules: Optional[Iterable[str]] = None):
+        self.rules: List[Tuple[str, str, str]] = []
+        for rule in rules or DEFAULT_SENSOR_MAP:
+            pattern, sep, device_key = rule.rpartition("=")
+            chip, colon, label = pattern.partition(":")
+            if not sep or not colon or not device_key.strip():
+                raise ValueError(f"无效的传感器映射规则: {rule!r}，格式应为 芯片通配符:标签通配符=设备键")
+            self.rules.append((chip.strip(), label.strip(), device_key.strip()))
+
+        alternatives = []
+        for index, (chip, label, _) in enumerate(self.rules):
+            # fnmatch.translate 生成 (?s:...)\Z 形式的表达式，去掉结尾锚点后拼接
+            chip_re = fnmatch.translate(chip)[:-2]
+            label_re = fnmatch.translate(label)[:-2]
+            alternatives.append(f"(?P<r{index}>{chip_re}\\x00{label_re})")
+        self._pattern = re.compile("^(?:" + "|".join(alternatives) + ")$") if alternatives else None
+        self._cache: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def match(self, chip: str, label: str) -> Optional[str]:
+        """返回 (芯片名, 标签) 对应的基础设备键，不匹配任何规则时返回 None。"""
+        key = (chip, label)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        device_key = None
+        if self._pattern is not None:
+            matched = self._pattern.match(f"{chip}\x00{label}")
+            if matched is not None:
+                device_key = self.rules[int(matched.lastgroup[1:])][2]
+        self._cache[key] = device_key
+        return device_key
+
+
+class _InstanceNamer:
+    """为同一基础设备键的多个实例依次分配 CPU、CPU#2、CPU#3 ..."""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+
+    def name(self, base_key: str) -> str:
+        count = self._counts.get(base_key, 0) + 1
+        self._counts[base_key] = count
+        return base_key if count == 1 else f"{base_key}#{count}"
+
+
+_DEFAULT_MAP: Optional[SensorMap] = None
+
+
+def _default_map() -> SensorMap:
+    global _DEFAULT_MAP
+    if _DEFAULT_MAP is None:
+        _DEFAULT_MAP = SensorMap()
+    return _DEFAULT_MAP
+
+
+def parse_sensors_output(output: str, sensor_map: Optional[SensorMap] = None) -> Dict[str, float]:
+    """
+    解析 `sensors` 命令的文本输出，返回 {设备键: 温度}。
+    """
+    sensor_map = sensor_map or _default_map()
+    namer = _InstanceNamer()
+    data_dict = {}
+    chip = None
+
+    for line in output.splitlines():
+        if not line or line[0].isspace():
+            continue
+        if ":" not in line:
+            # 不以空白开头且不含冒号的行是芯片段名
+            if not line.startswith("("):
+                chip = line.strip()
+            continue
+        if chip is None or "°C" not in line:
+            continue
+        matched = _TEMP_LINE.match(line)
+        if matched is None:
+            continue
+        device_key = sensor_map.match(chip, matched.group(1).strip())
+        if device_key is not None:
+            data_dict[namer.name(device_key)] = float(matched.group(2))
+    return data_dict
+
+
+def parse_sensors_json(output: str, sensor_map: Optional[SensorMap] = None) -> Dict[str, float]:
+    """
+    解析 `sensors -j` 的 JSON 输出，返回 {设备键: 温度}。
+    """
+    sensor_map = sensor_map or _default_map()
+    namer = _InstanceNamer()
+    data_dict = {}
+    for chip, features in json.loads(output).items():
+        if not isinstance(features, dict):
+            continue
+        for label, values in features.items():
+            if not isinstance(values, dict):
+                continue
+            device_key = sensor_map.match(chip, label)
+            if device_key is None:
+                continue
+            for name, value in values.items():
+                if _INPUT_KEY.match(name):
+                    data_dict[namer.name(device_key)] = float(value)
+                    break
+    return data_dict
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class SysfsTemperatureReader:
+    """
+    基于 sysfs 的温度读取器。
+
+    启动时扫描一次 /sys/class/hwmon 与 /sys/class/thermal，建立 设备键 -> 温度文件 的映射，
+    并保持文件描述符常开，之后每次读取只需对每个文件执行一次 os.pread。
+    """
+
+    def __init__(self, sysfs_root: str = "/sys", sensor_map: Optional[SensorMap] = None):
+        self.sysfs_root = sysfs_root
+        self.sensor_map = sensor_map or _default_map()
+        # 设备键 -> (文件描述符, 路径)
+        self._fds: Dict[str, Tuple[int, str]] = {}
+
+    @property
+    def available(self) -> bool:
+        return bool(self._fds)
+
+    def _discover(self) -> List[Tuple[str, str]]:
+        namer = _InstanceNamer()
+        found: List[Tuple[str, str]] = []
+        found_bases = set()
+
+        hwmon_dirs = sorted(
+            glob.glob(os.path.join(self.sysfs_root, "class", "hwmon", "hwmon*")),
+            key=lambda path: int(re.sub(r"\D", "", os.path.basename(path)) or 0),
+        )
+        for hwmon_dir in hwmon_dirs:
+            # 部分旧内核将传感器文件放在 device 子目录下
+            for base in (hwmon_dir, os.path.join(hwmon_dir, "device")):
+                chip_name = _read_text(os.path.join(base, "name"))
+                if not chip_name:
+                    continue
+                chip = f"{chip_name}-{os.path.basename(hwmon_dir)}"
+                inputs = glob.glob(os.path.join(base, "temp*_input"))
+                inputs.sort(key=lambda path: int(re.sub(r"\D", "", os.path.basename(path)) or 0))
+                for input_path in inputs:
+                    prefix = input_path[:-len("_input")]
+                    # 没有 label 文件的传感器，lm-sensors 使用 tempN 作为标签
+                    label = _read_text(prefix + "_label") or os.path.basename(prefix)
+                    device_key = self.sensor_map.match(chip, label)
+                    if device_key:
+                        found.append((namer.name(device_key), input_path))
+                        found_bases.add(device_key)
+                break
+
+        # thermal_zone 作为补充，只用于 hwmon 中未找到的设备
+        zone_dirs = sorted(glob.glob(os.path.join(self.sysfs_root, "class", "thermal", "thermal_zone*")))
+        for zone_dir in zone_dirs:
+            zone_type = _read_text(os.path.join(zone_dir, "type"))
+            if not zone_type:
+                continue
+            chip = f"{zone_type}-{os.path.basename(zone_dir).replace('_zone', '')}"
+            device_key = self.sensor_map.match(chip, "temp1")
+            if device_key and device_key not in found_bases:
+                found.append((namer.name(device_key), os.path.join(zone_dir, "temp")))
+
+        return found
+
+    def open(self) -> int:
+        """
+        扫描 sysfs 并打开所有匹配的温度文件，返回成功打开的设备数量。
+        """
+        self.close()
+        for device_key, path in self._discover():
+            try:
+                self._fds[device_key] = (os.open(path, os.O_RDONLY), path)
+            except OSError:
+                continue
+        return len(self._fds)
+
+    def read(self) -> Dict[str, float]:
+        """
+        读取所有已打开设备的当前温度 (°C)。读取失败的设备 (例如已被移除) 会被关闭并丢弃。
+        """
+        data_dict = {}
+        failed = []
+        for device_key, (fd, _) in self._fds.items():
+            try:
+                raw = os.pread(fd, _READ_SIZE, 0)
+                data_dict[device_key] = int(raw) / 1000.0
+            except (OSError, ValueError):
+                failed.append(device_key)
+        for device_key in failed:
+            fd, _ = self._fds.pop(device_key)
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        return data_dict
+
+    def close(self):
+        for fd, _ in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds.clear()
@@ -0,0 +1,17 @@
+# 将插件目录注册为 astrbot_plugin_temp 包，使测试无需安装 AstrBot 即可导入不依赖 AstrBot 的模块
+import pathlib
+import sys
+import types
+
+PLUGIN_ROOT = pathlib.Path(__file__).resolve().parent.parent
+PACKAGE_NAME = "astrbot_plugin_temp"
+
+if PACKAGE_NAME not in sys.modules:
+    _pkg = types.ModuleType(PACKAGE_NAME)
+    _pkg.__path__ = [str(PLUGIN_ROOT)]
+    sys.modules[PACKAGE_NAME] = _pkg
+
+# 需要伪造 Docker 守护进程的测试直接导入 bench/fake_docker.py
+BENCH_DIR = str(PLUGIN_ROOT / "bench")
+if BENCH_DIR not in sys.path:
+    sys.path.append(BENCH_DIR)
@@ -0,0 +1,98 @@
+import asyncio
+
+from astrbot_plugin_temp.alerting import (
+    ALERT_HIGH,
+    ALERT_RECOVERED,
+    ALERT_RISING,
+    AlertDispatcher,
+    AlertEvaluator,
+)
+from astrbot_plugin_temp.trend import TrendResult
+
+
+def _trend(slope=0.0, eta=None):
+    return TrendResult(slope=slope, ewma=0.0, eta_minutes=eta, samples=5)
+
+
+def _kinds(alerts):
+    return [(alert.kind, alert.device) for alert in alerts]
+
+
+def test_high_alert_then_cooldown_then_repeat():
+    evaluator = AlertEvaluator({"CPU": 80.0}, cooldown_seconds=600)
+    assert _kinds(evaluator.evaluate({"CPU": 85.0}, {}, now=0)) == [(ALERT_HIGH, "CPU")]
+    assert evaluator.is_tripped("CPU")
+    assert evaluator.evaluate({"CPU": 86.0}, {}, now=300) == []
+    assert _kinds(evaluator.evaluate({"CPU": 86.0}, {}, now=600)) == [(ALERT_HIGH, "CPU")]
+
+
+def test_hysteresis_prevents_flapping():
+    evaluator = AlertEvaluator({"CPU": 80.0}, hysteresis=3.0)
+    evaluator.evaluate({"CPU": 81.0}, {}, now=0)
+    # 回落到阈值以下但未低于 阈值 - hysteresis，仍处于告警状态
+    assert evaluator.evaluate({"CPU": 78.0}, {}, now=10) == []
+    assert evaluator.is_tripped("CPU")
+    assert evaluator.evaluate({"CPU": 80.5}, {}, now=20) == []
+    alerts = evaluator.evaluate({"CPU": 76.5}, {}, now=30)
+    assert _kinds(alerts) == [(ALERT_RECOVERED, "CPU")]
+    assert not evaluator.is_tripped("CPU")
+    assert evaluator.evaluate({"CPU": 76.0}, {}, now=40) == []
+
+
+def test_rising_alert_requires_slope_and_eta():
+    evaluator = AlertEvaluator({"CPU": 80.0}, rising_slope=1.0, rising_eta_minutes=15, cooldown_seconds=600)
+    assert evaluator.evaluate({"CPU": 70.0}, {"CPU": _trend(0.5, 20)}, now=0) == []
+    assert evaluator.evaluate({"CPU": 70.0}, {"CPU": _trend(2.0, 30)}, now=0) == []
+    alerts = evaluator.evaluate({"CPU": 70.0}, {"CPU": _trend(2.0, 5)}, now=0)
+    assert _kinds(alerts) == [(ALERT_RISING, "CPU")]
+    assert alerts[0].eta_minutes == 5
+    # 预警同样受冷却时间限制
+    assert evaluator.evaluate({"CPU": 72.0}, {"CPU": _trend(2.0, 4)}, now=60) == []
+
+
+def test_devices_without_threshold_are_ignored():
+    evaluator = AlertEvaluator({"CPU": 80.0})
+    assert evaluator.evaluate({"GPU": 99.0}, {}, now=0) == []
+
+
+def test_dispatcher_slow_group_does_not_block_others():
+    async def scenario():
+        delivered = []
+
+        async def send(group, message):
+            if group == "broken":
+                raise RuntimeError("unreachable")
+            delivered.append((group, message))
+
+        dispatcher = AlertDispatcher(send, ["broken", "a", "b"], min_interval=0, retries=3, retry_delay=10)
+        task = asyncio.create_task(dispatcher.run())
+        try:
+            for index in range(3):
+                assert dispatcher.submit(f"m{index}")
+            await asyncio.sleep(0.05)
+            # 失败的群聊仍在退避重试，其他群聊已经收到全部告警
+            assert sorted(delivered) == sorted((group, f"m{i}") for group in ("a", "b") for i in range(3))
+            assert dispatcher.sent == 6
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_dispatcher_drops_when_group_queue_full():
+    async def scenario():
+        async def send(group, message):
+            pass
+
+        dispatcher = AlertDispatcher(send, ["a", "b"], queue_size=1)
+        assert dispatcher.submit("first")
+        assert not dispatcher.submit("second")
+        assert dispatcher.dropped == 2
+        task = asyncio.create_task(dispatcher.run())
+        await dispatcher.drain()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert dispatcher.sent == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+import asyncio
+
+from astrbot_plugin_temp.container_ops import (
+    OUTCOME_FAILED,
+    OUTCOME_OK,
+    OUTCOME_SKIPPED,
+    OUTCOME_TIMEOUT,
+    ContainerRef,
+    SkipOperation,
+    run_bulk,
+    select_containers,
+)
+
+CONTAINERS = [
+    ContainerRef("3f2a9c000001", "web", "running", {"com.docker.compose.project": "blog", "traefik.enable": "true"}),
+    ContainerRef("3f2a9c000002", "app-1", "running", {"com.docker.compose.project": "shop"}),
+    ContainerRef("8b1d00000003", "app-2", "exited", {"com.docker.compose.project": "shop"}),
+    ContainerRef("c0ffee000004", "db", "running", {}),
+]
+
+
+def _names(containers):
+    return [container.name for container in containers]
+
+
+def test_select_by_name_and_glob():
+    matched, unmatched = select_containers(["web", "app-*"], CONTAINERS)
+    assert _names(matched) == ["app-1", "app-2", "web"]
+    assert unmatched == []
+
+
+def test_select_by_label():
+    matched, _ = select_containers(["label=com.docker.compose.project=sh*"], CONTAINERS)
+    assert _names(matched) == ["app-1", "app-2"]
+    matched, _ = select_containers(["label=traefik.enable"], CONTAINERS)
+    assert _names(matched) == ["web"]
+
+
+def test_select_by_unique_id_prefix_only():
+    matched, unmatched = select_containers(["c0ffee"], CONTAINERS)
+    assert _names(matched) == ["db"]
+    # 有歧义的前缀与过短的前缀都不匹配
+    matched, unmatched = select_containers(["3f2a9c", "c0f"], CONTAINERS)
+    assert matched == []
+    assert unmatched == ["3f2a9c", "c0f"]
+
+
+def test_select_deduplicates_and_reports_unmatched():
+    matched, unmatched = select_containers(["web", "w*", "missing", "label=nope"], CONTAINERS)
+    assert _names(matched) == ["web"]
+    assert unmatched == ["missing", "label=nope"]
+
+
+def test_run_bulk_outcomes_in_input_order():
+    async def operation(container):
+        if container.name == "web":
+            return
+        if container.name == "app-1":
+            raise SkipOperation("已在运行")
+        if container.name == "app-2":
+            raise RuntimeError("boom")
+        await asyncio.sleep(10)
+
+    results = asyncio.run(run_bulk(CONTAINERS, operation, concurrency=2, timeout=0.05))
+    assert [(r.container.name, r.outcome) for r in results] == [
+        ("web", OUTCOME_OK),
+        ("app-1", OUTCOME_SKIPPED),
+        ("app-2", OUTCOME_FAILED),
+        ("db", OUTCOME_TIMEOUT),
+    ]
+    assert results[1].message == "已在运行"
+    assert results[2].message == "boom"
+
+
+def test_run_bulk_respects_concurrency():
+    running = 0
+    peak = 0
+
+    async def operation(container):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    asyncio.run(run_bulk(CONTAINERS * 3, operation, concurrency=2))
+    assert peak == 2
@@ -0,0 +1,85 @@
+import asyncio
+
+from astrbot_plugin_temp.cpu_sampler import CpuUsageSampler, _read_proc_stat
+
+
+def _write_stat(path, cpu, cores):
+    # user nice system idle iowait irq softirq steal
+    lines = [f"cpu {' '.join(map(str, cpu))}"]
+    lines += [f"cpu{index} {' '.join(map(str, core))}" for index, core in enumerate(cores)]
+    lines.append("intr 12345")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_read_proc_stat_stops_after_cpu_lines(tmp_path):
+    stat = tmp_path / "stat"
+    _write_stat(stat, [10, 0, 10, 70, 10, 0, 0, 0], [[5, 0, 5, 35, 5, 0, 0, 0]])
+    assert _read_proc_stat(str(stat)) == {"cpu": (100, 80), "cpu0": (50, 40)}
+
+
+def test_first_sample_only_primes_baseline(tmp_path):
+    stat = tmp_path / "stat"
+    _write_stat(stat, [0, 0, 0, 100, 0, 0, 0, 0], [[0, 0, 0, 50, 0, 0, 0, 0], [0, 0, 0, 50, 0, 0, 0, 0]])
+    sampler = CpuUsageSampler(proc_stat=str(stat))
+    sampler.sample()
+    assert sampler.cpu_percent is None
+
+    _write_stat(stat, [50, 0, 0, 150, 0, 0, 0, 0], [[40, 0, 0, 60, 0, 0, 0, 0], [10, 0, 0, 90, 0, 0, 0, 0]])
+    sampler.sample()
+    assert sampler.cpu_percent == 50.0
+    assert sampler.per_core == [80.0, 20.0]
+
+
+def test_run_waits_one_interval_before_sampling(tmp_path):
+    stat = tmp_path / "stat"
+    _write_stat(stat, [0, 0, 0, 100, 0, 0, 0, 0], [])
+    sampler = CpuUsageSampler(interval=0.2, proc_stat=str(stat))
+    sampler.sample()
+
+    async def scenario():
+        task = asyncio.create_task(sampler.run())
+        try:
+            await asyncio.sleep(0.05)
+            # run() 启动后不会立即与启动时的基准值做差
+            assert sampler.cpu_percent is None
+            _write_stat(stat, [25, 0, 0, 175, 0, 0, 0, 0], [])
+            await asyncio.sleep(0.25)
+            assert sampler.cpu_percent == 25.0
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_fallback_to_psutil_reprimes_baseline(tmp_path, monkeypatch):
+    stat = tmp_path / "stat"
+    _write_stat(stat, [0, 0, 0, 100, 0, 0, 0, 0], [])
+    sampler = CpuUsageSampler(proc_stat=str(stat))
+    sampler.sample()
+    monkeypatch.setattr("psutil.cpu_percent", lambda interval=None, percpu=False: [30.0, 10.0])
+
+    stat.unlink()
+    sampler.sample()
+    # 切换数据源后的第一次采样只建立 psutil 的基准值
+    assert sampler.cpu_percent is None
+    sampler.sample()
+    assert sampler.cpu_percent == 20.0
+    assert sampler.per_core == [30.0, 10.0]
+
+
+def test_run_reports_each_distinct_error_once(monkeypatch):
+    errors = []
+    sampler = CpuUsageSampler(interval=0.01, proc_stat="/nonexistent", on_error=errors.append)
+    monkeypatch.setattr(sampler, "sample", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+
+    async def scenario():
+        task = asyncio.create_task(sampler.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert sampler.errors > 1
+    assert [str(error) for error in errors] == ["boom"]
+    assert sampler.last_error == "boom"
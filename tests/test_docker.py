@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+
+import pytest
+from fake_docker import FakeDockerDaemon
+
+from astrbot_plugin_temp.container_ops import ContainerRef, select_containers
+from astrbot_plugin_temp.docker_client import (
+    DockerClient,
+    DockerConnectionError,
+    DockerError,
+    DockerNotFound,
+    calculate_cpu_percent,
+    calculate_memory,
+)
+from astrbot_plugin_temp.docker_monitor import DockerStatsMonitor, StatsRing, sparkline
+
+
+@contextlib.asynccontextmanager
+async def _daemon(tmp_path, **kwargs):
+    kwargs.setdefault("containers", 5)
+    kwargs.setdefault("stats_delay", 0.01)
+    kwargs.setdefault("stream_interval", 0.02)
+    daemon = FakeDockerDaemon(str(tmp_path / "docker.sock"), **kwargs)
+    await daemon.start()
+    try:
+        yield daemon
+    finally:
+        await daemon.stop()
+
+
+async def _wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+
+def test_calculate_cpu_and_memory():
+    stats = {
+        "cpu_stats": {"cpu_usage": {"total_usage": 300}, "system_cpu_usage": 2000, "online_cpus": 2},
+        "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+        "memory_stats": {"usage": 512, "limit": 1024},
+    }
+    assert calculate_cpu_percent(stats) == 40.0
+    assert calculate_memory(stats) == (512, 1024)
+    # 第一次推送没有 precpu 数据
+    assert calculate_cpu_percent({"cpu_stats": stats["cpu_stats"], "precpu_stats": {}}) is None
+    assert calculate_memory({}) is None
+
+
+def test_stats_ring_wraps_and_sparkline():
+    ring = StatsRing(3)
+    assert ring.latest() is None
+    for index in range(5):
+        ring.append(float(index), float(index * 10), float(index * 100))
+    assert len(ring) == 3
+    assert ring.cpu_values() == [20.0, 30.0, 40.0]
+    assert ring.mem_values() == [200.0, 300.0, 400.0]
+    assert sparkline([0, 50, 100], upper=100) == "▁▅█"
+    assert sparkline([]) == ""
+
+
+def test_client_requests_and_errors(tmp_path):
+    async def scenario():
+        async with _daemon(tmp_path, slow={"app0": 1}) as daemon:
+            timings = []
+            client = DockerClient(f"unix://{daemon.socket_path}", on_timing=lambda op, seconds: timings.append(op))
+            try:
+                containers = await client.list_containers(all=True)
+                assert [c["Names"][0] for c in containers] == ["/app0", "/app1", "/app2", "/app3", "/app4"]
+                assert len(await client.list_containers(all=False)) == 4
+
+                # 单个容器超时不影响其他容器
+                results = await client.stats_many(["app0", "app1", "missing"], timeout=0.3)
+                assert results["app0"] is None and results["missing"] is None
+                assert calculate_cpu_percent(results["app1"]) is not None
+
+                await client.stop_container("app1", grace_seconds=0)
+                assert daemon.containers[containers[1]["Id"]]["running"] is False
+                with pytest.raises(DockerError) as excinfo:
+                    await client.remove_container("app2")
+                assert excinfo.value.status == 409
+                with pytest.raises(DockerNotFound):
+                    await client.inspect_container("missing")
+                assert "docker.list" in timings and "docker.stats" in timings
+            finally:
+                await client.close()
+
+        client = DockerClient(f"unix://{tmp_path / 'gone.sock'}")
+        try:
+            with pytest.raises(DockerConnectionError):
+                await client.list_containers()
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_monitor_tracks_events_and_labels(tmp_path):
+    async def scenario():
+        async with _daemon(tmp_path) as daemon:
+            monitor = DockerStatsMonitor(DockerClient(f"unix://{daemon.socket_path}", pool_size=0), ring_size=10)
+            task = asyncio.create_task(monitor.run())
+            try:
+                await _wait_for(lambda: monitor.ready and "events" in daemon.requests)
+
+                # 同步之后创建的容器只能通过事件流得知，标签来自事件的 Attributes
+                labels = {"com.docker.compose.project": "blog"}
+                container_id = daemon.add_container("blog-web", running=False, labels=labels)
+                daemon.emit(container_id, "create")
+                await _wait_for(lambda: container_id in monitor.containers)
+                assert monitor.containers[container_id].labels == labels
+                assert monitor.containers[container_id].state == "created"
+
+                daemon.containers[container_id]["running"] = True
+                daemon.emit(container_id, "start")
+                await _wait_for(lambda: monitor.containers[container_id].state == "running")
+                assert monitor.containers[container_id].labels == labels
+                refs = [ContainerRef(c["id"], c["name"], c["state"], c["labels"]) for c in monitor.snapshot()]
+                matched, _ = select_containers(["label=com.docker.compose.project=blog"], refs)
+                assert [ref.name for ref in matched] == ["blog-web"]
+
+                # 运行中的容器通过 stats 流持续写入环形缓冲区
+                await _wait_for(lambda: any(c["name"] == "blog-web" and c["latest"] for c in monitor.snapshot()))
+
+                await monitor.client.stop_container("blog-web", grace_seconds=0)
+                await _wait_for(lambda: monitor.containers[container_id].state == "exited")
+                assert monitor.containers[container_id].labels == labels
+                await monitor.client.remove_container("blog-web")
+                await _wait_for(lambda: container_id not in monitor.containers)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await monitor.close()
+                await monitor.client.close()
+
+    asyncio.run(scenario())
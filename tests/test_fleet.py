@@ -0,0 +1,40 @@
+from astrbot_plugin_temp.fleet import FleetAggregator
+
+
+def test_ingest_updates_summary_and_totals():
+    aggregator = FleetAggregator({"CPU": 80.0, "NVMe": 70.0})
+    aggregator.ingest("web", {
+        "ts": 100, "temps": {"CPU": 85.0, "NVMe#2": 71.0}, "cpu": 12.5, "mem": [1, 4],
+        "containers": [["a", "running", 1.0, 1, 2], ["b", "exited", None, None, None]],
+    }, received=1000)
+    state = aggregator.get("WEB")
+    assert state.max_temp == ("CPU", 85.0)
+    assert state.hot == [("CPU", 85.0, 80.0), ("NVMe#2", 71.0, 70.0)]
+    assert state.mem_percent == 25.0
+    assert aggregator.hot_hosts == {"web"}
+    assert (aggregator.containers_running, aggregator.containers_total) == (1, 2)
+
+    aggregator.ingest("web", {"ts": 110, "temps": {"CPU": 50.0}, "containers": []}, received=1010)
+    assert aggregator.hot_hosts == set()
+    assert (aggregator.containers_running, aggregator.containers_total) == (0, 0)
+
+
+def test_out_of_order_snapshots_are_ignored():
+    aggregator = FleetAggregator({"CPU": 80.0})
+    aggregator.ingest("web", {"ts": 200, "temps": {"CPU": 50.0}}, received=1000)
+    aggregator.ingest("web", {"ts": 150, "temps": {"CPU": 90.0}}, received=1001)
+    assert aggregator.get("web").snapshot["temps"] == {"CPU": 50.0}
+    assert aggregator.get("web").snapshots == 1
+
+
+def test_liveness_uses_local_receive_time_not_agent_clock():
+    aggregator = FleetAggregator({}, stale_seconds=60)
+    aggregator.set_connected("web", True)
+    # agent 的时钟比插件慢一小时
+    aggregator.ingest("web", {"ts": 1000 - 3600, "temps": {}}, received=1000)
+    state = aggregator.get("web")
+    assert state.age(1030) == 30
+    assert aggregator.is_online(state, 1030)
+    assert not aggregator.is_online(state, 1061)
+    aggregator.set_connected("web", False)
+    assert not aggregator.is_online(state, 1030)
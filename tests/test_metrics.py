@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from astrbot_plugin_temp.exporter import MetricsExporter
+from astrbot_plugin_temp.metrics import Histogram, OpenMetricsWriter, PerfRecorder
+
+
+def test_histogram_percentiles():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert histogram.percentile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.bucket_counts == [1, 2, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 16.5
+    assert histogram.percentile(0.5) == 1.75
+    # 超出最后一个桶时返回观测到的最大值
+    assert histogram.percentile(0.99) == 10.0
+
+
+def test_open_metrics_text_format():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    writer = OpenMetricsWriter()
+    writer.gauge("temp", "设备温度", [({"device": 'CPU "0"'}, 45.5)], unit="celsius")
+    writer.counter("requests", "请求数", [({"result": "hit"}, 3)])
+    writer.histogram("call_duration_seconds", "耗时", [({"op": "sensors"}, histogram)], unit="seconds")
+    writer.gauge("empty", "没有样本的指标不输出", [])
+    assert writer.finish().splitlines() == [
+        "# TYPE temp gauge",
+        "# UNIT temp celsius",
+        "# HELP temp 设备温度",
+        'temp{device="CPU \\"0\\""} 45.5',
+        "# TYPE requests counter",
+        "# HELP requests 请求数",
+        'requests_total{result="hit"} 3',
+        "# TYPE call_duration_seconds histogram",
+        "# UNIT call_duration_seconds seconds",
+        "# HELP call_duration_seconds 耗时",
+        'call_duration_seconds_bucket{op="sensors",le="0.1"} 1',
+        'call_duration_seconds_bucket{op="sensors",le="1.0"} 2',
+        'call_duration_seconds_bucket{op="sensors",le="+Inf"} 2',
+        'call_duration_seconds_count{op="sensors"} 2',
+        'call_duration_seconds_sum{op="sensors"} 0.55',
+        "# EOF",
+    ]
+
+
+def test_perf_recorder_from_threads():
+    slow = []
+    recorder = PerfRecorder(slow_threshold=1.0, on_slow=lambda name, seconds: slow.append(name))
+
+    def worker(name):
+        for _ in range(1000):
+            recorder.observe(name, 0.001)
+
+    threads = [threading.Thread(target=worker, args=(f"op{index % 2}",)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.observe("op0", 2.0)
+
+    assert [(name, histogram.count) for name, histogram in recorder.items()] == [("op0", 2001), ("op1", 2000)]
+    assert slow == ["op0"]
+    summary = recorder.summary()
+    assert summary[0]["name"] == "op0" and summary[0]["max"] == 2.0
+
+
+def test_exporter_serves_metrics():
+    async def fetch(port, request):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scenario():
+        exporter = MetricsExporter(lambda: "up 1\n# EOF\n", port=0)
+        await exporter.start()
+        port = exporter.sockets[0].getsockname()[1]
+        try:
+            response = await fetch(port, b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            head, body = response.split(b"\r\n\r\n", 1)
+            assert head.startswith(b"HTTP/1.1 200 OK")
+            assert OpenMetricsWriter.CONTENT_TYPE.encode() in head
+            assert body == b"up 1\n# EOF\n"
+            assert (await fetch(port, b"GET /other HTTP/1.1\r\n\r\n")).startswith(b"HTTP/1.1 404")
+            assert (await fetch(port, b"POST /metrics HTTP/1.1\r\n\r\n")).startswith(b"HTTP/1.1 405")
+            assert exporter.scrapes == 1
+        finally:
+            await exporter.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import pytest
+
+from astrbot_plugin_temp.metrics_store import MetricsStore, parse_range
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("30m", 1800), ("6h", 21600), ("7d", 604800), ("2w", 1209600), ("1.5h", 5400), (" 10S ", 10),
+    ("", None), ("h", None), ("10", None), ("-1h", None), ("0d", None), ("abch", None),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+def test_write_merges_batches_into_rollups(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    try:
+        store.add("temp.CPU", 40, timestamp=0)
+        store.add("temp.CPU", 50, timestamp=30)
+        assert store.pending == 2
+        assert store.flush() == 2
+        # 第二批落在同一个 1 分钟桶内，与已有的聚合值合并
+        store.write([("temp.CPU", 60.0, 59), ("temp.CPU", 10.0, 45)])
+        assert store.series() == ["temp.CPU"]
+        assert store.query("temp.CPU", 0, 119, max_points=10) == [
+            (0, 40, 45.0, 50, 3),
+            (60, 59, 59.0, 59, 1),
+        ]
+        assert store.query("missing", 0, 119) == []
+    finally:
+        store.close()
+
+
+def test_merged_points_are_weighted_by_sample_count(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.db"))
+    try:
+        # 第一分钟 9 个样本均值 10，第二分钟 1 个样本 100
+        store.write([("sys.cpu", float(second), 10) for second in range(9)] + [("sys.cpu", 60.0, 100)])
+        (point,) = store.query("sys.cpu", 0, 119, max_points=1)
+        assert point == (0, 10, 19.0, 100, 10)
+    finally:
+        store.close()
+
+
+def test_series_survive_reopen_and_prune(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    store = MetricsStore(path, retention_days={"rollup_1m": 1})
+    store.write([("temp.GPU", 0.0, 60), ("temp.GPU", 3 * 86400.0, 61)])
+    store.close()
+
+    store = MetricsStore(path, retention_days={"rollup_1m": 1})
+    try:
+        assert store.series() == ["temp.GPU"]
+        # 1 分钟表只保留 1 天，1 小时表仍保留两个样本
+        assert store.prune(now=3 * 86400) == 1
+        assert [point[1] for point in store.query("temp.GPU", 3 * 86400 - 3600, 3 * 86400)] == [61]
+        assert len(store.query("temp.GPU", 0, 3 * 86400, max_points=100)) == 2
+    finally:
+        store.close()
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from astrbot_plugin_temp.render_cache import RenderCache
+
+
+def test_key_depends_on_fields_scope_and_time_bucket():
+    cache = RenderCache(granularity=30)
+    rows = [{"name": "web", "cpu": 1.5, "ignored": 1}]
+    key = cache.key(rows, ["name", "cpu"], now=60)
+    assert cache.key([{"name": "web", "cpu": 1.5, "ignored": 2}], ["name", "cpu"], now=89) == key
+    assert cache.key(rows, ["name", "cpu"], now=90) != key
+    assert cache.key(rows, ["name", "cpu"], now=60, scope="web-1") != key
+    assert cache.key([{"name": "web", "cpu": 2.0}], ["name", "cpu"], now=60) != key
+
+
+def test_lru_eviction():
+    cache = RenderCache(max_entries=2)
+    cache.put("a", "url-a")
+    cache.put("b", "url-b")
+    assert cache.get("a") == "url-a"
+    cache.put("c", "url-c")
+    # b 最久未被访问，被淘汰
+    assert cache.get("b") is None
+    assert cache.get("a") == "url-a"
+    assert cache.get("c") == "url-c"
+
+
+def test_concurrent_requests_share_one_render():
+    cache = RenderCache()
+    calls = []
+
+    async def render():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "url"
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_render("k", render, timeout=1) for _ in range(5)))
+        assert results == ["url"] * 5
+        assert await cache.get_or_render("k", render, timeout=1) == "url"
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_timeout_returns_none_and_caches_later_result():
+    cache = RenderCache()
+
+    async def render():
+        await asyncio.sleep(0.1)
+        return "slow-url"
+
+    async def scenario():
+        assert await cache.get_or_render("k", render, timeout=0.01) is None
+        await asyncio.sleep(0.15)
+        assert cache.get("k") == "slow-url"
+
+    asyncio.run(scenario())
+
+
+def test_failed_render_is_not_cached():
+    cache = RenderCache()
+
+    async def render():
+        raise RuntimeError("render failed")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_render("k", render, timeout=1)
+        assert cache.get("k") is None
+
+    asyncio.run(scenario())
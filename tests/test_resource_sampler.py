@@ -0,0 +1,55 @@
+import asyncio
+
+from astrbot_plugin_temp.resource_sampler import ResourceSampler, format_bytes
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512.0B"
+    assert format_bytes(1536) == "1.5KB"
+    assert format_bytes(3 * 1024**4) == "3.0TB"
+
+
+def test_rates_start_from_second_sample():
+    timings = []
+    sampler = ResourceSampler(top_n=3, on_timing=lambda name, seconds: timings.append(name))
+    assert sampler.snapshot()["timestamp"] is None
+
+    sampler.sample()
+    first = sampler.snapshot()
+    assert first["disk"] is None and first["net"] is None
+    assert first["process_count"] > 0
+    assert 0 < len(first["top_mem"]) <= 3
+    assert all({"mountpoint", "total", "used", "percent"} <= set(fs) for fs in first["filesystems"])
+    assert set(timings) == {"resource.io_counters", "resource.filesystems", "resource.processes"}
+
+    sampler.sample()
+    second = sampler.snapshot()
+    assert second["net"] is not None and second["net"]["recv_bps"] >= 0
+    # snapshot() 返回副本，不受之后的采样影响
+    second["process_count"] = -1
+    assert sampler.snapshot()["process_count"] != -1
+
+
+def test_run_survives_errors():
+    errors = []
+    sampler = ResourceSampler(interval=0.01, on_error=errors.append)
+    calls = []
+
+    def sample():
+        calls.append(1)
+        if len(calls) <= 3:
+            raise OSError("permission denied")
+
+    sampler.sample = sample
+
+    async def scenario():
+        task = asyncio.create_task(sampler.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert len(calls) > 3
+    assert sampler.errors == 3
+    assert [str(error) for error in errors] == ["permission denied"]
+    assert sampler.last_error is None
@@ -0,0 +1,27 @@
+from astrbot_plugin_temp.scheduler import AdaptiveScheduler
+from astrbot_plugin_temp.trend import TrendResult
+
+
+def _trend(slope, eta=None):
+    return TrendResult(slope=slope, ewma=0.0, eta_minutes=eta, samples=5)
+
+
+def test_interval_scales_with_headroom():
+    scheduler = AdaptiveScheduler(10, 120, far_margin=20)
+    thresholds = {"CPU": 80.0}
+    assert scheduler.next_interval({"CPU": 40.0}, {}, thresholds) == 120
+    assert scheduler.next_interval({"CPU": 70.0}, {}, thresholds) == 65
+    assert scheduler.next_interval({"CPU": 80.0}, {}, thresholds) == 10
+    # 没有阈值的设备不影响间隔
+    assert scheduler.next_interval({"NVMe": 99.0}, {}, thresholds) == 120
+
+
+def test_rising_trend_shortens_interval():
+    scheduler = AdaptiveScheduler(10, 120, far_margin=20, steep_slope=2.0, samples_before_eta=4)
+    thresholds = {"CPU": 80.0}
+    assert scheduler.next_interval({"CPU": 40.0}, {"CPU": _trend(0.5, eta=4)}, thresholds) == 60
+    assert scheduler.next_interval({"CPU": 40.0}, {"CPU": _trend(2.5, eta=16)}, thresholds) == 10
+    # 预计很快到达阈值时也不低于 min_interval
+    assert scheduler.next_interval({"CPU": 40.0}, {"CPU": _trend(1.0, eta=0.1)}, thresholds) == 10
+    # 降温时只按温差计算
+    assert scheduler.next_interval({"CPU": 40.0}, {"CPU": _trend(-1.0, eta=None)}, thresholds) == 120
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from astrbot_plugin_temp.sensor_reader import (
+    SensorMap,
+    SysfsTemperatureReader,
+    parse_sensors_json,
+    parse_sensors_output,
+    split_device_key,
+)
+
+SENSORS_OUTPUT = """\
+iwlwifi_1-virtual-0
+Adapter: Virtual device
+temp1:        +51.0°C
+
+acpitz-acpi-0
+Adapter: ACPI interface
+temp1:        +27.8°C
+
+coretemp-isa-0000
+Adapter: ISA adapter
+Package id 0:  +46.0°C  (high = +100.0°C, crit = +100.0°C)
+Core 0:        +44.0°C  (high = +100.0°C, crit = +100.0°C)
+
+nvme-pci-0100
+Adapter: PCI adapter
+Composite:    +48.9°C  (low  = -273.1°C, high = +84.8°C)
+                       (crit = +84.8°C)
+Sensor 1:     +48.9°C  (low  = -273.1°C, high = +65261.8°C)
+
+nvme-pci-0200
+Adapter: PCI adapter
+Composite:    +52.3°C  (low  = -273.1°C, high = +84.8°C)
+"""
+
+
+def test_parse_sensors_output():
+    assert parse_sensors_output(SENSORS_OUTPUT) == {
+        "WIFI": 51.0,
+        "Motherboard": 27.8,
+        "CPU": 46.0,
+        "NVMe": 48.9,
+        "NVMe#2": 52.3,
+    }
+
+
+def test_parse_sensors_output_ignores_unmapped_and_garbage():
+    output = "weird-chip-0\nAdapter: x\ntemp1:  +40.0°C\nno colon line\n(crit = +84.8°C)\n"
+    assert parse_sensors_output(output) == {}
+    assert parse_sensors_output("") == {}
+
+
+def test_parse_sensors_json():
+    output = json.dumps({
+        "coretemp-isa-0000": {
+            "Adapter": "ISA adapter",
+            "Package id 0": {"temp1_input": 46.0, "temp1_max": 100.0},
+            "Core 0": {"temp2_input": 44.0},
+        },
+        "nvme-pci-0100": {"Composite": {"temp1_input": 48.9}},
+        "nvme-pci-0200": {"Composite": {"temp1_alarm": 0.0, "temp1_input": 52.3}},
+    })
+    assert parse_sensors_json(output) == {"CPU": 46.0, "NVMe": 48.9, "NVMe#2": 52.3}
+
+
+def test_text_and_json_parsers_agree():
+    output = json.dumps({
+        "acpitz-acpi-0": {"temp1": {"temp1_input": 27.8}},
+        "coretemp-isa-0000": {"Package id 0": {"temp1_input": 46.0}},
+    })
+    text = "acpitz-acpi-0\nAdapter: ACPI\ntemp1:  +27.8°C\n\ncoretemp-isa-0000\nPackage id 0:  +46.0°C\n"
+    assert parse_sensors_json(output) == parse_sensors_output(text)
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("CPU", ("CPU", 1)),
+    ("NVMe#2", ("NVMe", 2)),
+    ("GPU#10", ("GPU", 10)),
+    ("odd#name", ("odd#name", 1)),
+])
+def test_split_device_key(key, expected):
+    assert split_device_key(key) == expected
+
+
+def test_sensor_map_custom_rules_first_match_wins():
+    sensor_map = SensorMap(["it87-*:temp1=Motherboard", "it87-*:temp*=Chipset", "*:CPUTIN=CPU"])
+    assert sensor_map.match("it87-isa-0290", "temp1") == "Motherboard"
+    assert sensor_map.match("it87-isa-0290", "temp3") == "Chipset"
+    assert sensor_map.match("nct6798-isa-0290", "CPUTIN") == "CPU"
+    assert sensor_map.match("nct6798-isa-0290", "SYSTIN") is None
+    # 第二次查询走缓存，结果不变
+    assert sensor_map.match("it87-isa-0290", "temp3") == "Chipset"
+
+
+def test_sensor_map_default_rules():
+    sensor_map = SensorMap()
+    assert sensor_map.match("k10temp-pci-00c3", "Tctl") == "CPU"
+    assert sensor_map.match("coretemp-hwmon3", "Package id 1") == "CPU"
+    assert sensor_map.match("coretemp-hwmon3", "Core 0") is None
+
+
+@pytest.mark.parametrize("rule", ["no-equals", "chip-only=CPU", "chip:label=", "  "])
+def test_sensor_map_rejects_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        SensorMap([rule])
+
+
+def _hwmon(root, index, name, temps, labels=None):
+    hwmon = root / "class" / "hwmon" / f"hwmon{index}"
+    hwmon.mkdir(parents=True)
+    (hwmon / "name").write_text(name + "\n")
+    for sensor, value in temps.items():
+        (hwmon / f"{sensor}_input").write_text(f"{value}\n")
+    for sensor, label in (labels or {}).items():
+        (hwmon / f"{sensor}_label").write_text(label + "\n")
+    return hwmon
+
+
+def test_sysfs_reader(tmp_path):
+    _hwmon(tmp_path, 0, "coretemp", {"temp1": 46000, "temp2": 44000}, {"temp1": "Package id 0", "temp2": "Core 0"})
+    _hwmon(tmp_path, 1, "nvme", {"temp1": 48900}, {"temp1": "Composite"})
+    _hwmon(tmp_path, 2, "nvme", {"temp1": 52300}, {"temp1": "Composite"})
+    zone = tmp_path / "class" / "thermal" / "thermal_zone0"
+    zone.mkdir(parents=True)
+    (zone / "type").write_text("acpitz\n")
+    (zone / "temp").write_text("27800\n")
+
+    reader = SysfsTemperatureReader(str(tmp_path))
+    try:
+        assert reader.open() == 4
+        assert reader.read() == {"CPU": 46.0, "NVMe": 48.9, "NVMe#2": 52.3, "Motherboard": 27.8}
+
+        # 文件描述符常开，再次读取得到新的值
+        (tmp_path / "class" / "hwmon" / "hwmon0" / "temp1_input").write_text("71500\n")
+        assert reader.read()["CPU"] == 71.5
+
+        # 读取失败的设备被丢弃
+        (tmp_path / "class" / "hwmon" / "hwmon1" / "temp1_input").write_text("garbage\n")
+        assert "NVMe" not in reader.read()
+        assert "NVMe" not in reader.read()
+    finally:
+        reader.close()
+    assert not reader.available
+
+
+def test_sysfs_reader_thermal_zone_does_not_duplicate_hwmon(tmp_path):
+    _hwmon(tmp_path, 0, "acpitz", {"temp1": 30000})
+    zone = tmp_path / "class" / "thermal" / "thermal_zone0"
+    zone.mkdir(parents=True)
+    (zone / "type").write_text("acpitz\n")
+    (zone / "temp").write_text("27800\n")
+
+    reader = SysfsTemperatureReader(str(tmp_path))
+    try:
+        reader.open()
+        assert reader.read() == {"Motherboard": 30.0}
+    finally:
+        reader.close()
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from astrbot_plugin_temp.trend import TrendEngine
+
+
+def test_linear_ramp_slope_and_eta():
+    engine = TrendEngine(window_seconds=600)
+    engine.set_thresholds({"CPU": 80.0})
+    # 每 30 秒升高 1°C，即 2°C/分钟
+    for i in range(10):
+        engine.update({"CPU": 50.0 + i}, 1000.0 + i * 30)
+    result = engine.get("CPU")
+    assert result.slope == pytest.approx(2.0)
+    assert result.samples == 10
+    assert result.eta_minutes == pytest.approx((80.0 - result.ewma) / 2.0)
+
+
+def test_single_sample_and_unknown_device():
+    engine = TrendEngine(window_seconds=600)
+    engine.update({"CPU": 50.0}, 0.0)
+    result = engine.get("CPU")
+    assert result.slope == 0.0
+    assert result.samples == 1
+    assert result.ewma == 50.0
+    assert engine.get("GPU") is None
+
+
+def test_window_expires_old_samples():
+    engine = TrendEngine(window_seconds=120)
+    # 前半段下降，后半段上升；窗口只覆盖上升部分
+    for i in range(20):
+        engine.update({"CPU": 80.0 - i}, i * 10.0)
+    for i in range(20):
+        engine.update({"CPU": 61.0 + i}, 200.0 + i * 10.0)
+    result = engine.get("CPU")
+    assert result.samples == 13
+    assert result.slope == pytest.approx(6.0)
+
+
+def test_missing_values_per_device():
+    engine = TrendEngine(window_seconds=600)
+    for i in range(6):
+        sample = {"CPU": 40.0 + i}
+        if i % 2 == 0:
+            sample["NVMe"] = 30.0
+        engine.update(sample, i * 60.0)
+    results = engine.results()
+    assert results["CPU"].slope == pytest.approx(1.0)
+    assert results["NVMe"].slope == pytest.approx(0.0)
+    assert results["NVMe"].samples == 3
+
+
+def test_matches_polyfit_after_long_run_with_large_timestamps():
+    # 长时间运行后时间原点会平移，斜率仍应与对窗口内数据直接拟合的结果一致
+    engine = TrendEngine(window_seconds=600, capacity=64)
+    rng = np.random.default_rng(0)
+    times, values = [], []
+    for i in range(5000):
+        timestamp = 1e9 + i * 10.0
+        value = 40.0 + 0.0005 * i * 10 + rng.normal(0, 0.3)
+        engine.update({"CPU": value}, timestamp)
+        times.append(timestamp)
+        values.append(value)
+    result = engine.get("CPU")
+    n = result.samples
+    expected = np.polyfit((np.array(times[-n:]) - times[-n]) / 60.0, values[-n:], 1)[0]
+    assert result.slope == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    # 原点跟随窗口移动，t 保持在窗口长度的量级
+    assert np.nanmax(np.abs(engine._times)) < 2 * 600 / 60.0
+
+
+def test_eta_absent_when_cooling():
+    engine = TrendEngine(window_seconds=600)
+    engine.set_thresholds({"CPU": 80.0})
+    for i in range(5):
+        engine.update({"CPU": 70.0 - i}, i * 60.0)
+    assert engine.get("CPU").eta_minutes is None
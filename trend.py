@@ -0,0 +1,177 @@
+# 温度趋势引擎：基于时间窗口的最小二乘斜率、EWMA 平滑以及到达阈值的预计时间，所有设备一次批量计算
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class TrendResult:
+    slope: float  # °C/分钟，最小二乘斜率
+    ewma: float  # 指数加权平滑后的温度
+    eta_minutes: Optional[float]  # 按当前斜率到达阈值的预计分钟数，不会到达时为 None
+    samples: int  # 时间窗口内的样本数
+
+
+class TrendEngine:
+    """
+    为所有设备维护同一个环形时间窗口 (times: [容量], values: [设备数, 容量])。
+
+    每次 update() 把新样本写入环形缓冲区，移除超出时间窗口的旧样本，并对
+    n、Σt、Σv、Σt²、Σtv 做增量加减，随后用一次向量化运算更新全部设备的斜率、
+    EWMA 与到达阈值时间。查询只读取已算好的结果，不做任何计算。
+
+    timestamp 应来自单调时钟 (time.monotonic())，系统时间被 NTP 调整时斜率不受影响。
+    t 相对时间原点计算；原点落后窗口内最旧样本超过一个窗口长度时平移到最旧样本，
+    使 t 与 Σt² 保持在窗口大小的量级，长时间运行也不会损失精度。
+    """
+
+    # 每写入这么多次样本，从缓冲区精确重算一次累加和，消除浮点增量误差
+    _RESYNC_EVERY = 256
+
+    def __init__(self, window_seconds: float, ewma_tau_seconds: float = 300, capacity: int = 512):
+        self.window_seconds = window_seconds
+        self.ewma_tau_seconds = ewma_tau_seconds
+        self.capacity = capacity
+        self.devices: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._times = np.full(capacity, np.nan)
+        self._values = np.full((0, capacity), np.nan)
+        self._head = 0  # 下一个写入位置
+        self._size = 0
+        self._origin: Optional[float] = None  # 时间原点，t 以分钟为单位相对该原点计算
+        self._updates = 0
+        self._last_time: Optional[float] = None
+        self._thresholds = np.zeros(0)
+        # 增量累加和
+        self._n = np.zeros(0)
+        self._st = np.zeros(0)
+        self._sv = np.zeros(0)
+        self._stt = np.zeros(0)
+        self._stv = np.zeros(0)
+        # 计算结果
+        self._ewma = np.zeros(0)
+        self._slope = np.zeros(0)
+        self._eta = np.zeros(0)
+
+    def _add_device(self, device: str):
+        self._index[device] = len(self.devices)
+        self.devices.append(device)
+        self._values = np.vstack([self._values, np.full((1, self.capacity), np.nan)])
+        for name in ("_thresholds", "_n", "_st", "_sv", "_stt", "_stv", "_slope"):
+            setattr(self, name, np.append(getattr(self, name), 0.0))
+        self._ewma = np.append(self._ewma, np.nan)
+        self._eta = np.append(self._eta, np.nan)
+
+    def set_thresholds(self, thresholds: Dict[str, float]):
+        for device, threshold in thresholds.items():
+            if device not in self._index:
+                self._add_device(device)
+            self._thresholds[self._index[device]] = threshold
+        self._update_eta()
+
+    def _accumulate(self, t: np.ndarray, v: np.ndarray, sign: float):
+        """把若干列 (t: [k], v: [设备数, k]) 的贡献加入或移出累加和，NaN 视为缺失。"""
+        mask = ~np.isnan(v)
+        v0 = np.where(mask, v, 0.0)
+        tm = np.where(mask, t, 0.0)
+        self._n += sign * mask.sum(axis=1)
+        self._st += sign * tm.sum(axis=1)
+        self._sv += sign * v0.sum(axis=1)
+        self._stt += sign * (tm * tm).sum(axis=1)
+        self._stv += sign * (tm * v0).sum(axis=1)
+
+    def _live_slots(self) -> np.ndarray:
+        start = (self._head - self._size) % self.capacity
+        return (start + np.arange(self._size)) % self.capacity
+
+    def _resync(self):
+        for name in ("_n", "_st", "_sv", "_stt", "_stv"):
+            getattr(self, name)[:] = 0.0
+        slots = self._live_slots()
+        if len(slots):
+            self._accumulate(self._times[slots], self._values[:, slots], 1.0)
+
+    def _rebase(self, shift: float):
+        """把时间原点后移 shift 分钟，并据此重算累加和。"""
+        slots = self._live_slots()
+        self._times[slots] -= shift
+        self._origin += shift * 60.0
+        self._resync()
+
+    def update(self, sample: Dict[str, float], timestamp: float):
+        for device in sample:
+            if device not in self._index:
+                self._add_device(device)
+        if self._origin is None:
+            self._origin = timestamp
+        t = (timestamp - self._origin) / 60.0
+
+        column = np.full(len(self.devices), np.nan)
+        for device, value in sample.items():
+            column[self._index[device]] = value
+
+        # 缓冲区已满时覆盖最旧的一列
+        if self._size == self.capacity:
+            self._accumulate(self._times[self._head:self._head + 1], self._values[:, self._head:self._head + 1], -1.0)
+            self._size -= 1
+        self._times[self._head] = t
+        self._values[:, self._head] = column
+        self._head = (self._head + 1) % self.capacity
+        self._size += 1
+        self._accumulate(np.array([t]), column[:, None], 1.0)
+
+        # 移除超出时间窗口的样本
+        slots = self._live_slots()
+        # 时间原点平移会引入舍入误差，比较时留出极小的余量，保证恰好位于窗口边界的样本不受平移影响
+        expired = slots[self._times[slots] < t - self.window_seconds / 60.0 - 1e-9]
+        if len(expired):
+            self._accumulate(self._times[expired], self._values[:, expired], -1.0)
+            self._values[:, expired] = np.nan
+            self._size -= len(expired)
+
+        self._updates += 1
+        oldest = self._times[(self._head - self._size) % self.capacity]
+        if oldest > self.window_seconds / 60.0:
+            self._rebase(oldest)
+        elif self._updates % self._RESYNC_EVERY == 0:
+            self._resync()
+
+        # EWMA：按与上一个样本的时间间隔计算衰减系数，采样间隔可变时依然正确
+        dt = 0.0 if self._last_time is None else max(0.0, timestamp - self._last_time)
+        alpha = 1.0 - math.exp(-dt / self.ewma_tau_seconds) if self._last_time is not None else 1.0
+        present = ~np.isnan(column)
+        fresh = present & np.isnan(self._ewma)
+        self._ewma = np.where(fresh, column, self._ewma)
+        self._ewma = np.where(present & ~fresh, alpha * column + (1.0 - alpha) * self._ewma, self._ewma)
+        self._last_time = timestamp
+
+        # 最小二乘斜率：slope = (nΣtv - ΣtΣv) / (nΣt² - (Σt)²)
+        denominator = self._n * self._stt - self._st * self._st
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (self._n * self._stv - self._st * self._sv) / denominator
+        self._slope = np.where((self._n >= 2) & (np.abs(denominator) > 1e-12), slope, 0.0)
+        self._update_eta()
+
+    def _update_eta(self):
+        headroom = self._thresholds - self._ewma
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eta = headroom / self._slope
+        valid = (self._thresholds > 0) & (self._slope > 0) & (headroom > 0)
+        self._eta = np.where(valid, eta, np.nan)
+
+    def get(self, device: str) -> Optional[TrendResult]:
+        index = self._index.get(device)
+        if index is None or self._n[index] < 1:
+            return None
+        eta = self._eta[index]
+        return TrendResult(
+            slope=float(self._slope[index]),
+            ewma=float(self._ewma[index]),
+            eta_minutes=None if np.isnan(eta) else float(eta),
+            samples=int(self._n[index]),
+        )
+
+    def results(self) -> Dict[str, TrendResult]:
+        return {device: result for device in self.devices if (result := self.get(device)) is not None}